@@ -0,0 +1 @@
+# Performance benchmarks for the cloud-based ML package
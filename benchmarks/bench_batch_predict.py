@@ -0,0 +1,51 @@
+"""
+Throughput of predict_in_batches against a FakeEndpoint with injected latency.
+
+Run from the project root:
+    python -m benchmarks.bench_batch_predict --rows 200000 --latency 0.05
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.batch_predict import predict_in_batches
+from src.fakes import FakeEndpoint
+
+
+def make_rows(n_rows, seed=0):
+    """Generate iris-shaped feature rows."""
+    rng = np.random.default_rng(seed)
+    return rng.uniform([4.0, 2.0, 1.0, 0.1], [8.0, 4.5, 7.0, 2.5], size=(n_rows, 4))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="Seconds of latency per endpoint call")
+    parser.add_argument('--max-instances', type=int, default=1000)
+    parser.add_argument('--in-flight', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{args.rows} rows, {args.latency * 1000:.0f} ms per call, "
+          f"{args.max_instances} instances per chunk")
+    print(f"{'in-flight':>10} {'calls':>8} {'seconds':>9} {'rows/sec':>12}")
+
+    for in_flight in args.in_flight:
+        endpoint = FakeEndpoint(latency=args.latency, per_instance_latency=1e-6)
+        start = time.perf_counter()
+        result = predict_in_batches(
+            endpoint,
+            rows,
+            max_instances=args.max_instances,
+            max_in_flight=in_flight
+        )
+        elapsed = time.perf_counter() - start
+        assert len(result['scores']) == args.rows
+        print(f"{in_flight:>10} {endpoint.calls:>8} {elapsed:>9.2f} {args.rows / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Throughput and peak memory of batch scoring as the worker count grows.
+
+Each run scores the same synthetic iris-shaped CSV with a local model in a
+fresh interpreter, so peak RSS is not inflated by earlier runs. Throughput
+should grow close to linearly with workers up to the number of cores, while
+the parent's peak RSS stays flat because only ``2 * workers`` chunks are in
+flight.
+
+Run from the project root:
+    python -m benchmarks.bench_batch_scoring --rows 2000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_prepare_data import write_synthetic_input
+from src.local_predictor import find_model_artifact
+
+RUN_SNIPPET = (
+    "from src.batch_scoring import score_file\n"
+    "result = score_file({input!r}, {output!r}, model_path={model!r}, workers={workers!r}, chunksize={chunksize!r})\n"
+    "print(result.rows_per_second, result.peak_rss_mb, result.worker_peak_rss_mb or 0)\n"
+)
+
+
+def run(input_path, output_path, model_path, workers, chunksize):
+    code = RUN_SNIPPET.format(input=input_path, output=output_path, model=model_path,
+                              workers=workers, chunksize=chunksize)
+    result = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-c', code], check=True, capture_output=True, text=True
+    )
+    rows_per_second, peak_mb, worker_peak_mb = result.stdout.split()
+    return float(rows_per_second), float(peak_mb), float(worker_peak_mb)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--chunksize', type=int, default=50_000)
+    parser.add_argument('--model', default=None, help="Model artifact (default: newest random forest)")
+    args = parser.parse_args()
+    model_path = args.model or find_model_artifact('models', 'random_forest')
+
+    print(f"{os.cpu_count()} CPUs, {args.rows} rows, {os.path.basename(model_path)}")
+    print(f"{'workers':>8} {'rows/s':>10} {'speedup':>8} {'peak MB':>8} {'worker MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'input.csv')
+        write_synthetic_input(input_path, args.rows)
+        baseline = None
+        for workers in args.workers:
+            output_path = os.path.join(tmp, f'scores_{workers}.parquet')
+            rows_per_second, peak_mb, worker_peak_mb = run(input_path, output_path, model_path, workers, args.chunksize)
+            baseline = baseline or rows_per_second
+            print(f"{workers:>8} {rows_per_second:>10,.0f} {rows_per_second / baseline:>8.2f} "
+                  f"{peak_mb:>8.0f} {worker_peak_mb:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Memory and per-row speed of a CompiledForest versus the pickled RandomForestClassifier.
+
+Run from the project root:
+    python -m benchmarks.bench_compiled_forest
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+from src.compiled_forest import compile_forest, CompiledForest
+from src.local_predictor import find_model_artifact, load_model_artifact
+
+
+def allocated_bytes(load):
+    """Bytes still allocated after ``load()`` returns (the loaded object's footprint)."""
+    tracemalloc.start()
+    obj = load()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def native_tree_bytes(model):
+    """Bytes of the C node buffers behind each tree, which tracemalloc cannot see."""
+    total = 0
+    for estimator in model.estimators_:
+        state = estimator.tree_.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+    return total
+
+
+def rows_per_second(predict, X, min_seconds=0.5):
+    """Repeat ``predict(X)`` for at least ``min_seconds`` and return rows/sec."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        predict(X)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return calls * len(X) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--path', default=None, help="Random forest artifact (default: newest)")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000, 100_000])
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    path = args.path or find_model_artifact(model_type='random_forest')
+    # Load once first so sklearn's module imports are not counted as model memory
+    load_model_artifact(path)
+    model, model_bytes = allocated_bytes(lambda: load_model_artifact(path)['model'])
+    model_bytes += native_tree_bytes(model)
+    compiled = compile_forest(model)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compiled.save(os.path.join(tmp, 'forest'))
+        _, compiled_bytes = allocated_bytes(lambda: CompiledForest.load(os.path.join(tmp, 'forest')))
+
+    print(f"{path}: {compiled.n_trees} trees, depth {compiled.depth}")
+    print(f"memory: sklearn {model_bytes / 1024:.1f} KiB, compiled {compiled_bytes / 1024:.1f} KiB")
+
+    rng = np.random.default_rng(0)
+    print(f"{'batch':>8} {'sklearn rows/s':>15} {'compiled rows/s':>16} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        X = rng.uniform([4.0, 2.0, 1.0, 0.1], [8.0, 4.5, 7.0, 2.5], size=(batch_size, 4))
+        assert np.array_equal(model.predict_proba(X), compiled.predict_proba(X))
+        sklearn_rate = rows_per_second(model.predict_proba, X)
+        compiled_rate = rows_per_second(compiled.predict_proba, X)
+        print(f"{batch_size:>8} {sklearn_rate:>15,.0f} {compiled_rate:>16,.0f} "
+              f"{compiled_rate / sklearn_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+On-disk size and read/write throughput of the supported dataset formats.
+
+Writes the same iris-shaped synthetic frame as CSV, gzipped CSV and Parquet
+with several codecs, then times full reads, two-column projected reads and
+streaming reads through src.data_format.
+
+Run from the project root:
+    python -m benchmarks.bench_data_format --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_format import iter_dataset, read_dataset, write_dataset
+
+FEATURES = ['sepal length (cm)', 'sepal width (cm)', 'petal length (cm)', 'petal width (cm)']
+VARIANTS = [
+    ('csv', 'data.csv', None),
+    ('csv.gz', 'data.csv.gz', None),
+    ('parquet none', 'data_none.parquet', None),
+    ('parquet snappy', 'data_snappy.parquet', 'snappy'),
+    ('parquet zstd', 'data_zstd.parquet', 'zstd'),
+]
+
+
+def synthetic_frame(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.normal(5.0, 1.0, size=(n_rows, len(FEATURES))), columns=FEATURES)
+    frame['target'] = rng.integers(0, 3, size=n_rows)
+    return frame
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    in_memory_mb = df.memory_usage().sum() / 2 ** 20
+    projection = ['petal length (cm)', 'target']
+    print(f"{args.rows:,} rows, {in_memory_mb:.0f} MB in memory")
+    print(f"{'format':>15} {'size MB':>8} {'write MB/s':>11} {'read MB/s':>10} "
+          f"{'2-col read s':>13} {'stream read s':>14} {'exact':>6}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, filename, compression in VARIANTS:
+            path = os.path.join(tmp, filename)
+            write_seconds, _ = timed(lambda: write_dataset(df, path, compression=compression))
+            read_seconds, loaded = timed(lambda: read_dataset(path))
+            projected_seconds, _ = timed(lambda: read_dataset(path, columns=projection))
+            stream_seconds, n_streamed = timed(
+                lambda: sum(len(chunk) for chunk in iter_dataset(path, chunksize=args.chunksize))
+            )
+            assert n_streamed == args.rows
+            size_mb = os.path.getsize(path) / 2 ** 20
+            print(f"{name:>15} {size_mb:>8.1f} {in_memory_mb / write_seconds:>11.0f} "
+                  f"{in_memory_mb / read_seconds:>10.0f} {projected_seconds:>13.3f} "
+                  f"{stream_seconds:>14.3f} {str(loaded.equals(df)):>6}")
+
+
+if __name__ == "__main__":
+    main()
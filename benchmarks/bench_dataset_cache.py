@@ -0,0 +1,77 @@
+"""
+Dataset creations and wall time over repeated training runs, with and without
+the dataset cache.
+
+Each run trains --variants models on the same uploaded training data, like
+cloud_train_deploy does. Without the cache every training creates its own
+dataset (the old train_model_on_cloud behaviour). With it, one dataset is
+created and reused by later trainings and later runs. FakeDatasetBackend takes
+--create-minutes of simulated time per creation, scaled by --time-scale.
+
+Run from the project root:
+    python -m benchmarks.bench_dataset_cache --runs 3
+"""
+import io
+import os
+import time
+import argparse
+import tempfile
+import contextlib
+
+from src.dataset_cache import DatasetCache
+from src.fakes import FakeDatasetBackend
+
+
+class _NoCache:
+    """Creates a new dataset on every request."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def get_or_create(self, source_uri, display_name):
+        return self.backend.create(display_name, source_uri)
+
+
+def run(cache, source, runs, variants):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(runs):
+            for variant in range(variants):
+                cache.get_or_create(source, f"variant_{variant}_dataset")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--variants', type=int, default=2)
+    parser.add_argument('--create-minutes', type=float, default=5.0)
+    parser.add_argument('--time-scale', type=float, default=0.02, help="Seconds per simulated minute")
+    args = parser.parse_args()
+    seconds = args.create_minutes * args.time_scale
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'training_data.csv')
+        with open(source, 'w') as f:
+            f.write("a,target\n" + "1.0,0\n" * 10000)
+
+        uncached_backend = FakeDatasetBackend(create_seconds=seconds)
+        uncached = run(_NoCache(uncached_backend), source, args.runs, args.variants)
+
+        cached_backend = FakeDatasetBackend(create_seconds=seconds)
+        cache_path = os.path.join(tmp, 'datasets.json')
+        cached = 0.0
+        for _ in range(args.runs):
+            # A fresh cache object per run, as in separate processes
+            cached += run(DatasetCache(cache_path, backend=cached_backend), source, 1, args.variants)
+
+    def minutes(value):
+        return f"{value / args.time_scale:6.1f} min"
+
+    print(f"{args.runs} runs x {args.variants} trainings, {args.create_minutes:g} min per dataset creation")
+    print(f"no cache     {minutes(uncached)}  datasets created: {uncached_backend.created}")
+    print(f"with cache   {minutes(cached)}  datasets created: {cached_backend.created}")
+
+
+if __name__ == '__main__':
+    main()
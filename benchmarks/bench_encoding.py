@@ -0,0 +1,91 @@
+"""
+Encoding 1M rows into prediction request bodies: per-row dicts versus
+src.encoding.
+
+dict path: ``iter_chunks`` turns rows into dicts (``to_dict('records')`` per
+block) and sizes each with json.dumps. Each chunk is then serialised again as
+the request body, as the SDK does.
+to_dict: the whole frame as ``to_dict('records')`` up front, then json.dumps
+per chunk, as the original scripts built inputs.
+encoder: ``iter_payloads`` from the DataFrame and from a pyarrow Table.
+
+Each path produces bodies of at most 1000 instances and 1.5 MB. Peak traced
+memory is measured in a separate pass, because tracing slows the Python-heavy
+paths down.
+
+Run from the project root:
+    python -m benchmarks.bench_encoding --rows 1000000
+"""
+import json
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.batch_predict import iter_chunks
+from src.encoding import iter_payloads
+from src.utils import load_feature_names
+
+
+def dict_path(df):
+    for chunk in iter_chunks(df):
+        yield json.dumps({'instances': chunk}).encode(), len(chunk)
+
+
+def to_dict_path(df):
+    records = df.to_dict('records')
+    for start in range(0, len(records), 1000):
+        chunk = records[start:start + 1000]
+        yield json.dumps({'instances': chunk}).encode(), len(chunk)
+
+
+def consume(payloads):
+    n_bodies = n_rows = n_bytes = 0
+    for body, n in payloads:
+        n_bodies += 1
+        n_rows += n
+        n_bytes += len(body)
+    return n_bodies, n_rows, n_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    columns = load_feature_names()
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(np.round(rng.uniform(0.1, 8.0, size=(args.rows, len(columns))), 1), columns=columns)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    # Same instances either way
+    sample = df.head(2000)
+    decoded = [row for body, _ in iter_payloads(sample) for row in json.loads(body)['instances']]
+    assert decoded == sample.to_dict('records')
+
+    paths = [
+        ('dict path (iter_chunks)', lambda: dict_path(df)),
+        ('to_dict records', lambda: to_dict_path(df)),
+        ('encoder, DataFrame', lambda: iter_payloads(df)),
+        ('encoder, Arrow table', lambda: iter_payloads(table)),
+    ]
+    print(f"{args.rows} rows x {len(columns)} features")
+    print(f"\n{'path':<26}{'seconds':>9}{'rows/s':>12}{'bodies':>8}{'MB sent':>9}{'peak MB':>9}")
+    for name, make in paths:
+        start = time.perf_counter()
+        n_bodies, n_rows, n_bytes = consume(make())
+        seconds = time.perf_counter() - start
+        assert n_rows == args.rows
+        tracemalloc.start()
+        consume(make())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:<26}{seconds:>9.2f}{n_rows / seconds:>12,.0f}{n_bodies:>8}"
+              f"{n_bytes / 1e6:>9.1f}{peak / 1e6:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Latency and throughput of PredictionGateway versus one endpoint call per caller.
+
+Callers arrive as a Poisson process and each asks for a few instances drawn from
+a small pool, so some feature vectors repeat while in flight.
+
+Run from the project root:
+    python -m benchmarks.bench_gateway --callers 2000 --rate 2000 --latency 0.02
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.cloud_utils import predict_with_endpoint
+from src.fakes import FakeEndpoint
+from src.gateway import PredictionGateway
+
+
+def make_requests(n_callers, pool_size, seed=0):
+    """Build the instances each caller will send."""
+    rng = np.random.default_rng(seed)
+    pool = np.round(
+        rng.uniform([4.0, 2.0, 1.0, 0.1], [8.0, 4.5, 7.0, 2.5], size=(pool_size, 4)), 1
+    ).tolist()
+    sizes = rng.integers(1, 5, size=n_callers)
+    return [[pool[i] for i in rng.integers(0, pool_size, size=size)] for size in sizes]
+
+
+async def run_callers(requests, rate, call, seed=0):
+    """Start one task per caller at Poisson arrival times and time each call."""
+    rng = np.random.default_rng(seed)
+    latencies = []
+
+    async def caller(instances):
+        start = time.perf_counter()
+        result = await call(instances)
+        assert len(result) == len(instances)
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    start = time.perf_counter()
+    for instances in requests:
+        tasks.append(asyncio.create_task(caller(instances)))
+        await asyncio.sleep(rng.exponential(1.0 / rate))
+    await asyncio.gather(*tasks)
+    return np.array(latencies), time.perf_counter() - start
+
+
+async def direct(requests, args):
+    """Baseline: every caller pays its own endpoint round trip."""
+    endpoint = FakeEndpoint(latency=args.latency, per_instance_latency=1e-6)
+    executor = ThreadPoolExecutor(max_workers=args.in_flight)
+    loop = asyncio.get_running_loop()
+
+    async def call(instances):
+        response = await loop.run_in_executor(executor, predict_with_endpoint, endpoint, instances)
+        return response.predictions
+
+    latencies, elapsed = await run_callers(requests, args.rate, call)
+    executor.shutdown()
+    return latencies, elapsed, endpoint.calls
+
+
+async def coalesced(requests, args):
+    """Callers share batched endpoint calls through the gateway."""
+    endpoint = FakeEndpoint(latency=args.latency, per_instance_latency=1e-6)
+    async with PredictionGateway(
+        endpoint, window_ms=args.window_ms, max_in_flight=args.in_flight
+    ) as gateway:
+        latencies, elapsed = await run_callers(requests, args.rate, gateway.predict)
+    print(f"  gateway stats: {gateway.stats}")
+    return latencies, elapsed, endpoint.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--callers', type=int, default=2000)
+    parser.add_argument('--rate', type=float, default=2000, help="Caller arrivals per second")
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds per endpoint call")
+    parser.add_argument('--window-ms', type=float, default=5.0)
+    parser.add_argument('--in-flight', type=int, default=8)
+    parser.add_argument('--pool-size', type=int, default=500,
+                        help="Distinct feature vectors callers draw from")
+    args = parser.parse_args()
+
+    requests = make_requests(args.callers, args.pool_size)
+    n_instances = sum(len(r) for r in requests)
+    print(f"{args.callers} callers, {n_instances} instances, "
+          f"{args.latency * 1000:.0f} ms per endpoint call")
+
+    for name, mode in [('direct', direct), ('gateway', coalesced)]:
+        latencies, elapsed, calls = asyncio.run(mode(requests, args))
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"{name:>8}: p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  "
+              f"{n_instances / elapsed:10,.0f} instances/sec  {calls} endpoint calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Cost of a local hyperparameter search: every configuration on the full data
+versus successive halving, and pickled versus shared-memory trial inputs.
+
+The data is synthetic iris-like rows (src.synthetic_data), large enough for
+fit time to matter. The exhaustive search trains every sampled configuration
+on all training rows; successive halving trains them on --min-rows and keeps
+the best 1/eta per rung. Both report the best validation accuracy they found.
+
+The transfer comparison measures only the cost of getting the arrays into a
+worker: a pool whose tasks carry the arrays (pickled per task) versus one whose
+workers attach the shared memory blocks once.
+
+Run from the project root:
+    python -m benchmarks.bench_hyperparam_search --rows 20000 --configs 18 --jobs 2
+"""
+import os
+import time
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from sklearn.datasets import load_iris
+
+from src.hyperparam_search import (
+    SharedArrays, _attach_arrays, _run_trial, _split, _arrays, rung_sizes, sample_configs, successive_halving
+)
+from src.synthetic_data import generate_synthetic_data
+
+
+def exhaustive(configs, arrays, random_state=0):
+    _arrays.update(arrays)
+    n_rows = len(arrays['y_train'])
+    return [
+        _run_trial((i, model_type, params, n_rows, random_state))
+        for i, (model_type, params) in enumerate(configs)
+    ]
+
+
+def _touch_pickled(arrays):
+    return float(arrays['X_train'][0, 0])
+
+
+def _touch_shared(_):
+    return float(_arrays['X_train'][0, 0])
+
+
+def transfer_seconds(arrays, n_tasks, jobs):
+    """Time ``n_tasks`` trivial tasks that each need the training arrays."""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        list(executor.map(_touch_pickled, [arrays] * n_tasks))
+    pickled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with SharedArrays(arrays) as shared, ProcessPoolExecutor(
+        max_workers=jobs, initializer=_attach_arrays, initargs=(shared.descriptors,)
+    ) as executor:
+        list(executor.map(_touch_shared, range(n_tasks)))
+    return pickled, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--configs', type=int, default=18)
+    parser.add_argument('--min-rows', type=int, default=500)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--transfer-rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    iris = load_iris()
+    X, y = generate_synthetic_data(iris.data, iris.target, n_synthetic=args.rows, random_state=0)
+    df = pd.DataFrame(X, columns=iris.feature_names)
+    df['target'] = y
+    arrays = _split(df[iris.feature_names].to_numpy(), y, 0.25, 0)
+    configs = sample_configs(['random_forest', 'svm'], args.configs, random_state=0)
+    print(f"{len(arrays['y_train'])} training rows, {len(configs)} configurations, "
+          f"rungs {rung_sizes(len(arrays['y_train']), args.min_rows, args.eta)}")
+
+    start = time.perf_counter()
+    full = exhaustive(configs, arrays)
+    full_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    halving = successive_halving(configs, arrays, args.min_rows, args.eta, random_state=0)
+    halving_seconds = time.perf_counter() - start
+
+    print(f"\n{'search':<22}{'trials':>8}{'rows fitted':>14}{'seconds':>10}{'best acc':>10}")
+    for name, trials, seconds in [('exhaustive', full, full_seconds), ('successive halving', halving, halving_seconds)]:
+        final = [t for t in trials if t.n_rows == len(arrays['y_train'])]
+        print(f"{name:<22}{len(trials):>8}{sum(t.n_rows for t in trials):>14}{seconds:>10.2f}"
+              f"{max(t.score for t in final):>10.4f}")
+
+    big = _split(*generate_synthetic_data(iris.data, iris.target, n_synthetic=args.transfer_rows,
+                                          random_state=1), 0.25, 0)
+    mb = sum(a.nbytes for a in big.values()) / 1e6
+    pickled, shared = transfer_seconds(big, len(halving), args.jobs)
+    print(f"\nTrial inputs for {len(halving)} tasks, {mb:.0f} MB of arrays, {args.jobs} workers:")
+    print(f"  pickled per task   {pickled:6.2f}s")
+    print(f"  shared memory      {shared:6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
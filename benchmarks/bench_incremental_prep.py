@@ -0,0 +1,73 @@
+"""
+Time to prepare a grown input: full streaming rerun versus an incremental run.
+
+An iris-shaped CSV is prepared once incrementally, then a small batch of rows
+is appended and the input prepared again both ways. The incremental run
+re-hashes the old bytes but parses, validates and splits only the new rows,
+so its time should track the size of the append, not of the file.
+
+Run from the project root:
+    python -m benchmarks.bench_incremental_prep --rows 1000000 --append 10000
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_prepare_data import write_synthetic_input
+from prepare_cloud_data import prepare_data
+
+
+def append_rows(path, n_rows, seed=1):
+    rng = np.random.default_rng(seed)
+    columns = pd.read_csv(path, nrows=0).columns
+    frame = pd.DataFrame(rng.normal(5.0, 1.0, size=(n_rows, len(columns) - 1)), columns=columns[:-1])
+    frame['target'] = rng.integers(0, 3, size=n_rows)
+    frame.to_csv(path, mode='a', header=False, index=False)
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--append', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'input.csv')
+        incremental_dir = os.path.join(tmp, 'incremental')
+        write_synthetic_input(input_path, args.rows)
+        elapsed, _ = timed(prepare_data, input_path, incremental_dir, chunksize=args.chunksize,
+                           output_format='csv', incremental=True)
+        print(f"initial incremental run over {args.rows} rows: {elapsed:.2f} s")
+
+        print(f"{'appended':>10} {'total rows':>11} {'full s':>8} {'incremental s':>14} {'identical':>10}")
+        total = args.rows
+        for n_append in args.append:
+            append_rows(input_path, n_append, seed=total)
+            total += n_append
+            full_dir = os.path.join(tmp, f'full_{total}')
+            full_seconds, _ = timed(prepare_data, input_path, full_dir, chunksize=args.chunksize,
+                                    output_format='csv')
+            incremental_seconds, _ = timed(prepare_data, input_path, incremental_dir, chunksize=args.chunksize,
+                                           output_format='csv', incremental=True)
+            identical = all(
+                open(os.path.join(full_dir, name), 'rb').read() == open(os.path.join(incremental_dir, name), 'rb').read()
+                for name in ('training_data.csv', 'test_data.csv')
+            )
+            print(f"{n_append:>10} {total:>11} {full_seconds:>8.2f} {incremental_seconds:>14.2f} {identical!s:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Wall time of listing job statuses: serial to_dict() calls versus the thread
+pool, and a second run served from the finished-job cache.
+
+Jobs are FakeJob stubs whose ``to_dict()`` sleeps --latency seconds, like a
+round trip to the Vertex AI API. A --running fraction of them never finish,
+so they are fetched again on every run.
+
+Run from the project root:
+    python -m benchmarks.bench_job_status --jobs 200 --latency 0.05
+"""
+import os
+import time
+import argparse
+import tempfile
+
+from src.fakes import FakeJob
+from src.job_status import JobStatusCache, fetch_job_records, job_record
+
+
+def make_jobs(n_jobs, latency, running_fraction):
+    n_running = int(n_jobs * running_fraction)
+    jobs = []
+    for index in range(n_jobs):
+        final = 'PIPELINE_STATE_RUNNING' if index < n_running else 'PIPELINE_STATE_SUCCEEDED'
+        jobs.append(FakeJob(f"job-{index}", [(final, 0)], poll_latency=latency))
+    return jobs
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--running', type=float, default=0.1, help="Fraction of jobs still running")
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.jobs, args.latency, args.running)
+    serial, serial_time = timed(lambda: [job_record(job.to_dict()) for job in jobs])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = JobStatusCache(os.path.join(tmp, 'job_status.json'))
+        pooled, pooled_time = timed(lambda: fetch_job_records(jobs, cache=cache, max_workers=args.workers))
+        polls = sum(job.polls for job in jobs)
+        reloaded = JobStatusCache(cache.path)
+        cached, cached_time = timed(lambda: fetch_job_records(jobs, cache=reloaded, max_workers=args.workers))
+        refetched = sum(job.polls for job in jobs) - polls
+
+    assert [r['state'] for r in serial] == [r['state'] for r in pooled] == [r['state'] for r in cached]
+    print(f"{args.jobs} jobs, {args.latency * 1000:.0f} ms per to_dict(), {args.workers} workers")
+    print(f"serial            {serial_time:7.2f} s")
+    print(f"thread pool       {pooled_time:7.2f} s  ({serial_time / pooled_time:.1f}x)")
+    print(f"cached second run {cached_time:7.2f} s  ({serial_time / cached_time:.1f}x, "
+          f"{refetched} of {args.jobs} jobs fetched)")
+
+
+if __name__ == '__main__':
+    main()
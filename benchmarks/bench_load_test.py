@@ -0,0 +1,51 @@
+"""
+Throughput/latency curves of simulated endpoint sizes, and the load
+generator's own ceiling.
+
+FakeEndpoint with ``replicas`` serves that many requests at once, each taking
+--latency seconds, so its capacity is replicas / latency requests per second.
+Each size is swept over --qps. The cheapest size whose p99 meets --slo-p99-ms
+at --target-qps is reported. The same sweep against a real endpoint is
+``python -m src loadtest --endpoint ...``.
+
+The generator check sends to a zero-latency stub at increasing rates, to show
+the rate up to which the client, not the endpoint, is what is being measured.
+
+Run from the project root:
+    python -m benchmarks.bench_load_test --replicas 1 2 4 --qps 10 20 40 80 --target-qps 40
+"""
+import argparse
+
+from src.fakes import FakeEndpoint
+from src.load_test import cheapest_config, format_curve, sweep, synthetic_requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--replicas', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--qps', type=float, nargs='+', default=[10, 20, 40, 80])
+    parser.add_argument('--latency', type=float, default=0.04, help="Seconds per request")
+    parser.add_argument('--duration', type=float, default=3.0, help="Seconds per rate")
+    parser.add_argument('--slo-p99-ms', type=float, default=100.0)
+    parser.add_argument('--target-qps', type=float, default=40.0)
+    parser.add_argument('--generator-qps', type=float, nargs='+', default=[500, 1000, 2000, 4000])
+    args = parser.parse_args()
+
+    requests = synthetic_requests(1000)
+    curves = []
+    for replicas in args.replicas:
+        endpoint = FakeEndpoint(latency=args.latency, replicas=replicas)
+        results = sweep(endpoint, requests, args.qps, args.duration)
+        print(f"\n{replicas} replica(s), capacity {replicas / args.latency:.0f} QPS")
+        print(format_curve(results, args.slo_p99_ms))
+        curves.append((replicas, results))
+
+    best = cheapest_config(curves, args.target_qps, args.slo_p99_ms)
+    print(f"\nCheapest size for p99 <= {args.slo_p99_ms:.0f} ms at {args.target_qps:.0f} QPS: {best} replica(s)")
+
+    print("\nGenerator ceiling (zero-latency stub):")
+    print(format_curve(sweep(FakeEndpoint(), requests, args.generator_qps, duration=1.0)))
+
+
+if __name__ == '__main__':
+    main()
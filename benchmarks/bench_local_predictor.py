@@ -0,0 +1,62 @@
+"""
+Rows/sec and per-call latency of LocalPredictor versus a remote endpoint.
+
+The remote path is simulated by a FakeEndpoint that serves the same model behind
+an injected network latency, so only the transport cost differs.
+
+Run from the project root:
+    python -m benchmarks.bench_local_predictor --latency 0.03
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+from src.cloud_utils import predict_with_endpoint
+from src.fakes import FakeEndpoint
+from src.local_predictor import LocalPredictor
+
+
+def time_calls(endpoint, rows, batch_size, repeats):
+    """Return per-call latencies for ``repeats`` calls of ``batch_size`` rows."""
+    latencies = []
+    for i in range(repeats):
+        start = (i * batch_size) % max(len(rows) - batch_size, 1)
+        batch = rows[start:start + batch_size]
+        t0 = time.perf_counter()
+        predict_with_endpoint(endpoint, batch)
+        latencies.append(time.perf_counter() - t0)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--model-type', default='random_forest')
+    parser.add_argument('--latency', type=float, default=0.03,
+                        help="Simulated network round trip of the remote path (seconds)")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    local = LocalPredictor(model_type=args.model_type)
+    print(f"Serving {local.path}")
+
+    # The stub answers with the same model so both paths do identical work
+    remote = FakeEndpoint(backend=local, latency=args.latency)
+    rng = np.random.default_rng(0)
+    rows = rng.uniform([4.0, 2.0, 1.0, 0.1], [8.0, 4.5, 7.0, 2.5],
+                       size=(max(args.batch_sizes) * 4, 4)).tolist()
+
+    print(f"{'batch':>6} {'path':>7} {'p50 ms':>9} {'p99 ms':>9} {'rows/sec':>12}")
+    for batch_size in args.batch_sizes:
+        for name, endpoint in [('local', local), ('remote', remote)]:
+            latencies = time_calls(endpoint, rows, batch_size, args.repeats)
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+            rate = batch_size * len(latencies) / latencies.sum()
+            print(f"{batch_size:>6} {name:>7} {p50:>9.2f} {p99:>9.2f} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Log calls per second: the old basicConfig setup against src.logging_config.
+
+Each case runs in a fresh interpreter (logging configuration is global) and
+logs --calls INFO records from a hot loop, to the console (discarded) and to a
+file in a temporary directory. "caller" is the rate seen by the logging
+thread. "end-to-end" also waits until every record is on disk. "queued-text"
+writes the old text format through the queue; "queued" writes JSON lines. The
+sampled case logs DEBUG records with one in --sample-every kept.
+
+Run from the project root:
+    python -m benchmarks.bench_logging --calls 200000
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+CASE_CODE = r'''
+import sys, time, json, logging
+case, calls, log_dir, sample_every = sys.argv[1], int(sys.argv[2]), sys.argv[3], int(sys.argv[4])
+if case == 'legacy':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(), logging.FileHandler(f'{log_dir}/legacy.log')]
+    )
+    logger = logging.getLogger('bench')
+    flush = logging.shutdown
+else:
+    from src.logging_config import setup_logging, shutdown_logging
+    level = logging.DEBUG if case == 'sampled' else logging.INFO
+    logger = setup_logging('bench', level=level, log_dir=log_dir, json_lines=case != 'queued-text',
+                           debug_sample_every=sample_every)
+    flush = shutdown_logging
+log = logger.debug if case == 'sampled' else logger.info
+start = time.perf_counter()
+for i in range(calls):
+    log("Processed chunk %d with %d rows", i, 100000)
+caller = time.perf_counter() - start
+flush()
+total = time.perf_counter() - start
+print(json.dumps({'caller': caller, 'total': total}))
+'''
+
+
+def run_case(case, calls, sample_every):
+    with tempfile.TemporaryDirectory() as log_dir:
+        result = subprocess.run(
+            [sys.executable, '-c', CASE_CODE, case, str(calls), log_dir, str(sample_every)],
+            check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            cwd=os.getcwd()
+        )
+        written = sum(
+            sum(1 for _ in open(os.path.join(log_dir, name))) for name in os.listdir(log_dir)
+        )
+    timings = json.loads(result.stdout)
+    return timings['caller'], timings['total'], written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200_000)
+    parser.add_argument('--sample-every', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'case':<12} {'caller calls/s':>15} {'end-to-end calls/s':>19} {'lines written':>14}")
+    for case in ('legacy', 'queued-text', 'queued', 'sampled'):
+        caller, total, written = run_case(case, args.calls, args.sample_every)
+        print(f"{case:<12} {args.calls / caller:15,.0f} {args.calls / total:19,.0f} {written:14,}")
+
+
+if __name__ == '__main__':
+    main()
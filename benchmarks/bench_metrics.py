@@ -0,0 +1,57 @@
+"""
+Per-call overhead of src.metrics instrumentation, disabled and enabled.
+
+Compares a plain function call with the same function wrapped in
+``metrics.timed``, and times bare counter and histogram updates. The
+disabled overhead is what every instrumented hot path pays by default.
+
+Run from the project root:
+    python -m benchmarks.bench_metrics --calls 1000000
+"""
+import argparse
+import timeit
+
+from src.metrics import MetricsRegistry, timed
+
+
+def per_call_ns(fn, calls, repeat=5):
+    return min(timeit.repeat(fn, number=calls, repeat=repeat)) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry(enabled=False)
+
+    def work(x):
+        return x + 1
+
+    instrumented = timed('work', registry=registry)(work)
+    counter = registry.counter('work_rows_total')
+    histogram = registry.histogram('work_size')
+
+    cases = [
+        ('plain call', lambda: work(1)),
+        ('timed call', lambda: instrumented(1)),
+        ('counter.inc', lambda: counter.inc(10)),
+        ('counter.inc labelled', lambda: counter.inc(10, outcome='ok')),
+        ('histogram.observe', lambda: histogram.observe(0.02)),
+    ]
+    results = {}
+    for enabled in (False, True):
+        registry.enabled = enabled
+        for name, fn in cases:
+            results[name, enabled] = per_call_ns(fn, args.calls)
+
+    baseline = results['plain call', False]
+    print(f"{'case':<22} {'disabled':>10} {'enabled':>10}   (ns per call, {args.calls} calls)")
+    for name, _ in cases:
+        print(f"{name:<22} {results[name, False]:10.0f} {results[name, True]:10.0f}")
+    print(f"timed() overhead: {results['timed call', False] - baseline:.0f} ns disabled, "
+          f"{results['timed call', True] - baseline:.0f} ns enabled")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Cold-start time and per-worker memory of pickle loading versus memory-mapped loading.
+
+By default a large synthetic random forest is trained so the difference is
+visible; pass --artifact to measure one of the models/*.pkl files instead.
+Memory is reported as RSS and PSS (proportional set size, which splits shared
+pages between the processes mapping them); PSS is Linux-only.
+
+Run from the project root:
+    python -m benchmarks.bench_model_loading --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import pickle
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.model_cache import ModelCache, export_mmap_model
+
+LOAD_SNIPPETS = {
+    'pickle': (
+        "from src.local_predictor import load_model_artifact\n"
+        "load_model_artifact({path!r})"
+    ),
+    'mmap': (
+        "from src.model_cache import load_mmap_model\n"
+        "load_mmap_model({path!r})"
+    ),
+}
+
+
+def train_synthetic_forest(path, n_trees, n_samples, seed=0):
+    """Train and pickle a random forest big enough to make loading costs visible."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_samples, 4))
+    y = (X[:, 2] + 0.5 * rng.normal(size=n_samples) > 0).astype(int) + (X[:, 3] > 1)
+    model = RandomForestClassifier(n_estimators=n_trees, random_state=seed).fit(X, y)
+    with open(path, 'wb') as f:
+        pickle.dump({'model': model, 'model_type': 'random_forest'}, f)
+
+
+def cold_start_seconds(mode, path, repeats):
+    """Median wall time of a fresh interpreter that imports and loads the model."""
+    code = LOAD_SNIPPETS[mode].format(path=path)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-W', 'ignore', '-c', code], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def _memory_kib():
+    """Return (rss, pss) of this process in KiB from /proc/self/smaps_rollup."""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0][:-1]] = int(parts[1])
+    return values['Rss'], values['Pss']
+
+
+def _worker(mode, path, ready, done, results):
+    import warnings
+    warnings.simplefilter('ignore')
+    from src.local_predictor import LocalPredictor, load_model_artifact
+    from src.model_cache import load_mmap_model
+
+    baseline = _memory_kib()
+    artifact = load_model_artifact(path) if mode == 'pickle' else load_mmap_model(path)
+    predictor = LocalPredictor(artifact=artifact, compiled=False, feature_names=list('abcd'))
+    # Touch every page of the model as a scoring worker would
+    predictor.predict_proba(np.random.default_rng(0).normal(size=(2000, 4)))
+    ready.wait()
+    rss, pss = _memory_kib()
+    results.put((rss - baseline[0], pss - baseline[1]))
+    done.wait()
+
+
+def worker_memory(mode, path, workers):
+    """Start ``workers`` processes that hold the model at once; return per-worker deltas."""
+    ctx = multiprocessing.get_context('spawn')
+    ready, done, results = ctx.Barrier(workers + 1), ctx.Barrier(workers + 1), ctx.Queue()
+    processes = [
+        ctx.Process(target=_worker, args=(mode, path, ready, done, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    ready.wait()
+    samples = [results.get() for _ in range(workers)]
+    done.wait()
+    for process in processes:
+        process.join()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--artifact', default=None, help="Existing .pkl to measure")
+    parser.add_argument('--trees', type=int, default=200)
+    parser.add_argument('--samples', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = args.artifact
+        if artifact is None:
+            artifact = os.path.join(tmp, 'random_forest_synthetic.pkl')
+            print(f"Training synthetic forest ({args.trees} trees, {args.samples} rows)...")
+            train_synthetic_forest(artifact, args.trees, args.samples)
+        exported = export_mmap_model(artifact, os.path.join(tmp, 'mmap'))
+        print(f"pickle size {os.path.getsize(artifact) / 1e6:.1f} MB")
+
+        paths = {'pickle': artifact, 'mmap': exported}
+        print(f"\n{'mode':>7} {'cold start s':>13} {'RSS/worker MiB':>15} {'PSS/worker MiB':>15}")
+        for mode, path in paths.items():
+            seconds = cold_start_seconds(mode, path, args.repeats)
+            samples = worker_memory(mode, path, args.workers)
+            rss = statistics.mean(s[0] for s in samples) / 1024
+            pss = statistics.mean(s[1] for s in samples) / 1024
+            print(f"{mode:>7} {seconds:>13.2f} {rss:>15.1f} {pss:>15.1f}")
+
+        cache = ModelCache(max_models=2, mmap_dir=os.path.join(tmp, 'mmap'))
+        start = time.perf_counter()
+        cache.get(exported)
+        miss = time.perf_counter() - start
+        start = time.perf_counter()
+        cache.get(exported)
+        hit = time.perf_counter() - start
+        print(f"\ncache miss {miss * 1000:.2f} ms, hit {hit * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Detection latency and API calls of fixed-interval versus adaptive job polling.
+
+Simulated training jobs (FakeJob) move through PENDING -> RUNNING -> a final
+state on random schedules. Simulated time is scaled down by --time-scale so a
+multi-hour run finishes in seconds. Latencies are reported in simulated seconds.
+
+Run from the project root:
+    python -m benchmarks.bench_monitoring --jobs 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from src.fakes import FakeJob
+from src.monitoring import TrainingMonitor
+
+
+def make_jobs(n_jobs, scale, seed=0):
+    rng = random.Random(seed)
+    jobs = []
+    for index in range(n_jobs):
+        schedule = [
+            ('PIPELINE_STATE_PENDING', rng.uniform(30, 300) * scale),
+            ('PIPELINE_STATE_RUNNING', rng.uniform(600, 3600) * scale),
+            (rng.choice(['PIPELINE_STATE_SUCCEEDED'] * 4 + ['PIPELINE_STATE_FAILED']), 0),
+        ]
+        jobs.append(FakeJob(f"job-{index}", schedule, seed=index))
+    return jobs
+
+
+def run(n_jobs, scale, min_interval, max_interval, backoff):
+    jobs = make_jobs(n_jobs, scale)
+    detected = []
+
+    def on_event(event):
+        detected.append((event.resource_name, event.new_state, time.monotonic()))
+
+    monitor = TrainingMonitor(
+        jobs,
+        min_interval=min_interval * scale,
+        max_interval=max_interval * scale,
+        backoff=backoff,
+        max_calls_per_second=1000,
+        max_concurrent_calls=n_jobs,
+        on_event=on_event
+    )
+    asyncio.run(monitor.run())
+
+    by_name = {job.resource_name: job for job in jobs}
+    latencies = []
+    for name, state, seen_at in detected:
+        job = by_name[name]
+        starts = dict(zip([s for s, _ in job.schedule[1:]], job.transition_times()))
+        if f"PIPELINE_STATE_{state}" in starts:
+            latencies.append((seen_at - job._start - starts[f"PIPELINE_STATE_{state}"]) / scale)
+    return latencies, sum(job.polls for job in jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--jobs', type=int, default=20)
+    parser.add_argument('--time-scale', type=float, default=0.002,
+                        help="Real seconds per simulated second")
+    args = parser.parse_args()
+
+    print(f"{args.jobs} jobs; latency in simulated seconds")
+    print(f"{'policy':>28} {'mean latency':>13} {'p95 latency':>12} {'status calls':>13}")
+    policies = [
+        ('fixed 300 s (old loop)', 300, 300, 1.0),
+        ('fixed 5 s', 5, 5, 1.0),
+        ('adaptive 2 s .. 30 s', 2, 30, 1.5),
+        ('adaptive 2 s .. 120 s', 2, 120, 1.5),
+    ]
+    for name, min_interval, max_interval, backoff in policies:
+        latencies, calls = run(args.jobs, args.time_scale, min_interval, max_interval, backoff)
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        print(f"{name:>28} {statistics.mean(latencies):>13.1f} {p95:>12.1f} {calls:>13}")
+
+
+if __name__ == "__main__":
+    main()
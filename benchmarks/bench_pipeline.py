@@ -0,0 +1,85 @@
+"""
+Wall-clock time of the train/deploy pipeline: sequential versus DAG scheduling,
+and a rerun resuming after a failed deployment.
+
+Uses FakeTrainingBackend with stage durations in simulated minutes, scaled by
+--time-scale seconds per minute. Training both model variants one after the
+other stands in for the old sequential script (which trained only one model).
+The variants are simulated; on Vertex AI the pipeline trains one AutoML job.
+
+Run from the project root:
+    python -m benchmarks.bench_pipeline --time-scale 0.02
+"""
+import io
+import os
+import time
+import argparse
+import tempfile
+import contextlib
+
+from cloud_train_deploy import build_pipeline
+from src.fakes import FakeTrainingBackend
+from src.pipeline import PipelineError
+
+TRAINING_DATA = "data/cloud/training_data.csv"
+TEST_DATA = "data/cloud/test_data.csv"
+
+# Simulated minutes
+UPLOAD_MINUTES = 3
+TRAIN_MINUTES = {'random_forest': 60, 'svm': 75}
+DEPLOY_MINUTES = 15
+
+
+def make_backend(scale, failures=None):
+    return FakeTrainingBackend(
+        upload_seconds=UPLOAD_MINUTES * scale,
+        train_seconds={model_type: minutes * scale for model_type, minutes in TRAIN_MINUTES.items()},
+        deploy_seconds=DEPLOY_MINUTES * scale,
+        failures=failures
+    )
+
+
+def timed_run(pipeline):
+    start = time.perf_counter()
+    # Stages print progress; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            pipeline.run()
+        except PipelineError:
+            pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--time-scale', type=float, default=0.02, help="Seconds per simulated minute")
+    args = parser.parse_args()
+    scale = args.time_scale
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def pipeline(backend, name, max_workers=None):
+            return build_pipeline(backend, TRAINING_DATA, TEST_DATA, model_types=tuple(TRAIN_MINUTES),
+                                  max_workers=max_workers,
+                                  checkpoint_path=os.path.join(tmp, f"{name}.json"))
+
+        sequential = timed_run(pipeline(make_backend(scale), 'sequential', max_workers=1))
+        dag = timed_run(pipeline(make_backend(scale), 'dag'))
+
+        backend = make_backend(scale, failures={'deploy': 1})
+        failing = pipeline(backend, 'resume')
+        first = timed_run(failing)
+        resumed = timed_run(failing)
+
+    def minutes(seconds):
+        return f"{seconds / scale:6.1f} min"
+
+    print("Simulated wall clock (model variants: random_forest, svm)")
+    print(f"sequential              {minutes(sequential)}")
+    print(f"DAG                     {minutes(dag)}  ({sequential / dag:.2f}x faster)")
+    print(f"failed at deploy        {minutes(first)}")
+    print(f"resumed rerun           {minutes(resumed)}  "
+          f"(trainings run: {backend.count('train')}, uploads: {backend.count('upload')})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Hit rate and request latency of the prediction cache on a skewed replay.
+
+Requests replay feature vectors drawn from a pool with Zipf-distributed
+popularity, so a few inputs make up most of the traffic, as in production.
+Each request is sent through predict_with_endpoint to a FakeEndpoint with a
+fixed per-call latency, once directly and once through a PredictionCache.
+A small share of repeats carries float noise below the quantization step.
+The cached run also shows a deploy halfway through, which invalidates the
+endpoint's entries.
+
+Run from the project root:
+    python -m benchmarks.bench_prediction_cache --requests 5000 --pool 5000 --zipf 1.2
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.cloud_utils import predict_with_endpoint
+from src.fakes import FakeEndpoint
+from src.prediction_cache import PredictionCache
+
+FEATURES = ['sepal length (cm)', 'sepal width (cm)', 'petal length (cm)', 'petal width (cm)']
+
+
+def make_requests(n_requests, pool_size, zipf, batch, seed=0):
+    """Build each request's instances; popularity of pool entries follows Zipf's law."""
+    rng = np.random.default_rng(seed)
+    pool = np.round(rng.uniform([4.0, 2.0, 1.0, 0.1], [8.0, 4.5, 7.0, 2.5], size=(pool_size, 4)), 1)
+    weights = 1.0 / np.arange(1, pool_size + 1) ** zipf
+    picks = rng.choice(pool_size, size=(n_requests, batch), p=weights / weights.sum())
+    noise = rng.random((n_requests, batch)) < 0.05
+    requests = []
+    for rows, noisy in zip(picks, noise):
+        values = pool[rows] + np.where(noisy, 1e-9, 0.0)[:, None]
+        requests.append([dict(zip(FEATURES, row)) for row in values.tolist()])
+    return requests
+
+
+def replay(requests, endpoint, cache=None, on_halfway=None):
+    latencies = []
+    start = time.perf_counter()
+    for index, instances in enumerate(requests):
+        if on_halfway is not None and index == len(requests) // 2:
+            on_halfway()
+        t = time.perf_counter()
+        predict_with_endpoint(endpoint, instances, cache=cache)
+        latencies.append(time.perf_counter() - t)
+    return np.array(latencies), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--pool', type=int, default=5000, help="Distinct feature vectors")
+    parser.add_argument('--zipf', type=float, default=1.2, help="Zipf exponent of input popularity")
+    parser.add_argument('--batch', type=int, default=4, help="Instances per request")
+    parser.add_argument('--latency', type=float, default=0.005, help="Seconds per endpoint call")
+    parser.add_argument('--max-entries', type=int, default=1000)
+    args = parser.parse_args()
+
+    requests = make_requests(args.requests, args.pool, args.zipf, args.batch)
+    print(f"{args.requests} requests of {args.batch} instances, {args.pool} distinct inputs, "
+          f"zipf {args.zipf}, {args.latency * 1000:.0f} ms per call")
+
+    direct = FakeEndpoint(latency=args.latency)
+    direct_latencies, direct_seconds = replay(requests, direct)
+
+    cached = FakeEndpoint(latency=args.latency)
+    cache = PredictionCache(max_entries=args.max_entries)
+    # What deploy_model does to the entries of the endpoint it deploys to
+    cached_latencies, cached_seconds = replay(
+        requests, cached, cache, on_halfway=lambda: cache.invalidate(cached.resource_name)
+    )
+
+    print(f"\n{'':<10}{'calls':>8}{'instances':>11}{'p50 ms':>9}{'p99 ms':>9}{'total s':>9}")
+    for name, endpoint, latencies, seconds in [
+        ('direct', direct, direct_latencies, direct_seconds),
+        ('cached', cached, cached_latencies, cached_seconds),
+    ]:
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"{name:<10}{endpoint.calls:>8}{endpoint.instances_seen:>11}{p50:>9.2f}{p99:>9.2f}{seconds:>9.2f}")
+
+    stats = cache.summary()
+    lookups = stats['hits'] + stats['misses']
+    print(f"\nhit rate {stats['hit_rate']:.1%}, {stats['entries']} entries ({stats['bytes'] / 1e3:.0f} kB), "
+          f"{stats['evictions']} evictions, {stats['invalidated']} invalidated by the deploy")
+    print(f"lookup {stats['lookup_seconds'] / lookups * 1e6:.1f} us per instance, "
+          f"endpoint {stats['mean_endpoint_seconds'] * 1000:.2f} ms per miss call")
+
+
+if __name__ == '__main__':
+    main()
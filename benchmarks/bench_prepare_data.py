@@ -0,0 +1,74 @@
+"""
+Peak memory and wall time of prepare_data, in-memory versus streaming.
+
+Each run happens in a fresh interpreter so peak RSS (ru_maxrss) is not
+inflated by earlier runs. The streaming run's peak should stay flat as the
+input grows while the in-memory run grows with it.
+
+Run from the project root:
+    python -m benchmarks.bench_prepare_data --rows 200000 1000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+FEATURES = ['sepal length (cm)', 'sepal width (cm)', 'petal length (cm)', 'petal width (cm)']
+
+RUN_SNIPPET = (
+    "import logging, resource, time\n"
+    "logging.disable(logging.CRITICAL)\n"
+    "import prepare_cloud_data\n"
+    "start = time.perf_counter()\n"
+    "prepare_cloud_data.prepare_data({input!r}, {output!r}, chunksize={chunksize!r})\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+)
+
+
+def write_synthetic_input(path, n_rows, block=250_000, seed=0):
+    """Write an iris-shaped CSV of ``n_rows`` rows without holding it all in memory."""
+    rng = np.random.default_rng(seed)
+    header = True
+    for start in range(0, n_rows, block):
+        n = min(block, n_rows - start)
+        frame = pd.DataFrame(rng.normal(5.0, 1.0, size=(n, len(FEATURES))), columns=FEATURES)
+        frame['target'] = rng.integers(0, 3, size=n)
+        frame.to_csv(path, mode='w' if header else 'a', header=header, index=False)
+        header = False
+
+
+def run(input_path, output_dir, chunksize):
+    code = RUN_SNIPPET.format(input=input_path, output=output_dir, chunksize=chunksize)
+    result = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-c', code], check=True, capture_output=True, text=True
+    )
+    elapsed, max_rss_kb = result.stdout.split()
+    return float(elapsed), int(max_rss_kb) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[200_000, 1_000_000])
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'mode':>10} {'seconds':>9} {'peak MB':>9} {'test share':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            input_path = os.path.join(tmp, f'input_{n_rows}.csv')
+            write_synthetic_input(input_path, n_rows)
+            for mode, chunksize in (('in-memory', None), ('streaming', args.chunksize)):
+                output_dir = os.path.join(tmp, f'{mode}_{n_rows}')
+                elapsed, peak_mb = run(input_path, output_dir, chunksize)
+                with open(os.path.join(output_dir, 'test_data.csv')) as f:
+                    n_test = sum(1 for _ in f) - 1
+                print(f"{n_rows:>10} {mode:>10} {elapsed:>9.2f} {peak_mb:>9.0f} {n_test / n_rows:>11.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Startup time of the ``python -m src`` CLI against a startup budget.
+
+Each case runs in a fresh interpreter. Wall time is the best of --repeat runs;
+import time is the total reported by ``python -X importtime`` and the
+heaviest modules it lists show what a regression pulled in. "eager imports"
+loads what every entry point used to import at the top (the Vertex AI SDK,
+pandas and sklearn) for comparison. The script exits non-zero when a budgeted
+case goes over --budget.
+
+Run from the project root:
+    python -m benchmarks.bench_startup --budget 0.5
+"""
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+CASES = [
+    ('--help', ['-m', 'src', '--help'], True),
+    ('status --help', ['-m', 'src', 'status', '--help'], True),
+    ('status imports', ['-c', 'import src.cli, check_training_status, src.job_status'], True),
+    ('eager imports', ['-c', 'import google.cloud.aiplatform, pandas, sklearn.model_selection'], False),
+]
+
+_IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def wall_time(args, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def import_profile(args):
+    """Return total import seconds and the heaviest top-level imports."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], check=True, capture_output=True, text=True)
+    top_level = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        # Nesting depth is the indentation of the module name; depth 1 is top-level
+        if match and len(match.group(3)) == 1:
+            top_level.append((int(match.group(2)) / 1e6, match.group(4)))
+    return sum(seconds for seconds, _ in top_level), sorted(top_level, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget', type=float, default=0.5, help="Wall seconds allowed per budgeted case")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    over_budget = []
+    print(f"{'case':<16} {'wall':>8} {'imports':>8}  heaviest imports")
+    for name, case_args, budgeted in CASES:
+        wall = wall_time(case_args, args.repeat)
+        imports, heaviest = import_profile(case_args)
+        top = ', '.join(f"{module} {seconds * 1000:.0f}ms" for seconds, module in heaviest[:3])
+        flag = ' OVER BUDGET' if budgeted and wall > args.budget else ''
+        print(f"{name:<16} {wall:7.3f}s {imports:7.3f}s  {top}{flag}")
+        if flag:
+            over_budget.append(name)
+
+    if over_budget:
+        print(f"Over the {args.budget}s budget: {', '.join(over_budget)}")
+        sys.exit(1)
+    print(f"All budgeted cases under {args.budget}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Throughput of the synthetic data generator versus the original per-class loop.
+
+Compares in-memory generation against the original implementation, then
+streams a larger dataset to Parquet with 1..N worker processes. The streaming
+run reports peak RSS, which should depend on the chunk size, not the row count.
+
+Run from the project root:
+    python -m benchmarks.bench_synthetic_data --rows 1000000 --stream-rows 10000000
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.datasets import load_iris
+from sklearn.preprocessing import StandardScaler
+
+from src.data_format import DatasetWriter
+from src.synthetic_data import fit_class_gaussians, generate_synthetic_data, iter_synthetic_chunks
+
+
+def legacy_generate_synthetic_data(X, y, n_synthetic=1000):
+    """The original download_dataset implementation."""
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    synthetic_data = []
+    synthetic_labels = []
+    for class_label in np.unique(y):
+        class_samples = X_scaled[y == class_label]
+        mean = np.mean(class_samples, axis=0)
+        cov = np.cov(class_samples.T)
+        n_synthetic_per_class = n_synthetic // len(np.unique(y))
+        synthetic = np.random.multivariate_normal(mean, cov, n_synthetic_per_class)
+        synthetic = scaler.inverse_transform(synthetic)
+        synthetic_data.append(synthetic)
+        synthetic_labels.extend([class_label] * n_synthetic_per_class)
+    return np.vstack(synthetic_data), np.array(synthetic_labels)
+
+
+def stream_to_parquet(model, path, n_rows, chunksize, n_jobs, feature_names):
+    with DatasetWriter(path) as writer:
+        for X, y in iter_synthetic_chunks(model, n_rows, chunksize=chunksize, random_state=0, n_jobs=n_jobs):
+            df = pd.DataFrame(X, columns=feature_names)
+            df['target'] = y
+            writer.write(df)
+    return writer.rows_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--stream-rows', type=int, default=10_000_000)
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    iris = load_iris()
+    print(f"In-memory generation of {args.rows:,} rows")
+    for name, fn in (
+        ('legacy loop', lambda: legacy_generate_synthetic_data(iris.data, iris.target, args.rows)),
+        ('vectorized', lambda: generate_synthetic_data(iris.data, iris.target, args.rows, random_state=0)),
+    ):
+        start = time.perf_counter()
+        X, _ = fn()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>14} {elapsed:>8.3f} s {len(X) / elapsed / 1e6:>8.1f} M rows/s  ({len(X):,} rows)")
+
+    model = fit_class_gaussians(iris.data, iris.target)
+    print(f"\nStreaming {args.stream_rows:,} rows to Parquet in chunks of {args.chunksize:,}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_jobs in sorted(set(args.jobs)):
+            path = os.path.join(tmp, f'synthetic_{n_jobs}.parquet')
+            start = time.perf_counter()
+            n_rows = stream_to_parquet(model, path, args.stream_rows, args.chunksize, n_jobs, iris.feature_names)
+            elapsed = time.perf_counter() - start
+            print(f"{n_jobs:>3} jobs {elapsed:>8.2f} s {n_rows / elapsed / 1e6:>8.2f} M rows/s "
+                  f"{os.path.getsize(path) / 2 ** 20:>8.0f} MB on disk")
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Peak RSS of this process: {peak_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
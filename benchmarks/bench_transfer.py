@@ -0,0 +1,58 @@
+"""
+Upload throughput of single-shot versus parallel composite uploads.
+
+Uses a FakeStorageClient whose per-request bandwidth is capped, which models
+the per-connection throughput limit that makes single-stream uploads slow.
+
+Run from the project root:
+    python -m benchmarks.bench_transfer --size-mb 256 --bandwidth-mb 100
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src.fakes import FakeStorageClient
+from src.transfer import upload_file
+
+MB = 1024 * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--bandwidth-mb', type=float, default=100.0,
+                        help="Simulated bandwidth of a single request, MB/s")
+    parser.add_argument('--part-mb', type=int, default=16)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'payload.bin')
+        with open(path, 'wb') as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(MB))
+
+        print(f"{args.size_mb} MB file, {args.bandwidth_mb:.0f} MB/s per request, "
+              f"{args.part_mb} MB parts")
+        print(f"{'mode':>18} {'seconds':>9} {'MB/s':>9}")
+
+        runs = [('single-shot', None)] + [(f'composite x{w}', w) for w in args.workers]
+        for name, workers in runs:
+            client = FakeStorageClient(
+                os.path.join(tmp, 'bucket'), bytes_per_second=args.bandwidth_mb * MB
+            )
+            options = {'composite_threshold': float('inf')} if workers is None else {
+                'composite_threshold': 0,
+                'part_size': args.part_mb * MB,
+                'max_workers': workers
+            }
+            start = time.perf_counter()
+            upload_file(path, 'payload.bin', bucket=client.bucket('bench'),
+                        state_dir=os.path.join(tmp, 'state'), **options)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>18} {elapsed:>9.2f} {args.size_mb / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Time and peak extra memory of validate_frame versus the original validate_data.
+
+The original implementation is reproduced here as the baseline: two isnull
+scans, two select_dtypes calls and a full ``.values`` copy for np.isinf.
+
+Run from the project root:
+    python -m benchmarks.bench_validation --rows 10000000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.validation import validate_frame
+
+FEATURES = ['sepal length (cm)', 'sepal width (cm)', 'petal length (cm)', 'petal width (cm)']
+SCHEMA = {name: {'min': 0.0, 'max': 100.0} for name in FEATURES}
+
+
+def legacy_validate_data(df):
+    """The pre-validate_frame implementation from prepare_cloud_data."""
+    if df.isnull().any().any():
+        null_cols = df.columns[df.isnull().any()].tolist()
+        raise ValueError(f"Found null values in columns: {null_cols}")
+    non_numeric = df.select_dtypes(exclude=['number']).columns
+    if len(non_numeric) > 1:
+        raise ValueError(f"Found non-numeric features: {non_numeric}")
+    if np.isinf(df.select_dtypes(include=['number']).values).any():
+        raise ValueError("Found infinite values in the dataset")
+    return True
+
+
+def synthetic_frame(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({name: rng.normal(5.0, 1.0, size=n_rows) for name in FEATURES})
+    frame['target'] = rng.integers(0, 3, size=n_rows)
+    return frame
+
+
+def measure(fn, repeats):
+    """Best wall time and peak traced allocation of ``fn()``."""
+    times = []
+    tracemalloc.start()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    print(f"{args.rows:,} rows, {df.memory_usage().sum() / 2 ** 20:.0f} MB frame")
+    print(f"{'implementation':>28} {'seconds':>9} {'peak MB':>9}")
+    runs = [
+        ('legacy validate_data', lambda: legacy_validate_data(df)),
+        ('validate_frame', lambda: validate_frame(df)),
+        ('validate_frame + schema', lambda: validate_frame(df, schema=SCHEMA, min_class_fraction=0.1)),
+    ]
+    for name, fn in runs:
+        seconds, peak_mb = measure(fn, args.repeats)
+        print(f"{name:>28} {seconds:>9.3f} {peak_mb:>9.1f}")
+
+    # A dirty frame: the legacy check stops at the first problem, the report lists all
+    dirty = df.head(1_000_000).copy()
+    dirty.iloc[[10, 20], 0] = np.nan
+    dirty.iloc[[30], 2] = np.inf
+    dirty.iloc[[40], 3] = -1.0
+    report = validate_frame(dirty, schema=SCHEMA)
+    print("\nDirty frame report:")
+    for error in report.errors:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
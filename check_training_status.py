@@ -1,11 +1,40 @@
 import os
-from google.cloud import aiplatform
+import argparse
 from dotenv import load_dotenv
-import time
 
-def get_job_status():
-    """Get the status of all training jobs."""
+from src.job_status import (
+    DEFAULT_CACHE_PATH, JobStatusCache, fetch_job_records, filter_records,
+    paginate, format_table, format_json
+)
+
+def get_job_status(states=None, name_contains=None, created_after=None, page=1, page_size=20,
+                   output_format='table', max_workers=16, use_cache=True, refresh=False,
+                   cache_path=DEFAULT_CACHE_PATH):
+    """
+    Get the status of training jobs.
+    
+    Job details are fetched concurrently, and finished jobs are served from a
+    local cache instead of being fetched again.
+    
+    Args:
+        states (list, optional): Only show jobs in these states, e.g. ["RUNNING"]
+        name_contains (str, optional): Only show jobs whose name contains this text
+        created_after (str, optional): Only show jobs created after this ISO timestamp
+        page (int): Page to show, starting at 1
+        page_size (int): Jobs per page
+        output_format (str): "table" or "json"
+        max_workers (int): Concurrent job detail requests
+        use_cache (bool): Read and update the cache of finished jobs
+        refresh (bool): Fetch every job again, even cached ones
+        cache_path (str): Location of the cache file
+        
+    Returns:
+        list: Records of the jobs shown, or False on error
+    """
     try:
+        # Imported here so --help and argument errors return immediately
+        from google.cloud import aiplatform
+        
         # Initialize Vertex AI
         aiplatform.init(
             project=os.getenv('GOOGLE_CLOUD_PROJECT'),
@@ -17,45 +46,56 @@ def get_job_status():
         
         if not jobs:
             print("No training jobs found.")
-            return
+            return []
         
-        print("\nTraining Jobs Status:")
-        print("=" * 50)
+        cache = JobStatusCache(cache_path) if use_cache else None
+        records = fetch_job_records(jobs, cache=cache, max_workers=max_workers, refresh=refresh)
+        records = filter_records(records, states=states, name_contains=name_contains,
+                                 created_after=created_after)
+        shown, total_pages = paginate(records, page=page, page_size=page_size)
         
-        for job in jobs:
-            # Get detailed job information
-            job_info = job.to_dict()
-            
-            print(f"\nJob Name: {job_info.get('display_name', 'N/A')}")
-            print(f"Status: {job_info.get('state', 'N/A')}")
-            print(f"Create Time: {job_info.get('create_time', 'N/A')}")
-            print(f"Start Time: {job_info.get('start_time', 'N/A')}")
-            print(f"End Time: {job_info.get('end_time', 'N/A') or 'Still running'}")
-            
-            # If job has error
-            if job_info.get('error'):
-                print(f"Error: {job_info['error']}")
-            
-            # If job has metrics
-            if job_info.get('final_model_stats'):
-                print("\nModel Statistics:")
-                stats = job_info['final_model_stats']
-                for metric, value in stats.items():
-                    print(f"  {metric}: {value}")
-            
-            print("-" * 50)
+        if output_format == 'json':
+            print(format_json(shown))
+        else:
+            print("\nTraining Jobs Status:")
+            print("=" * 50)
+            print(format_table(shown))
+            print(f"\nPage {page} of {total_pages} ({len(records)} matching jobs)")
+        return shown
     except Exception as e:
         print(f"Error checking job status: {str(e)}")
         return False
 
-def main():
-    print("Loading environment variables...")
-    load_dotenv()
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Show the status of training jobs")
+    parser.add_argument('--state', action='append', dest='states',
+                        help="Only show jobs in this state (repeatable), e.g. RUNNING")
+    parser.add_argument('--name', help="Only show jobs whose name contains this text")
+    parser.add_argument('--since', help="Only show jobs created after this ISO timestamp")
+    parser.add_argument('--page', type=int, default=1, help="Page to show")
+    parser.add_argument('--page-size', type=int, default=20, help="Jobs per page")
+    parser.add_argument('--format', choices=['table', 'json'], default='table', help="Output format")
+    parser.add_argument('--workers', type=int, default=16, help="Concurrent job detail requests")
+    parser.add_argument('--no-cache', action='store_true', help="Do not use the finished-job cache")
+    parser.add_argument('--refresh', action='store_true', help="Fetch every job again")
+    args = parser.parse_args(argv)
     
-    print(f"Checking training jobs in project: {os.getenv('GOOGLE_CLOUD_PROJECT')}")
-    print(f"Region: {os.getenv('GOOGLE_CLOUD_REGION')}")
+    load_dotenv()
+    if args.format == 'table':
+        print(f"Checking training jobs in project: {os.getenv('GOOGLE_CLOUD_PROJECT')}")
+        print(f"Region: {os.getenv('GOOGLE_CLOUD_REGION')}")
     
-    get_job_status()
+    get_job_status(
+        states=args.states,
+        name_contains=args.name,
+        created_after=args.since,
+        page=args.page,
+        page_size=args.page_size,
+        output_format=args.format,
+        max_workers=args.workers,
+        use_cache=not args.no_cache,
+        refresh=args.refresh
+    )
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,62 +1,160 @@
 import os
-from src.cloud_utils import (
-    upload_data_to_cloud,
-    train_model_on_cloud,
-    deploy_model,
-    predict_with_endpoint
-)
-import pandas as pd
+import argparse
+from src.cloud_utils import AUTOML_MODEL_TYPE, VertexAIBackend
+from src.batch_predict import predict_in_batches
+from src.data_format import as_csv, find_dataset, read_dataset
+from src.pipeline import DEFAULT_CHECKPOINT_DIR, Pipeline, PipelineError, Stage
 from dotenv import load_dotenv
 
-def main():
+CHECKPOINT_PATH = os.path.join(DEFAULT_CHECKPOINT_DIR, 'train_deploy.json')
+
+def _file_key(path):
+    """Identify a file's content cheaply, so changed data invalidates its checkpoint."""
+    stat = os.stat(path)
+    return {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def build_pipeline(
+    backend,
+    training_data_path,
+    test_data_path,
+    model_types=(AUTOML_MODEL_TYPE,),
+    display_name="iris_classifier_v4",
+    training_params=None,
+    machine_type="n1-standard-4",
+    checkpoint_path=CHECKPOINT_PATH,
+    max_workers=None
+):
+    """
+    Build the train-and-deploy pipeline.
+    
+    Stages and their dependencies::
+    
+        upload_training -> train_<model_type> (one per variant, in parallel) -> select_model -> deploy -> predict
+        upload_test (while training) ---------------------------------------------------------------^
+    
+    Args:
+        backend: VertexAIBackend, or src.fakes.FakeTrainingBackend for local runs
+        training_data_path (str): Training dataset (Parquet is converted to CSV for upload)
+        test_data_path (str): Test dataset scored against the deployed model
+        model_types (tuple): Model variants trained concurrently; the best by log loss is deployed.
+            VertexAIBackend trains one AutoML job ("automl"), since AutoML picks
+            the algorithm itself; several variants need a backend whose training
+            depends on the model type, such as FakeTrainingBackend.
+        display_name (str): Prefix of the training job names
+        training_params (dict, optional): Passed to every training run
+        machine_type (str): Machine type of the endpoint
+        checkpoint_path (str, optional): Where completed stages are recorded
+        max_workers (int, optional): Stages running at once
+    
+    Returns:
+        Pipeline: Call ``run()`` to execute or resume it
+    """
+    training_params = training_params or {}
+    
+    def train_stage(model_type):
+        def train(upload_training):
+            name = f"{display_name}_{model_type}"
+            params = dict(training_params, model_display_name=name)
+            print(f"\nTraining {model_type} model...")
+            return backend.train(name, upload_training, "target", model_type, params)
+        return train
+    
+    def select_model(**models):
+        scored = {}
+        for stage, model_name in models.items():
+            scored[model_name] = backend.evaluate(model_name)
+            print(f"{stage}: {scored[model_name]}")
+        best = min(scored, key=lambda name: scored[name].get('logLoss', float('inf')))
+        return {'model': best, 'metrics': scored[best]}
+    
+    def deploy(select_model):
+        print(f"\nDeploying model {select_model['model']}...")
+        return backend.deploy(select_model['model'], machine_type=machine_type)
+    
+    def predict(deploy, upload_test):
+        print("\nTesting predictions...")
+        test_data = read_dataset(test_data_path)
+        # Remove target column from test data
+        test_features = test_data.drop('target', axis=1)
+    
+        # Score the whole test set in size-bounded, concurrent batches
+        predictions = predict_in_batches(backend.endpoint(deploy), test_features, encode=True)
+        print(f"\nScored {len(test_features)} test instances")
+        print("\nSample predictions:")
+        sample = test_features.head(5).to_dict('records')
+        for row, instance in enumerate(sample):
+            print(f"Input: {instance}")
+            print(f"Prediction: {_prediction_at(predictions, row)}\n")
+        return {'endpoint': deploy, 'n_scored': len(test_features), 'test_data_uri': upload_test}
+    
+    train_stages = [f"train_{model_type}" for model_type in model_types]
+    stages = [
+        # Vertex AI tabular datasets are created from CSV, so Parquet output is converted
+        Stage('upload_training', lambda: backend.upload(as_csv(training_data_path)),
+              key=_file_key(training_data_path)),
+        Stage('upload_test', lambda: backend.upload(as_csv(test_data_path)),
+              key=_file_key(test_data_path)),
+        *[
+            Stage(stage, train_stage(model_type), deps=['upload_training'],
+                  key={'model_type': model_type, 'params': training_params})
+            for stage, model_type in zip(train_stages, model_types)
+        ],
+        # Keyed on the variants, so dropping or adding one re-runs the choice
+        Stage('select_model', select_model, deps=train_stages, key={'model_types': list(model_types)}),
+        Stage('deploy', deploy, deps=['select_model'], key={'machine_type': machine_type}),
+        Stage('predict', predict, deps=['deploy', 'upload_test'], key=_file_key(test_data_path)),
+    ]
+    return Pipeline(
+        stages,
+        checkpoint_path=checkpoint_path,
+        max_workers=max_workers,
+        on_stage_done=lambda name, output: print(f"[pipeline] {name} done")
+    )
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Train, deploy and test models on Vertex AI")
+    parser.add_argument('--restart', action='store_true',
+                        help="Ignore completed stages from a previous run")
+    parser.add_argument('--model-types', nargs='+', default=[AUTOML_MODEL_TYPE],
+                        help="Model variants trained in parallel (Vertex AI AutoML takes only 'automl')")
+    args = parser.parse_args(argv)
+    if len(args.model_types) > 1:
+        # Every variant would be the same AutoML job, billed once per variant
+        parser.error("Vertex AI trains one AutoML job; several --model-types only run on the fake backend")
+    
     # Load environment variables
     load_dotenv()
     
-    # Upload training data to cloud storage
-    print("Uploading training data to Cloud Storage...")
-    training_data_path = "data/cloud/training_data.csv"
-    dataset_uri = upload_data_to_cloud(training_data_path)
-    
     # Define advanced training parameters
     training_params = {
         "target_column": "target",
         "prediction_type": "classification",
         "budget_milli_node_hours": 2000,
-        "model_display_name": "iris_classifier_v4",
         "optimization_objective": "minimize-log-loss",  # Fixed for multi-class classification
         "training_fraction_split": 0.8,
         "validation_fraction_split": 0.1,
         "test_fraction_split": 0.1
     }
     
-    # Train Random Forest model with advanced configuration
-    print("\nTraining Random Forest model...")
-    rf_model = train_model_on_cloud(
-        display_name="iris_classifier_v4",
-        dataset_uri=dataset_uri,
-        target_column="target",
-        model_type="random_forest",
+    pipeline = build_pipeline(
+        VertexAIBackend(),
+        find_dataset("data/cloud", "training_data"),
+        find_dataset("data/cloud", "test_data"),
+        model_types=tuple(args.model_types),
         training_params=training_params
     )
-    
-    # Deploy the model
-    print("\nDeploying model...")
-    endpoint = deploy_model(
-        rf_model,
-        machine_type="n1-standard-4"  # Using a more powerful machine for deployment
-    )
-    
-    # Test predictions
-    print("\nTesting predictions...")
-    test_data = pd.read_csv("data/cloud/test_data.csv")
-    # Remove target column from test data
-    test_instances = test_data.drop('target', axis=1).to_dict('records')
-    
-    predictions = predict_with_endpoint(endpoint, test_instances[:5])
-    print("\nSample predictions:")
-    for instance, prediction in zip(test_instances[:5], predictions):
-        print(f"Input: {instance}")
-        print(f"Prediction: {prediction}\n")
+    try:
+        outputs = pipeline.run(resume=not args.restart)
+    except PipelineError as e:
+        print(f"\n{e}. Completed stages are saved; rerun to resume.")
+        raise
+    print(f"\nDeployed {outputs['select_model']['model']} to {outputs['deploy']}")
+
+def _prediction_at(predictions, row):
+    """Return the prediction for one row of a columnar prediction result."""
+    if isinstance(predictions, dict):
+        return {key: values[row].tolist() for key, values in predictions.items()}
+    return predictions[row]
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
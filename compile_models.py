@@ -0,0 +1,59 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from src.compiled_forest import compile_forest
+from src.local_predictor import list_model_artifacts, load_model_artifact
+from src.data_format import read_dataset
+
+def verify_compiled(model, compiled, X):
+    """
+    Check that a compiled forest reproduces the original model exactly.
+    
+    Args:
+        model: Fitted RandomForestClassifier
+        compiled (CompiledForest): Compiled version of ``model``
+        X (np.ndarray): Rows to compare predictions on
+    
+    Returns:
+        bool: True if probabilities are bit-identical
+    """
+    model_input = X
+    if getattr(model, 'feature_names_in_', None) is not None:
+        model_input = pd.DataFrame(X, columns=model.feature_names_in_)
+    return np.array_equal(model.predict_proba(model_input), compiled.predict_proba(X))
+
+def compile_artifact(path, output_dir, X_check):
+    """Compile one random forest artifact and save it under output_dir."""
+    artifact = load_model_artifact(path)
+    compiled = compile_forest(artifact['model'])
+    
+    if not verify_compiled(artifact['model'], compiled, X_check):
+        raise ValueError(f"Compiled forest for {path} does not match the original model")
+    
+    stem = os.path.splitext(os.path.basename(path))[0]
+    output_path = os.path.join(output_dir, stem)
+    compiled.save(output_path)
+    print(f"Compiled {path} -> {output_path} "
+          f"({compiled.n_trees} trees, {compiled.nbytes / 1024:.1f} KiB)")
+    return output_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile random forest artifacts to array form")
+    parser.add_argument('paths', nargs='*', help="Artifacts to compile (default: all random forests)")
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--output-dir', default='models/compiled')
+    parser.add_argument('--check-data', default='data/raw/iris.csv',
+                        help="Dataset (Parquet or CSV) whose feature rows verify each compiled forest")
+    args = parser.parse_args()
+    
+    paths = args.paths or [
+        path for _, _, path in list_model_artifacts(args.model_dir, 'random_forest')
+    ]
+    X_check = read_dataset(args.check_data).drop('target', axis=1).to_numpy()
+    
+    for path in paths:
+        compile_artifact(path, args.output_dir, X_check)
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,102 @@
 import os
+import logging
+import argparse
 import pandas as pd
 import numpy as np
 from sklearn.datasets import load_iris
-from sklearn.preprocessing import StandardScaler
 from src.utils import setup_logging, ensure_directory_exists
+from src.data_format import DEFAULT_FORMAT, FORMAT_EXTENSIONS, DatasetWriter, dataset_path
+from src.synthetic_data import (
+    DEFAULT_CHUNKSIZE,
+    fit_class_gaussians,
+    generate_synthetic_data,  # kept importable from here for existing callers
+    iter_synthetic_chunks
+)
 
-# Set up logging
-logger = setup_logging('dataset_download')
+# Handlers are attached in main(), so importing this module has no side effects
+logger = logging.getLogger('dataset_download')
 
-def generate_synthetic_data(X, y, n_synthetic=1000):
-    """Generate synthetic data points based on the original data."""
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+def download_iris_dataset(
+    output_format=DEFAULT_FORMAT,
+    n_samples=1200,
+    priors=None,
+    random_state=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+    n_jobs=1,
+    output_path=None
+):
+    """
+    Download and save the Iris dataset with synthetic data.
     
-    synthetic_data = []
-    synthetic_labels = []
+    Rows are generated and written chunk by chunk, so datasets of tens of
+    millions of rows never have to fit in memory (see src.synthetic_data).
     
-    # Generate synthetic samples for each class
-    for class_label in np.unique(y):
-        # Get samples for this class
-        class_samples = X_scaled[y == class_label]
-        
-        # Calculate mean and covariance
-        mean = np.mean(class_samples, axis=0)
-        cov = np.cov(class_samples.T)
-        
-        # Generate synthetic samples
-        n_synthetic_per_class = n_synthetic // len(np.unique(y))
-        synthetic = np.random.multivariate_normal(mean, cov, n_synthetic_per_class)
-        
-        # Transform back to original scale
-        synthetic = scaler.inverse_transform(synthetic)
-        
-        synthetic_data.append(synthetic)
-        synthetic_labels.extend([class_label] * n_synthetic_per_class)
-    
-    # Combine all synthetic data
-    X_synthetic = np.vstack(synthetic_data)
-    y_synthetic = np.array(synthetic_labels)
-    
-    return X_synthetic, y_synthetic
-
-def download_iris_dataset():
-    """Download and save the Iris dataset with synthetic data."""
+    Args:
+        output_format (str): "parquet" or "csv" (see src.data_format)
+        n_samples (int): Exact number of rows to generate
+        priors (list, optional): Class weights; defaults to equal weights
+        random_state (int, optional): Seed for reproducible output
+        chunksize (int): Rows generated and written per chunk
+        n_jobs (int): Worker processes used to generate chunks
+        output_path (str, optional): Defaults to data/raw/iris.<format>
+    """
     # Load the iris dataset
     iris = load_iris()
-    
-    # Generate synthetic data
-    X_synthetic, y_synthetic = generate_synthetic_data(
-        iris.data, 
-        iris.target,
-        n_synthetic=1200  # Generate 1200 samples (400 per class)
-    )
-    
-    # Create a DataFrame with synthetic data
-    df = pd.DataFrame(data=X_synthetic, columns=iris.feature_names)
-    df['target'] = y_synthetic
+    model = fit_class_gaussians(iris.data, iris.target)
     
     # Create raw data directory if it doesn't exist
-    ensure_directory_exists('data/raw')
+    output_path = output_path or dataset_path('data/raw', 'iris', output_format)
+    ensure_directory_exists(os.path.dirname(output_path) or '.')
     
-    # Save the dataset
-    output_path = 'data/raw/iris.csv'
-    df.to_csv(output_path, index=False)
+    # Generate and save the dataset chunk by chunk
+    class_counts = np.zeros(len(model['classes']), dtype=np.int64)
+    chunks = iter_synthetic_chunks(
+        model,
+        n_samples,
+        priors=priors,
+        chunksize=chunksize,
+        random_state=random_state,
+        n_jobs=n_jobs
+    )
+    with DatasetWriter(output_path) as writer:
+        for X_synthetic, y_synthetic in chunks:
+            df = pd.DataFrame(data=X_synthetic, columns=iris.feature_names)
+            df['target'] = y_synthetic
+            writer.write(df)
+            class_counts += np.bincount(
+                np.searchsorted(model['classes'], y_synthetic), minlength=len(class_counts)
+            )
     
     logger.info(f"Dataset downloaded and saved to {output_path}")
-    logger.info(f"Dataset shape: {df.shape}")
+    logger.info(f"Dataset shape: ({writer.rows_written}, {len(iris.feature_names) + 1})")
     logger.info(f"Features: {', '.join(iris.feature_names)}")
     logger.info(f"Number of classes: {len(iris.target_names)}")
     logger.info(f"Classes: {', '.join(iris.target_names)}")
-    logger.info(f"Samples per class:\n{pd.Series(y_synthetic).value_counts()}")
+    logger.info(f"Samples per class:\n{pd.Series(class_counts, index=model['classes'])}")
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Generate the synthetic Iris dataset")
+    parser.add_argument('--rows', type=int, default=1200, help="Exact number of rows")
+    parser.add_argument('--priors', type=float, nargs='+', default=None,
+                        help="Class weights, e.g. 0.5 0.3 0.2 (default: equal)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes")
+    parser.add_argument('--format', choices=list(FORMAT_EXTENSIONS), default=DEFAULT_FORMAT)
+    parser.add_argument('--output', default=None, help="Output file (default: data/raw/iris.<format>)")
+    args = parser.parse_args(argv)
+    
+    setup_logging('dataset_download')
+    
+    download_iris_dataset(
+        output_format=args.format,
+        n_samples=args.rows,
+        priors=args.priors,
+        random_state=args.seed,
+        chunksize=args.chunksize,
+        n_jobs=args.jobs,
+        output_path=args.output
+    )
 
 if __name__ == "__main__":
-    download_iris_dataset() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -1,11 +1,11 @@
 import os
-from google.cloud import aiplatform
+import argparse
 from dotenv import load_dotenv
-import time
-from datetime import datetime
+import asyncio
 import smtplib
 from email.mime.text import MIMEText
 import json
+from src.monitoring import TERMINAL_STATES, NotificationQueue, TrainingMonitor, job_state
 
 def setup_email_config():
     """
@@ -41,11 +41,25 @@ def send_notification(subject, message, email_config):
     except Exception as e:
         print(f"Failed to send notification: {str(e)}")
 
-def monitor_training():
-    """Monitor training progress and send notifications."""
+def monitor_training(min_interval=2.0, max_interval=30.0, min_send_interval=60.0):
+    """
+    Monitor every unfinished training job and send batched notifications.
+    
+    Jobs are polled concurrently, every ``min_interval`` seconds right after a
+    state change and backing off to ``max_interval`` while nothing changes
+    (see src.monitoring).
+    
+    Args:
+        min_interval (float): Poll interval right after a state change
+        max_interval (float): Longest poll interval
+        min_send_interval (float): Minimum seconds between two emails
+    """
     # Load environment variables
     load_dotenv()
     
+    # Imported here: the SDK takes seconds to import
+    from google.cloud import aiplatform
+    
     # Initialize Vertex AI
     aiplatform.init(
         project=os.getenv('GOOGLE_CLOUD_PROJECT'),
@@ -62,69 +76,47 @@ def monitor_training():
         print("No training jobs found.")
         return
     
-    # Get the most recent job
-    job = jobs[0]
-    print(f"\nMonitoring training job: {job.display_name}")
+    # Finished jobs have nothing left to watch
+    active_jobs = [job for job in jobs if job_state(job) not in TERMINAL_STATES]
+    if not active_jobs:
+        print(f"No running training jobs; most recent job {jobs[0].display_name} is {job_state(jobs[0])}.")
+        return
     
-    # Store metrics history
-    metrics_history = {}
-    last_status = None
+    print(f"\nMonitoring {len(active_jobs)} training jobs: "
+          f"{', '.join(job.display_name for job in active_jobs)}")
     
-    while True:
-        try:
-            # Get current status
-            status = job.status
-            
-            # Print status if changed
-            if status != last_status:
-                print(f"\nStatus: {status}")
-                last_status = status
-                
-                # Send notification on status change
-                send_notification(
-                    f"ML Training Status Update: {status}",
-                    f"Training job {job.display_name} status changed to {status}",
-                    email_config
-                )
-            
-            # If training is completed
-            if status in ['COMPLETED', 'FAILED', 'CANCELLED']:
-                message = f"Training job {job.display_name} {status.lower()}"
-                if status == 'COMPLETED':
-                    # Get final metrics
-                    try:
-                        model = job.get_model()
-                        metrics = model.get_model_evaluation()
-                        message += f"\n\nFinal Metrics:\n{json.dumps(metrics, indent=2)}"
-                    except Exception as e:
-                        message += f"\n\nCould not retrieve metrics: {str(e)}"
-                
-                send_notification(
-                    f"ML Training {status}: {job.display_name}",
-                    message,
-                    email_config
-                )
-                break
-            
-            # Get current metrics if available
-            try:
-                current_metrics = job.get_metrics()
-                if current_metrics != metrics_history.get('latest'):
-                    metrics_history['latest'] = current_metrics
-                    print("\nCurrent Metrics:")
-                    print(json.dumps(current_metrics, indent=2))
-            except Exception as e:
-                print(f"Could not retrieve metrics: {str(e)}")
-            
-            # Wait before next check
-            time.sleep(300)  # Check every 5 minutes
-            
-        except KeyboardInterrupt:
-            print("\nMonitoring stopped by user")
-            break
-        except Exception as e:
-            print(f"\nError during monitoring: {str(e)}")
-            time.sleep(60)  # Wait a minute before retrying
+    notifier = NotificationQueue(
+        lambda subject, message: send_notification(subject, message, email_config),
+        min_send_interval=min_send_interval
+    )
+    monitor = TrainingMonitor(
+        active_jobs,
+        notifier=notifier,
+        min_interval=min_interval,
+        max_interval=max_interval
+    )
+    
+    try:
+        final_states = asyncio.run(monitor.run())
+        print(f"\nAll jobs finished: {json.dumps(final_states, indent=2)}")
+    except KeyboardInterrupt:
+        print("\nMonitoring stopped by user")
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Monitor running training jobs")
+    parser.add_argument('--min-interval', type=float, default=2.0,
+                        help="Seconds between polls right after a state change")
+    parser.add_argument('--max-interval', type=float, default=30.0,
+                        help="Longest seconds between polls")
+    parser.add_argument('--min-send-interval', type=float, default=60.0,
+                        help="Minimum seconds between two emails")
+    args = parser.parse_args(argv)
+    
+    monitor_training(
+        min_interval=args.min_interval,
+        max_interval=args.max_interval,
+        min_send_interval=args.min_send_interval
+    )
 
 if __name__ == "__main__":
-    monitor_training() 
\ No newline at end of file
+    main()
\ No newline at end of file
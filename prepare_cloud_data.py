@@ -1,52 +1,388 @@
+import io
 import os
+import json
+import hashlib
+import logging
+import argparse
+import itertools
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from src.utils import setup_logging, ensure_directory_exists, validate_environment
+from src import metrics
+from src.validation import validate_frame
+from src.data_format import (
+    DEFAULT_FORMAT, FORMAT_EXTENSIONS, DatasetWriter, dataset_path, find_dataset,
+    infer_format, iter_dataset, read_dataset, write_csv_rows, write_dataset
+)
 from dotenv import load_dotenv
 
-# Set up logging
-logger = setup_logging('data_preparation')
+# Handlers are attached in main(), so importing this module has no side effects
+logger = logging.getLogger('data_preparation')
 
-def validate_data(df):
+DEFAULT_CHUNKSIZE = 100_000
+# Incremental runs record what they have prepared next to the outputs
+PREPARE_STATE_FILE = '.prepare_state.json'
+PREPARE_STATE_VERSION = 3
+
+@metrics.timed('validate_data')
+def validate_data(df, schema=None):
     """
     Validate the input data for training.
     
     Args:
         df (pd.DataFrame): Input dataframe
+        schema (dict, optional): ``{column: {'min': ..., 'max': ...}}`` value ranges
     
     Returns:
         bool: True if validation passes, raises exception otherwise
     """
-    # Check for null values
-    if df.isnull().any().any():
-        null_cols = df.columns[df.isnull().any()].tolist()
-        raise ValueError(f"Found null values in columns: {null_cols}")
+    report = validate_frame(df, schema=schema)
+    metrics.counter('validate_rows_total', "Rows validated").inc(len(df))
+    report.raise_for_errors()
+    
+    logger.info("Data validation passed successfully")
+    return True
+
+@metrics.timed('validate_chunk')
+def validate_chunk(chunk, start_row=0, schema=None):
+    """
+    Validate one chunk of the input, reporting offending rows by file row number.
+    
+    Args:
+        chunk (pd.DataFrame): Rows of the input file
+        start_row (int): Row number of the chunk's first row in the file
+        schema (dict, optional): ``{column: {'min': ..., 'max': ...}}`` value ranges
+    
+    Returns:
+        ValidationReport: Report for the chunk; raises exception if a check fails
+    """
+    report = validate_frame(chunk, schema=schema, row_offset=start_row)
+    metrics.counter('validate_rows_total', "Rows validated").inc(len(chunk))
+    report.raise_for_errors()
+    return report
+
+def _row_hashes(chunk, random_state):
+    """Uniform numbers in [0, 1) hashed from each row's values and the seed."""
+    # hash_pandas_object's hash_key only affects string columns, so the seed
+    # is mixed in afterwards with the splitmix64 finalizer
+    seed = int.from_bytes(hashlib.sha256(str(random_state).encode('utf-8')).digest()[:8], 'big')
+    x = pd.util.hash_pandas_object(chunk, index=False).to_numpy() ^ np.uint64(seed)
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    # Top 53 bits as a uniform float in [0, 1)
+    return (x >> np.uint64(11)) * 2.0 ** -53
+
+def stratified_split(chunk, test_size=0.2, random_state=42, seen=None):
+    """
+    Deterministically assign rows to the test set by a hash of their values, stratified by class.
     
-    # Check for numeric features
-    non_numeric = df.select_dtypes(exclude=['number']).columns
-    if len(non_numeric) > 1:  # Excluding target column
-        raise ValueError(f"Found non-numeric features: {non_numeric}")
+    Each row's values are hashed with ``random_state`` into a uniform number
+    ``u``. Within each class, taken in input order, a row goes to the test set
+    when ``u`` is below the class's shortfall: ``test_size`` times its rows so
+    far, this one included, minus the test rows already chosen. Every class
+    therefore sends ``test_size`` of its rows to the test set, to within one
+    row, for any chunk size, and the hashes decide which rows go. Because of
+    the running shortfall a row's side also depends on the rows of its class
+    before it: reordering the input changes the split.
     
-    # Check for infinite values
-    if np.isinf(df.select_dtypes(include=['number']).values).any():
-        raise ValueError("Found infinite values in the dataset")
+    Args:
+        chunk (pd.DataFrame): Rows to assign, with a ``target`` column
+        test_size (float): Proportion of each class sent to the test set
+        random_state (int): Seed mixed into the hash
+        seen (dict, optional): ``{str(label): (rows, test_rows)}`` of earlier
+            chunks; updated in place with this chunk's rows
+    
+    Returns:
+        np.ndarray: Boolean mask, True for test rows
+    """
+    seen = {} if seen is None else seen
+    targets = chunk['target'].astype(str).to_numpy()
+    hashes = _row_hashes(chunk, random_state)
+    is_test = np.zeros(len(chunk), dtype=bool)
+    for label in pd.unique(targets):
+        rows = np.flatnonzero(targets == label)
+        n, n_test = seen.get(label, (0, 0))
+        # Sequential by nature: each decision moves the shortfall for the next row
+        for row, u in zip(rows.tolist(), hashes[rows].tolist()):
+            n += 1
+            if u < test_size * n - n_test:
+                is_test[row] = True
+                n_test += 1
+        seen[label] = (n, n_test)
+    return is_test
+
+def _prepare_data_streaming(input_file, output_dir, test_size, random_state, chunksize, output_format):
+    """Chunked prepare_data: memory is bounded by ``chunksize`` rows, not the input size."""
+    ensure_directory_exists(output_dir)
+    train_path = dataset_path(output_dir, 'training_data', output_format)
+    test_path = dataset_path(output_dir, 'test_data', output_format)
+    
+    logger.info(f"Streaming data from {input_file} in chunks of {chunksize} rows")
+    n_rows = 0
+    n_features = 0
+    class_counts = {'train': pd.Series(dtype='int64'), 'test': pd.Series(dtype='int64')}
+    seen = {}
+    
+    # The writers only replace the outputs once every chunk has been written
+    with DatasetWriter(train_path) as train_writer, DatasetWriter(test_path) as test_writer:
+        for chunk in iter_dataset(input_file, chunksize=chunksize):
+            validate_chunk(chunk, n_rows)
+            is_test = stratified_split(chunk, test_size, random_state, seen)
+            for split, rows, writer in (('train', chunk[~is_test], train_writer), ('test', chunk[is_test], test_writer)):
+                writer.write(rows)
+                class_counts[split] = class_counts[split].add(rows['target'].value_counts(), fill_value=0)
+            n_rows += len(chunk)
+            metrics.counter('prepare_rows_total', "Rows prepared for training").inc(len(chunk))
+            n_features = len(chunk.columns) - 1
+        if n_rows == 0:
+            # Empty outputs with the input's columns, rather than leaving a previous run's
+            empty = read_dataset(input_file)
+            train_writer.write(empty)
+            test_writer.write(empty)
+            n_features = len(empty.columns) - 1
     
     logger.info("Data validation passed successfully")
-    return True
+    _log_split_statistics(class_counts, n_rows, n_features, train_path, test_path)
 
-def prepare_data(input_file, output_dir, test_size=0.2, random_state=42):
+def _log_split_statistics(class_counts, n_rows, n_features, train_path, test_path):
+    """Log sizes and class balance of a streamed split from per-split target counts."""
+    n_train = int(class_counts['train'].sum())
+    n_test = int(class_counts['test'].sum())
+    logger.info(f"Saved training data ({n_train} rows) to {train_path}")
+    logger.info(f"Saved test data ({n_test} rows) to {test_path}")
+    
+    # Log data statistics
+    total = class_counts['train'].add(class_counts['test'], fill_value=0)
+    test_share = (class_counts['test'].reindex(total.index, fill_value=0) / total).round(4)
+    logger.info("\nData Statistics:")
+    logger.info(f"Number of features: {n_features}")
+    logger.info(f"Training set size: {n_train}")
+    logger.info(f"Test set size: {n_test}")
+    logger.info(f"Target distribution:\n{total / max(n_rows, 1)}")
+    logger.info(f"Test share per class:\n{test_share}")
+
+def _load_prepare_state(path):
+    """Return the saved incremental state, or None if missing or unreadable."""
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get('version') == PREPARE_STATE_VERSION else None
+
+def _save_prepare_state(path, state):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _column_types(names_and_types):
+    """Arrow types from ``{column: type name}``; columns whose type has no alias are inferred."""
+    import pyarrow as pa
+    types = {}
+    for name, type_name in names_and_types.items():
+        try:
+            types[name] = pa.type_for_alias(type_name)
+        except ValueError:
+            pass
+    return types
+
+def _reusable_chunks(f, state, params, train_path, test_path):
+    """
+    Return the leading chunks of ``state`` whose input bytes are unchanged.
+    
+    Each recorded chunk is re-hashed, which reads the old bytes but does not
+    parse, validate or split them. Reuse stops at the first chunk that differs
+    or is cut short, and at any chunk after it.
+    """
+    if state is None or state['params'] != params:
+        return []
+    chunks = state['chunks']
+    if chunks and not (os.path.exists(train_path) and os.path.exists(test_path)
+                       and os.path.getsize(train_path) >= chunks[-1]['train_end']
+                       and os.path.getsize(test_path) >= chunks[-1]['test_end']):
+        return []
+    
+    reused = []
+    for chunk in chunks:
+        data = f.read(chunk['end'] - f.tell())
+        if hashlib.sha256(data).hexdigest() != chunk['sha256']:
+            break
+        reused.append(chunk)
+    if reused and not data.endswith(b'\n') and f.read(1) not in (b'', b'\n', b'\r'):
+        # The chunk's last line had no newline and has since been extended
+        reused.pop()
+    return reused
+
+def _open_truncated(path, size):
+    """Open an output for appending after cutting it to ``size`` bytes."""
+    f = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+    # Drops the rows of changed chunks, and of any chunk cut off by a crash
+    f.truncate(size)
+    f.seek(size)
+    return f
+
+def _prepare_data_incremental(input_file, output_dir, test_size, random_state, chunksize, output_format):
+    """
+    Chunked prepare_data that only processes input changed since the last run.
+    
+    The input is cut into chunks of ``chunksize`` lines. The byte range and
+    SHA-256 of each chunk, and the size of both outputs after its rows were
+    appended, are saved in ``PREPARE_STATE_FILE`` in ``output_dir``. On the
+    next run the unchanged leading chunks are skipped. The outputs are cut
+    back to where the first new or changed chunk's rows begin, and only the
+    input from there on is validated, split and appended. The split (see
+    stratified_split) resumes from the class counts of the reused chunks, so
+    every row keeps its side and the outputs are identical to those of a full
+    streaming run.
+    
+    Returns:
+        dict: Chunks and rows reused from the previous run and processed in this one
+    """
+    if infer_format(input_file) != 'csv' or input_file.endswith('.gz'):
+        raise ValueError(f"Incremental preparation needs an uncompressed CSV input, got {input_file}")
+    if output_format != 'csv':
+        raise ValueError("Incremental preparation appends to its outputs, so output_format must be 'csv'")
+    import pyarrow.csv as pa_csv
+    
+    ensure_directory_exists(output_dir)
+    train_path = dataset_path(output_dir, 'training_data', output_format)
+    test_path = dataset_path(output_dir, 'test_data', output_format)
+    state_path = os.path.join(output_dir, PREPARE_STATE_FILE)
+    state = _load_prepare_state(state_path)
+    
+    with open(input_file, 'rb') as f:
+        header = f.readline()
+        params = {
+            'input': os.path.abspath(input_file),
+            'header_sha256': hashlib.sha256(header).hexdigest(),
+            'test_size': test_size,
+            'random_state': random_state
+        }
+        chunks = _reusable_chunks(f, state, params, train_path, test_path)
+        column_types = state['column_types'] if chunks else None
+        offset = chunks[-1]['end'] if chunks else len(header)
+        n_rows = sum(chunk['rows'] for chunk in chunks)
+        seen = {}
+        for chunk in chunks:
+            for split, counts in chunk['counts'].items():
+                for label, n in counts.items():
+                    n_rows_seen, n_test = seen.get(label, (0, 0))
+                    seen[label] = (n_rows_seen + n, n_test + (n if split == 'test' else 0))
+        if state is not None and len(chunks) < len(state['chunks']):
+            logger.info(f"Input changed after row {n_rows}; preparing it again from there")
+        logger.info(f"Reusing {len(chunks)} prepared chunks ({n_rows} rows) of {input_file}")
+    
+        processed_rows = 0
+        n_processed = 0
+        f.seek(offset)
+        with _open_truncated(train_path, chunks[-1]['train_end'] if chunks else 0) as train_file, \
+                _open_truncated(test_path, chunks[-1]['test_end'] if chunks else 0) as test_file:
+            while True:
+                data = b''.join(itertools.islice(f, chunksize))
+                if not data:
+                    break
+                convert_options = pa_csv.ConvertOptions(column_types=_column_types(column_types or {}))
+                table = pa_csv.read_csv(io.BytesIO(header + data), convert_options=convert_options)
+                if column_types is None:
+                    # Later chunks are parsed with the first chunk's types, as in a full run
+                    column_types = {field.name: str(field.type) for field in table.schema}
+                chunk = table.to_pandas()
+                validate_chunk(chunk, n_rows)
+    
+                is_test = stratified_split(chunk, test_size, random_state, seen)
+                record = {'end': f.tell(), 'rows': len(chunk), 'sha256': hashlib.sha256(data).hexdigest(), 'counts': {}}
+                for split, rows, out in (('train', chunk[~is_test], train_file), ('test', chunk[is_test], test_file)):
+                    write_csv_rows(out, rows, header=out.tell() == 0)
+                    out.flush()
+                    record[f'{split}_end'] = out.tell()
+                    record['counts'][split] = {str(label): int(n) for label, n in rows['target'].value_counts().items()}
+    
+                chunks.append(record)
+                n_rows += len(chunk)
+                processed_rows += len(chunk)
+                n_processed += 1
+                metrics.counter('prepare_rows_total', "Rows prepared for training").inc(len(chunk))
+                # Saved after the outputs, so a crash leaves at most one chunk to redo
+                _save_prepare_state(state_path, {
+                    'version': PREPARE_STATE_VERSION, 'params': params,
+                    'column_types': column_types, 'chunks': chunks
+                })
+            if not chunks and header:
+                # Header-only outputs, as a full streaming run writes for an empty input
+                empty = pa_csv.read_csv(io.BytesIO(header)).to_pandas()
+                for out in (train_file, test_file):
+                    write_csv_rows(out, empty, header=True)
+    
+    n_reused = len(chunks) - n_processed
+    metrics.counter('prepare_chunks_reused_total', "Input chunks skipped by incremental preparation").inc(n_reused)
+    logger.info(f"Validated and split {processed_rows} new or changed rows in {n_processed} chunks")
+    
+    class_counts = {
+        split: pd.Series(
+            [n for chunk in chunks for n in chunk['counts'][split].values()],
+            index=[label for chunk in chunks for label in chunk['counts'][split]],
+            dtype='int64'
+        ).groupby(level=0).sum()
+        for split in ('train', 'test')
+    }
+    n_features = len(column_types or {}) - 1
+    _log_split_statistics(class_counts, n_rows, n_features, train_path, test_path)
+    return {
+        'chunks_reused': n_reused,
+        'chunks_processed': n_processed,
+        'rows_reused': n_rows - processed_rows,
+        'rows_processed': processed_rows
+    }
+
+@metrics.timed('prepare_data')
+def prepare_data(
+    input_file,
+    output_dir,
+    test_size=0.2,
+    random_state=42,
+    chunksize=None,
+    output_format=DEFAULT_FORMAT,
+    incremental=False
+):
     """
     Prepare data for cloud training.
     
     Args:
-        input_file (str): Path to input CSV file
+        input_file (str): Path to input Parquet or CSV file
         output_dir (str): Directory to save processed files
         test_size (float): Proportion of test set
         random_state (int): Random seed for reproducibility
+        chunksize (int, optional): Stream the input in chunks of this many rows,
+            validating each chunk and splitting rows by hash, stratified by
+            class (see stratified_split), so memory stays bounded for inputs
+            larger than RAM. The split depends on row order as well as row
+            values. If None, the whole file is loaded and split with
+            train_test_split.
+        output_format (str): "parquet" or "csv" (see src.data_format)
+        incremental (bool): Only validate and split input rows added or changed
+            since the last incremental run into ``output_dir``, appending them
+            to the outputs (see _prepare_data_incremental). Needs a CSV input
+            and CSV outputs; ``chunksize`` defaults to DEFAULT_CHUNKSIZE.
+    
+    Returns:
+        dict: For incremental runs, how many chunks and rows were reused and processed
     """
+    if incremental:
+        return _prepare_data_incremental(
+            input_file, output_dir, test_size, random_state, chunksize or DEFAULT_CHUNKSIZE, output_format
+        )
+    if chunksize is not None:
+        return _prepare_data_streaming(
+            input_file, output_dir, test_size, random_state, chunksize, output_format
+        )
+    
     logger.info(f"Loading data from {input_file}")
-    df = pd.read_csv(input_file)
+    df = read_dataset(input_file)
     
     # Validate data
     validate_data(df)
@@ -66,11 +402,12 @@ def prepare_data(input_file, output_dir, test_size=0.2, random_state=42):
     
     # Save processed datasets
     ensure_directory_exists(output_dir)
-    train_path = os.path.join(output_dir, 'training_data.csv')
-    test_path = os.path.join(output_dir, 'test_data.csv')
+    train_path = dataset_path(output_dir, 'training_data', output_format)
+    test_path = dataset_path(output_dir, 'test_data', output_format)
     
-    train_df.to_csv(train_path, index=False)
-    test_df.to_csv(test_path, index=False)
+    write_dataset(train_df, train_path)
+    write_dataset(test_df, test_path)
+    metrics.counter('prepare_rows_total', "Rows prepared for training").inc(len(df))
     
     logger.info(f"Saved training data ({len(train_df)} rows) to {train_path}")
     logger.info(f"Saved test data ({len(test_df)} rows) to {test_path}")
@@ -82,17 +419,33 @@ def prepare_data(input_file, output_dir, test_size=0.2, random_state=42):
     logger.info(f"Test set size: {len(test_df)}")
     logger.info(f"Target distribution:\n{y.value_counts(normalize=True)}")
 
-def main():
+def main(argv=None, prog=None):
     """Main function to prepare data for cloud training."""
+    parser = argparse.ArgumentParser(prog=prog, description="Prepare data for cloud training")
+    parser.add_argument('--input', default=None,
+                        help="Input Parquet or CSV file (default: data/raw/iris.parquet or .csv)")
+    parser.add_argument('--output-dir', default="data/cloud")
+    parser.add_argument('--format', choices=list(FORMAT_EXTENSIONS), default=None,
+                        help=f"Output format (default: {DEFAULT_FORMAT}, or csv with --incremental)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help=f"Stream the input in chunks of this many rows, e.g. {DEFAULT_CHUNKSIZE}; "
+                             "rows are split by a hash of their values, stratified by class in input order")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only process input rows added or changed since the last --incremental run")
+    args = parser.parse_args(argv)
+    output_format = args.format or ('csv' if args.incremental else DEFAULT_FORMAT)
+    
+    setup_logging('data_preparation')
     load_dotenv()
     validate_environment()
     
     # Define paths
-    input_file = "data/raw/iris.csv"  # Update with your input file
-    output_dir = "data/cloud"
+    input_file = args.input or find_dataset("data/raw", "iris")
+    output_dir = args.output_dir
     
     try:
-        prepare_data(input_file, output_dir)
+        prepare_data(input_file, output_dir, chunksize=args.chunksize, output_format=output_format,
+                     incremental=args.incremental)
         logger.info("Data preparation completed successfully")
     except Exception as e:
         logger.error(f"Error during data preparation: {str(e)}")
@@ -0,0 +1,6 @@
+"""Allow ``python -m src <command>``; see src.cli."""
+import sys
+
+from src.cli import main
+
+sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Batched prediction client built on top of predict_with_endpoint.
+
+Large inputs are split into chunks that respect the endpoint's request size
+limits, sent with a bounded number of requests in flight, and reassembled in
+input order. With ``encode=True`` the chunks are JSON bodies built by
+src.encoding straight from the feature columns, instead of per-row dicts.
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+import pandas as pd
+
+from src import metrics
+from src.cloud_utils import predict_with_endpoint
+from src.encoding import iter_payloads, raw_predict
+
+# Vertex AI rejects online prediction requests larger than 1.5 MB
+DEFAULT_MAX_PAYLOAD_BYTES = 1_500_000
+DEFAULT_MAX_INSTANCES = 1000
+
+# Bytes taken by the {"instances": [...]} envelope around the instances
+_ENVELOPE_BYTES = len('{"instances": []}')
+
+
+def _iter_instances(data, columns=None, block_size=DEFAULT_MAX_INSTANCES):
+    """
+    Yield JSON-serialisable instances one at a time.
+
+    DataFrames become dicts keyed by column name (the format AutoML tabular
+    endpoints expect). Arrays become lists, or dicts when ``columns`` is given.
+    Rows are converted a block at a time so memory stays bounded.
+    """
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, len(data), block_size):
+            yield from data.iloc[start:start + block_size].to_dict('records')
+        return
+
+    if isinstance(data, np.ndarray):
+        if data.ndim != 2:
+            raise ValueError(f"Expected a 2-D array, got shape {data.shape}")
+        for start in range(0, len(data), block_size):
+            rows = data[start:start + block_size].tolist()
+            if columns is None:
+                yield from rows
+            else:
+                for row in rows:
+                    yield dict(zip(columns, row))
+        return
+
+    for row in data:
+        if isinstance(row, np.ndarray):
+            row = row.tolist()
+        if columns is not None and not isinstance(row, dict):
+            row = dict(zip(columns, row))
+        yield row
+
+
+def iter_chunks(
+    data,
+    max_instances=DEFAULT_MAX_INSTANCES,
+    max_payload_bytes=DEFAULT_MAX_PAYLOAD_BYTES,
+    columns=None
+):
+    """
+    Split prediction input into request-sized chunks.
+
+    Args:
+        data: DataFrame, 2-D NumPy array or iterable of instances
+        max_instances (int): Maximum number of instances per chunk
+        max_payload_bytes (int): Maximum JSON size of a chunk's request body
+        columns (list, optional): Feature names used to turn array rows into dicts
+
+    Yields:
+        list: Instances for one endpoint call
+    """
+    chunk = []
+    chunk_bytes = _ENVELOPE_BYTES
+    for instance in _iter_instances(data, columns=columns, block_size=max_instances):
+        # +2 accounts for the ", " separator json.dumps puts between instances
+        size = len(json.dumps(instance)) + 2
+        if size + _ENVELOPE_BYTES > max_payload_bytes:
+            raise ValueError(
+                f"A single instance is {size} bytes, above the {max_payload_bytes} byte limit"
+            )
+        if chunk and (len(chunk) >= max_instances or chunk_bytes + size > max_payload_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = _ENVELOPE_BYTES
+        chunk.append(instance)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def _predict_chunk(endpoint, instances, max_retries, retry_backoff, retry_exceptions):
+    """Predict one chunk, retrying it alone on failure with exponential backoff."""
+    return _with_retries(
+        lambda: predict_with_endpoint(endpoint, instances), len(instances),
+        max_retries, retry_backoff, retry_exceptions
+    )
+
+
+def _predict_payload(endpoint, payload, max_retries, retry_backoff, retry_exceptions):
+    """Predict one encoded ``(body, n_instances)`` chunk, with the same retries."""
+    body, n_instances = payload
+    predictions = _with_retries(
+        lambda: raw_predict(endpoint, body), n_instances, max_retries, retry_backoff, retry_exceptions
+    )
+    # Counted once answered, like predict_with_endpoint, so retries and failures add nothing
+    metrics.counter('predict_instances_total', "Instances sent for prediction").inc(n_instances)
+    return predictions
+
+
+def _with_retries(call, n_instances, max_retries, retry_backoff, retry_exceptions):
+    attempt = 0
+    while True:
+        try:
+            response = call()
+            break
+        except retry_exceptions:
+            if attempt >= max_retries:
+                raise
+            metrics.counter('predict_retries_total', "Prediction requests retried").inc()
+            time.sleep(retry_backoff * (2 ** attempt))
+            attempt += 1
+
+    predictions = list(getattr(response, 'predictions', response))
+    if len(predictions) != n_instances:
+        raise RuntimeError(
+            f"Endpoint returned {len(predictions)} predictions for {n_instances} instances"
+        )
+    return predictions
+
+
+def to_columnar(predictions):
+    """
+    Convert a list of per-row predictions into columnar NumPy arrays.
+
+    Args:
+        predictions (list): Predictions in input order
+
+    Returns:
+        dict or np.ndarray: One array per field for dict predictions
+        (e.g. ``{'classes': ..., 'scores': ...}``), otherwise a single array
+    """
+    if predictions and isinstance(predictions[0], dict):
+        return {
+            key: np.asarray([prediction[key] for prediction in predictions])
+            for key in predictions[0]
+        }
+    return np.asarray(predictions)
+
+
+def predict_in_batches(
+    endpoint,
+    data,
+    max_instances=DEFAULT_MAX_INSTANCES,
+    max_payload_bytes=DEFAULT_MAX_PAYLOAD_BYTES,
+    max_in_flight=4,
+    max_retries=3,
+    retry_backoff=0.5,
+    retry_exceptions=(Exception,),
+    columns=None,
+    encode=False
+):
+    """
+    Make predictions for a large input using concurrent, size-bounded requests.
+
+    Args:
+        endpoint: Deployed model endpoint (or any object with ``predict``)
+        data: DataFrame, 2-D NumPy array or iterable of instances
+        max_instances (int): Maximum number of instances per request
+        max_payload_bytes (int): Maximum JSON size of a request body
+        max_in_flight (int): Maximum number of concurrent requests
+        max_retries (int): Retries per failed chunk before giving up
+        retry_backoff (float): Initial delay in seconds between retries
+        retry_exceptions (tuple): Exception types that trigger a retry
+        columns (list, optional): Feature names used to turn array rows into dicts
+        encode (bool): Build request bodies with src.encoding and send them with
+            ``raw_predict``. Columns go in ``columns`` order, by default the
+            order in data/metadata.csv.
+
+    Returns:
+        dict or np.ndarray: Predictions in input order, see ``to_columnar``
+    """
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1")
+
+    results = {}
+    if encode:
+        chunks = iter_payloads(
+            data, columns=columns, max_instances=max_instances, max_payload_bytes=max_payload_bytes
+        )
+        predict_chunk = _predict_payload
+    else:
+        chunks = iter_chunks(
+            data,
+            max_instances=max_instances,
+            max_payload_bytes=max_payload_bytes,
+            columns=columns
+        )
+        predict_chunk = _predict_chunk
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        pending = {}
+
+        def collect(futures):
+            for future in futures:
+                results[pending.pop(future)] = future.result()
+
+        # Chunks are produced lazily so at most max_in_flight are held in memory
+        for index, chunk in enumerate(chunks):
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            future = executor.submit(
+                predict_chunk, endpoint, chunk, max_retries, retry_backoff, retry_exceptions
+            )
+            pending[future] = index
+
+        collect(list(pending))
+
+    predictions = []
+    for index in range(len(results)):
+        predictions.extend(results[index])
+    return to_columnar(predictions)
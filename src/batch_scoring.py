@@ -0,0 +1,328 @@
+"""
+Offline batch scoring of large files with bounded memory.
+
+The input (Parquet or CSV) is streamed in chunks of ``chunksize`` rows. Each
+chunk is scored by a pool of workers: processes serving a local
+``models/*.pkl`` artifact, or threads calling an endpoint through
+predict_in_batches. Every finished chunk is written as its own part file
+next to the output. A checkpoint records how many leading chunks are done.
+When every chunk is scored, the parts are joined in input order into the
+output file and removed.
+
+A run that crashes, or is interrupted, leaves its parts and checkpoint
+behind. Running the same command again scores only the chunks after the
+checkpoint. At most ``2 * workers`` chunks are in flight, so memory is
+bounded by the chunk size, not the input size.
+
+Local workers load the model memory-mapped through the ModelCache, so they
+share one copy of its arrays (see src.model_cache).
+"""
+import os
+import json
+import time
+import shutil
+import resource
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src import metrics
+from src.data_format import DEFAULT_COMPRESSION, infer_format, iter_dataset, read_dataset, write_dataset
+from src.utils import load_feature_names
+
+DEFAULT_CHUNKSIZE = 50_000
+CHECKPOINT_VERSION = 1
+_CHECKPOINT_FILENAME = 'checkpoint.json'
+
+ScoreResult = namedtuple('ScoreResult', [
+    'output_path', 'rows', 'chunks', 'resumed_chunks', 'seconds', 'rows_per_second',
+    'peak_rss_mb', 'worker_peak_rss_mb'
+])
+
+# Worker-side predictor, set by _load_predictor
+_predictor = None
+
+
+def prediction_frame(predictions):
+    """
+    Turn columnar predictions into a DataFrame.
+
+    Args:
+        predictions: ``{'classes', 'scores'}`` arrays as from predict_in_batches,
+            or a plain array of predictions
+
+    Returns:
+        pd.DataFrame: ``predicted_class`` and one ``score_<class>`` column per
+        class, or a single ``prediction`` column
+    """
+    if isinstance(predictions, dict) and 'scores' in predictions:
+        classes = predictions['classes'][0] if len(predictions['classes']) else []
+        scores = np.asarray(predictions['scores'], dtype=np.float64).reshape(-1, len(classes))
+        result = pd.DataFrame(scores, columns=[f"score_{label}" for label in classes])
+        result.insert(0, 'predicted_class', np.asarray(classes)[scores.argmax(axis=1)] if len(scores) else [])
+        return result
+    return pd.DataFrame({'prediction': list(predictions)})
+
+
+def _load_predictor(model_path, mmap):
+    """Process pool initializer: load the model once per worker."""
+    global _predictor
+    from src.local_predictor import LocalPredictor
+    cache = None
+    if mmap:
+        from src.model_cache import get_model_cache
+        cache = get_model_cache()
+    _predictor = LocalPredictor(path=model_path, cache=cache)
+
+
+def _write_part(frame, part_path):
+    # DatasetWriter writes to a temporary file first, so a part exists only once complete
+    write_dataset(frame, part_path)
+    return len(frame)
+
+
+def _score_local(task):
+    """Score one chunk with the worker's LocalPredictor and write its part."""
+    X, extra, part_path = task
+    scores = _predictor.predict_proba(X)
+    frame = prediction_frame({'classes': [_predictor.classes], 'scores': scores})
+    return _write_part(pd.concat([extra, frame], axis=1) if extra is not None else frame, part_path)
+
+
+def _score_remote(endpoint, task, encode, max_retries):
+    """Score one chunk on an endpoint and write its part."""
+    from src.batch_predict import predict_in_batches
+    features, extra, part_path = task
+    predictions = predict_in_batches(
+        endpoint, features, max_in_flight=1, max_retries=max_retries,
+        columns=list(features.columns), encode=encode
+    )
+    frame = prediction_frame(predictions)
+    return _write_part(pd.concat([extra, frame], axis=1) if extra is not None else frame, part_path)
+
+
+def _parts_dir(output_path):
+    return f"{output_path}.parts"
+
+
+def _part_path(parts_dir, index, output_path):
+    extension = '.parquet' if infer_format(output_path) == 'parquet' else '.csv'
+    return os.path.join(parts_dir, f"part-{index:06d}{extension}")
+
+
+def _load_checkpoint(parts_dir, params):
+    """Return the number of finished chunks recorded for a run with ``params``, or 0."""
+    try:
+        with open(os.path.join(parts_dir, _CHECKPOINT_FILENAME)) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if checkpoint.get('version') != CHECKPOINT_VERSION or checkpoint.get('params') != params:
+        return 0
+    return checkpoint['chunks_done']
+
+
+def _save_checkpoint(parts_dir, params, chunks_done):
+    path = os.path.join(parts_dir, _CHECKPOINT_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': CHECKPOINT_VERSION, 'params': params, 'chunks_done': chunks_done}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _merge_parts(part_paths, output_path):
+    """Join the parts, in order, into ``output_path`` (replaced only once complete)."""
+    tmp_path = f"{output_path}.tmp"
+    if infer_format(output_path) == 'parquet':
+        import pyarrow.parquet as pq
+        writer = None
+        for part_path in part_paths:
+            table = pq.read_table(part_path)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema, compression=DEFAULT_COMPRESSION)
+            writer.write_table(table)
+        writer.close()
+    else:
+        import gzip
+        opener = gzip.open if output_path.endswith('.gz') else open
+        with opener(tmp_path, 'wb') as out:
+            for index, part_path in enumerate(part_paths):
+                with open(part_path, 'rb') as part:
+                    header = part.readline()
+                    if index == 0:
+                        out.write(header)
+                    shutil.copyfileobj(part, out)
+    os.replace(tmp_path, output_path)
+
+
+def _empty_output(input_path, keep_columns, endpoint):
+    """
+    Zero-row output frame with the columns a scored chunk would have.
+
+    An endpoint's classes are only known from its responses, so without rows
+    the output has ``predicted_class`` but no ``score_<class>`` columns.
+    """
+    classes = _predictor.classes if endpoint is None else []
+    frame = pd.DataFrame({'predicted_class': pd.Series([], dtype=str)})
+    for label in classes:
+        frame[f"score_{label}"] = pd.Series([], dtype=np.float64)
+    if keep_columns:
+        frame = pd.concat([read_dataset(input_path, columns=keep_columns), frame], axis=1)
+    return frame
+
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF):
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def score_file(
+    input_path,
+    output_path,
+    model_path=None,
+    model_dir='models',
+    endpoint=None,
+    workers=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+    columns=None,
+    keep_columns=None,
+    mmap=True,
+    encode=False,
+    max_retries=3,
+    resume=True
+):
+    """
+    Score every row of a dataset and write predictions and probabilities in input order.
+
+    Args:
+        input_path (str): ``.parquet`` or ``.csv`` file to score
+        output_path (str): ``.parquet`` or ``.csv`` (optionally ``.csv.gz``) output
+        model_path (str, optional): Local artifact; defaults to the newest in ``model_dir``
+        model_dir (str): Directory searched when neither ``model_path`` nor ``endpoint`` is given
+        endpoint (optional): Endpoint-like object to score on instead of a local model
+        workers (int, optional): Worker processes (local) or threads (endpoint);
+            defaults to the CPU count. 1 scores in this process.
+        chunksize (int): Rows per chunk, each scored and written as a unit
+        columns (list, optional): Feature columns; defaults to the model's
+            feature names, or data/metadata.csv for an endpoint
+        keep_columns (list, optional): Input columns copied to the output, e.g. an ID
+        mmap (bool): Load a local model memory-mapped, shared across workers
+        encode (bool): Send endpoint requests as bodies built by src.encoding
+        max_retries (int): Retries per failed endpoint request
+        resume (bool): Continue from a checkpoint left by an interrupted run
+            with the same input, model and chunk size
+
+    Returns:
+        ScoreResult: Output path, rows and chunks scored in this run, chunks
+        resumed from the checkpoint, throughput and peak RSS of this process
+        and of the largest worker
+    """
+    workers = workers or os.cpu_count() or 1
+    keep_columns = list(keep_columns or [])
+
+    if endpoint is None:
+        from src.local_predictor import find_model_artifact
+        model_path = model_path or find_model_artifact(model_dir)
+        # Loaded here first, so a memory-mapped export exists before workers map it
+        _load_predictor(model_path, mmap)
+        columns = columns or _predictor.feature_names
+        model_stat = os.stat(model_path)
+        # A model retrained in place keeps its path, so its size and mtime are part of the key
+        model_id = [os.path.abspath(model_path), model_stat.st_size, model_stat.st_mtime_ns]
+    else:
+        columns = columns or load_feature_names()
+        model_id = getattr(endpoint, 'resource_name', None) or repr(endpoint)
+    columns = list(columns)
+
+    stat = os.stat(input_path)
+    params = {
+        'input': os.path.abspath(input_path),
+        'input_size': stat.st_size,
+        'input_mtime_ns': stat.st_mtime_ns,
+        'model': model_id,
+        'chunksize': chunksize,
+        'columns': columns,
+        'keep_columns': keep_columns
+    }
+    parts_dir = _parts_dir(output_path)
+    chunks_done = _load_checkpoint(parts_dir, params) if resume else 0
+    if chunks_done == 0 and os.path.isdir(parts_dir):
+        shutil.rmtree(parts_dir)
+    os.makedirs(parts_dir, exist_ok=True)
+    _save_checkpoint(parts_dir, params, chunks_done)
+
+    if endpoint is None and workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_load_predictor,
+                                       initargs=(model_path, mmap))
+        score = _score_local
+    elif endpoint is None:
+        executor = None
+        score = _score_local
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+        def score(task):
+            return _score_remote(endpoint, task, encode, max_retries)
+
+    def make_task(index, chunk):
+        features = chunk[columns]
+        extra = chunk[keep_columns].reset_index(drop=True) if keep_columns else None
+        part_path = _part_path(parts_dir, index, output_path)
+        if endpoint is None:
+            return features.to_numpy(dtype=np.float64), extra, part_path
+        return features.reset_index(drop=True), extra, part_path
+
+    rows_counter = metrics.counter('score_rows_total', "Rows scored by batch scoring")
+    start = time.perf_counter()
+    n_rows = 0
+    n_chunks = 0
+    in_flight = deque()
+
+    def finish_oldest():
+        nonlocal n_rows, chunks_done
+        index, result = in_flight.popleft()
+        rows = result.result() if executor is not None else result
+        n_rows += rows
+        rows_counter.inc(rows)
+        # Parts finish in any order, but the checkpoint only covers leading chunks
+        chunks_done = index + 1
+        _save_checkpoint(parts_dir, params, chunks_done)
+
+    resumed_chunks = chunks_done
+    try:
+        for index, chunk in enumerate(iter_dataset(input_path, chunksize=chunksize,
+                                                   columns=columns + [c for c in keep_columns if c not in columns])):
+            n_chunks = index + 1
+            if index < resumed_chunks:
+                continue
+            task = make_task(index, chunk)
+            in_flight.append((index, executor.submit(score, task) if executor is not None else score(task)))
+            if len(in_flight) >= 2 * workers:
+                finish_oldest()
+        while in_flight:
+            finish_oldest()
+    finally:
+        if executor is not None:
+            # Chunks already running are left to finish; queued ones are dropped
+            executor.shutdown(wait=True, cancel_futures=True)
+    seconds = time.perf_counter() - start
+
+    if n_chunks:
+        _merge_parts([_part_path(parts_dir, index, output_path) for index in range(n_chunks)], output_path)
+    else:
+        # No rows: an empty output with the usual columns, replacing any earlier one
+        write_dataset(_empty_output(input_path, keep_columns, endpoint), output_path)
+    shutil.rmtree(parts_dir)
+
+    return ScoreResult(
+        output_path=output_path,
+        rows=n_rows,
+        chunks=n_chunks - resumed_chunks,
+        resumed_chunks=resumed_chunks,
+        seconds=seconds,
+        rows_per_second=n_rows / seconds if seconds > 0 else 0.0,
+        peak_rss_mb=_peak_rss_mb(),
+        worker_peak_rss_mb=_peak_rss_mb(resource.RUSAGE_CHILDREN) if endpoint is None and workers > 1 else None
+    )
@@ -0,0 +1,387 @@
+"""
+Single command-line entry point for the pipeline: ``python -m src <command>``.
+
+Run from the project root. Each command imports its dependencies (pandas,
+sklearn, the Vertex AI SDK) only when it runs, so ``--help`` and light commands
+such as ``status`` start in a fraction of a second. Importing this module
+loads nothing beyond the standard library.
+
+Commands:
+    prepare   Validate, split and write the training data (prepare_cloud_data.py)
+    upload    Upload a file to Cloud Storage, skipping unchanged content
+    train     Train an AutoML tabular model on an uploaded dataset
+    deploy    Deploy a trained model to an endpoint
+    predict   Score a dataset on an endpoint or a local model artifact
+    score     Batch-score a large file in chunks with a worker pool, resumably
+    search    Tune RF/SVM hyperparameters locally and register the best model
+    loadtest  Measure throughput and latency of endpoints at increasing QPS
+    pipeline  Run upload, training, deployment and testing as a resumable DAG (cloud_train_deploy.py)
+    status    Show training job status (check_training_status.py)
+    monitor   Watch running training jobs (monitor_training.py)
+"""
+import os
+import sys
+import argparse
+
+PROG = 'python -m src'
+
+# Commands implemented by a root script; their arguments are parsed by the script's main()
+SCRIPT_COMMANDS = {
+    'prepare': ('prepare_cloud_data', "Validate, split and write the training data"),
+    'pipeline': ('cloud_train_deploy', "Upload, train, deploy and test as a resumable pipeline"),
+    'status': ('check_training_status', "Show training job status"),
+    'monitor': ('monitor_training', "Watch running training jobs until they finish"),
+}
+
+
+def _load_env():
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def _init_vertex_ai():
+    from src.dataset_cache import init_vertex_ai
+    return init_vertex_ai()
+
+
+def cmd_upload(args):
+    """Upload a local file to the bucket in GOOGLE_CLOUD_BUCKET."""
+    from src.cloud_utils import upload_data_to_cloud
+    _load_env()
+    path = args.path
+    if args.csv:
+        from src.data_format import as_csv
+        path = as_csv(path)
+    upload_data_to_cloud(
+        path,
+        args.dest,
+        skip_unchanged=not args.force,
+        verify_remote=args.verify_remote
+    )
+
+
+def cmd_train(args):
+    """Train on a dataset URI, or upload a local dataset first."""
+    from src.cloud_utils import train_model_on_cloud, upload_data_to_cloud
+    _load_env()
+    dataset_uri = args.dataset
+    if not dataset_uri.startswith('gs://'):
+        from src.data_format import as_csv
+        # Vertex AI tabular datasets are created from CSV
+        dataset_uri = upload_data_to_cloud(as_csv(dataset_uri))
+    model = train_model_on_cloud(
+        display_name=args.display_name,
+        dataset_uri=dataset_uri,
+        target_column=args.target,
+        training_params={
+            "budget_milli_node_hours": args.budget,
+            "model_display_name": f"{args.display_name}_model"
+        }
+    )
+    print(f"Trained model: {model.resource_name}")
+
+
+def cmd_deploy(args):
+    """Deploy an existing Vertex AI model by resource name or ID."""
+    from src.cloud_utils import canary_rollout, deploy_model
+    _load_env()
+    aiplatform = _init_vertex_ai()
+    model = aiplatform.Model(args.model)
+    options = {
+        'machine_type': args.machine_type,
+        'min_replica_count': args.min_replicas,
+        'max_replica_count': args.max_replicas or args.min_replicas,
+        'autoscaling_target_cpu_utilization': args.target_cpu
+    }
+    endpoint = aiplatform.Endpoint(args.endpoint) if args.endpoint else None
+    if args.canary_steps:
+        if endpoint is None:
+            raise SystemExit("--canary-steps needs --endpoint")
+        canary_rollout(model, endpoint, steps=args.canary_steps, bake_seconds=args.bake_seconds,
+                       undeploy_previous=args.undeploy_previous, **options)
+    else:
+        if endpoint is None and args.traffic_percentage is not None:
+            raise SystemExit("--traffic-percentage needs --endpoint")
+        deploy_model(model, endpoint=endpoint, traffic_percentage=args.traffic_percentage, **options)
+
+
+def cmd_loadtest(args):
+    """Sweep request rates against endpoints and recommend the cheapest that meets the SLO."""
+    from src.load_test import cheapest_config, format_curve, load_requests, sweep, synthetic_requests
+
+    _load_env()
+    if args.requests:
+        requests = load_requests(args.requests)
+    else:
+        requests = synthetic_requests(max(1000, int(max(args.qps) * args.duration)), args.batch)
+
+    # Configurations, cheapest first
+    if args.endpoint:
+        aiplatform = _init_vertex_ai()
+        configs = [(name, aiplatform.Endpoint(name)) for name in args.endpoint]
+    elif args.model:
+        from src.local_predictor import LocalPredictor
+        configs = [(args.model, LocalPredictor(path=args.model))]
+    else:
+        from src.fakes import FakeEndpoint
+        configs = [
+            (f"stub, {replicas} replica(s)", FakeEndpoint(latency=args.stub_latency, replicas=replicas))
+            for replicas in args.replicas
+        ]
+
+    curves = []
+    for name, endpoint in configs:
+        results = sweep(endpoint, requests, args.qps, args.duration, max_in_flight=args.max_in_flight)
+        print(f"\n{name}\n{format_curve(results, args.slo_p99_ms)}")
+        curves.append((name, results))
+    if args.target_qps:
+        best = cheapest_config(curves, args.target_qps, args.slo_p99_ms)
+        if best is None:
+            print(f"\nNo configuration meets p99 <= {args.slo_p99_ms} ms at {args.target_qps} QPS")
+        else:
+            print(f"\nCheapest configuration meeting p99 <= {args.slo_p99_ms} ms at {args.target_qps} QPS: {best}")
+
+
+def cmd_predict(args):
+    """Score a dataset and print a summary, optionally writing the predictions."""
+    from src.batch_predict import predict_in_batches
+    from src.batch_scoring import prediction_frame
+    from src.data_format import find_dataset, read_dataset, write_dataset
+
+    _load_env()
+    if args.endpoint:
+        endpoint = _init_vertex_ai().Endpoint(args.endpoint)
+    else:
+        from src.local_predictor import LocalPredictor
+        endpoint = LocalPredictor(path=args.model, model_dir=args.model_dir)
+
+    data = read_dataset(args.input or find_dataset("data/cloud", "test_data"))
+    features = data.drop(columns=[args.target], errors='ignore')
+    # Remote endpoints get bodies encoded straight from the columns; a local
+    # model takes the instances in memory, so encoding would only add work
+    predictions = predict_in_batches(
+        endpoint, features, max_in_flight=args.workers,
+        encode=bool(args.endpoint), columns=list(features.columns) if args.endpoint else None
+    )
+    result = prediction_frame(predictions)
+
+    print(f"Scored {len(features)} instances")
+    if args.target in data.columns and 'predicted_class' in result:
+        accuracy = (result['predicted_class'].astype(str).to_numpy()
+                    == data[args.target].astype(str).to_numpy()).mean()
+        print(f"Accuracy against {args.target!r}: {accuracy:.4f}")
+    if args.output:
+        write_dataset(result, args.output)
+        print(f"Predictions written to {args.output}")
+    else:
+        print(result.head(5).to_string(index=False))
+
+
+def cmd_score(args):
+    """Batch-score a file, resuming an interrupted run, and report throughput and memory."""
+    from src.batch_scoring import score_file
+
+    _load_env()
+    endpoint = _init_vertex_ai().Endpoint(args.endpoint) if args.endpoint else None
+    result = score_file(
+        args.input,
+        args.output,
+        model_path=args.model,
+        model_dir=args.model_dir,
+        endpoint=endpoint,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        keep_columns=args.keep_columns,
+        mmap=not args.no_mmap,
+        encode=bool(args.endpoint),
+        resume=not args.restart
+    )
+    if result.resumed_chunks:
+        print(f"Resumed after {result.resumed_chunks} chunks scored by an earlier run")
+    print(f"Scored {result.rows} rows in {result.chunks} chunks in {result.seconds:.1f} s "
+          f"({result.rows_per_second:,.0f} rows/s)")
+    print(f"Peak RSS: {result.peak_rss_mb:.0f} MB"
+          + (f", largest worker {result.worker_peak_rss_mb:.0f} MB" if result.worker_peak_rss_mb else ""))
+    print(f"Predictions written to {result.output_path}")
+
+
+def cmd_search(args):
+    """Run a local hyperparameter search and register the winning model."""
+    from src.data_format import find_dataset, read_dataset
+    from src.hyperparam_search import run_search
+    from src.model_registry import ModelRegistry
+    from src.utils import compute_file_hash
+
+    train_path = args.input or find_dataset("data/cloud", "training_data")
+    test_path = args.test or find_dataset("data/cloud", "test_data")
+    registry = ModelRegistry(args.registry)
+    result = run_search(
+        read_dataset(train_path),
+        read_dataset(test_path),
+        target_column=args.target,
+        model_types=tuple(args.model_types),
+        n_configs=args.configs,
+        min_rows=args.min_rows,
+        eta=args.eta,
+        n_jobs=args.workers,
+        random_state=args.seed,
+        registry=registry,
+        dataset_hash=compute_file_hash(train_path)
+    )
+    best = result['best']
+    print(f"Ran {len(result['trials'])} trials over {result['metrics']['configs']} configurations")
+    print(f"Best: {best.model_type} {best.params}")
+    print(f"Metrics: {result['metrics']}")
+    if args.set_current:
+        registry.set_current(result['version_id'])
+    print(f"Registered version {result['version_id']}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog=PROG, description="Cloud ML pipeline")
+    parser.add_argument('--metrics-file', default=None,
+                        help="Record metrics and write them here in Prometheus text format on exit")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="Record metrics and serve them on this port while the command runs")
+    commands = parser.add_subparsers(dest='command', metavar='<command>')
+
+    def add_script_command(name):
+        # Arguments (and --help) are handled by the script itself
+        commands.add_parser(name, help=SCRIPT_COMMANDS[name][1], add_help=False)
+
+    add_script_command('prepare')
+
+    upload = commands.add_parser('upload', help="Upload a file to Cloud Storage")
+    upload.add_argument('path', help="Local file")
+    upload.add_argument('--dest', default=None, help="Object name (default: the file name)")
+    upload.add_argument('--csv', action='store_true', help="Convert to CSV before uploading")
+    upload.add_argument('--force', action='store_true', help="Upload even if unchanged")
+    upload.add_argument('--verify-remote', action='store_true',
+                        help="Check the remote checksum before skipping")
+    upload.set_defaults(handler=cmd_upload)
+
+    train = commands.add_parser('train', help="Train an AutoML tabular model")
+    train.add_argument('dataset', help="gs:// URI, or a local dataset to upload first")
+    train.add_argument('--display-name', default='iris_classifier')
+    train.add_argument('--target', default='target')
+    train.add_argument('--budget', type=int, default=1000, help="Budget in milli node hours")
+    train.set_defaults(handler=cmd_train)
+
+    deploy = commands.add_parser('deploy', help="Deploy a trained model to an endpoint")
+    deploy.add_argument('model', help="Model resource name or ID")
+    deploy.add_argument('--machine-type', default='n1-standard-2')
+    deploy.add_argument('--min-replicas', type=int, default=1)
+    deploy.add_argument('--max-replicas', type=int, default=None, help="Autoscaling bound (default: --min-replicas)")
+    deploy.add_argument('--target-cpu', type=int, default=None, help="CPU %% that triggers autoscaling")
+    deploy.add_argument('--endpoint', default=None, help="Deploy next to the models on this endpoint")
+    deploy.add_argument('--traffic-percentage', type=int, default=None,
+                        help="Share of the endpoint's traffic for the model (default: 100)")
+    deploy.add_argument('--canary-steps', type=int, nargs='+', default=None,
+                        help="Shift traffic in these percentage steps, e.g. 10 50 100")
+    deploy.add_argument('--bake-seconds', type=float, default=300.0, help="Time at each canary step")
+    deploy.add_argument('--undeploy-previous', action='store_true',
+                        help="Undeploy the old models after a canary reaches 100%%")
+    deploy.set_defaults(handler=cmd_deploy)
+
+    predict = commands.add_parser('predict', help="Score a dataset")
+    source = predict.add_mutually_exclusive_group()
+    source.add_argument('--endpoint', help="Vertex AI endpoint resource name or ID")
+    source.add_argument('--model', help="Local model artifact (default: newest in --model-dir)")
+    predict.add_argument('--model-dir', default='models')
+    predict.add_argument('--input', default=None, help="Dataset to score (default: data/cloud/test_data)")
+    predict.add_argument('--output', default=None, help="Write predictions to this .parquet/.csv file")
+    predict.add_argument('--target', default='target', help="Label column, dropped before scoring")
+    predict.add_argument('--workers', type=int, default=4, help="Requests in flight")
+    predict.set_defaults(handler=cmd_predict)
+
+    score = commands.add_parser('score', help="Batch-score a large file")
+    score.add_argument('input', help="Parquet or CSV file to score")
+    score.add_argument('output', help="Output .parquet/.csv file for predictions and probabilities")
+    source = score.add_mutually_exclusive_group()
+    source.add_argument('--endpoint', help="Vertex AI endpoint resource name or ID")
+    source.add_argument('--model', help="Local model artifact (default: newest in --model-dir)")
+    score.add_argument('--model-dir', default='models')
+    score.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help="Worker processes for a local model, threads for an endpoint")
+    score.add_argument('--chunksize', type=int, default=50_000, help="Rows per chunk")
+    score.add_argument('--keep-columns', nargs='+', default=None,
+                       help="Input columns copied to the output, e.g. an ID")
+    score.add_argument('--no-mmap', action='store_true', help="Unpickle the model in every worker")
+    score.add_argument('--restart', action='store_true', help="Ignore the checkpoint of an earlier run")
+    score.set_defaults(handler=cmd_score)
+
+    search = commands.add_parser('search', help="Tune hyperparameters locally")
+    search.add_argument('--input', default=None, help="Training data (default: data/cloud/training_data)")
+    search.add_argument('--test', default=None, help="Test data (default: data/cloud/test_data)")
+    search.add_argument('--target', default='target')
+    search.add_argument('--model-types', nargs='+', default=['random_forest', 'svm'])
+    search.add_argument('--configs', type=int, default=24, help="Configurations sampled")
+    search.add_argument('--min-rows', type=int, default=30, help="Training rows in the first rung")
+    search.add_argument('--eta', type=int, default=3, help="Successive halving factor")
+    search.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    search.add_argument('--seed', type=int, default=42)
+    search.add_argument('--registry', default='models/registry')
+    search.add_argument('--set-current', action='store_true', help="Make the best model the current version")
+    search.set_defaults(handler=cmd_search)
+
+    loadtest = commands.add_parser('loadtest', help="Measure latency at increasing QPS")
+    target = loadtest.add_mutually_exclusive_group()
+    target.add_argument('--endpoint', nargs='+', help="Vertex AI endpoints to compare, cheapest first")
+    target.add_argument('--model', help="Local model artifact")
+    loadtest.add_argument('--replicas', type=int, nargs='+', default=[1, 2, 4],
+                          help="Replica counts of the local stub (used without --endpoint/--model)")
+    loadtest.add_argument('--stub-latency', type=float, default=0.05, help="Seconds per stub request")
+    loadtest.add_argument('--requests', default=None, help="Recorded requests, one JSON body per line")
+    loadtest.add_argument('--batch', type=int, default=1, help="Instances per synthetic request")
+    loadtest.add_argument('--qps', type=float, nargs='+', default=[5, 10, 20, 40, 80])
+    loadtest.add_argument('--duration', type=float, default=10.0, help="Seconds per rate")
+    loadtest.add_argument('--max-in-flight', type=int, default=256)
+    loadtest.add_argument('--slo-p99-ms', type=float, default=200.0)
+    loadtest.add_argument('--target-qps', type=float, default=None,
+                          help="Rate the endpoint must sustain; picks the cheapest configuration")
+    loadtest.set_defaults(handler=cmd_loadtest)
+
+    add_script_command('pipeline')
+    add_script_command('status')
+    add_script_command('monitor')
+    return parser
+
+
+def main(argv=None):
+    """
+    Run one command.
+
+    Args:
+        argv (list, optional): Arguments without the program name; defaults to sys.argv[1:]
+
+    Returns:
+        int: Exit status
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    args, script_argv = parser.parse_known_args(argv)
+    if args.command not in SCRIPT_COMMANDS:
+        # Only script commands take arguments this parser does not know
+        args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+
+    registry = None
+    if args.metrics_file or args.metrics_port:
+        from src import metrics
+        registry = metrics.REGISTRY
+        metrics.enable(registry)
+        if args.metrics_port:
+            registry.start_http_server(args.metrics_port)
+    try:
+        if args.command in SCRIPT_COMMANDS:
+            import importlib
+            module = importlib.import_module(SCRIPT_COMMANDS[args.command][0])
+            module.main(script_argv, prog=f"{PROG} {args.command}")
+        else:
+            args.handler(args)
+    finally:
+        if args.metrics_file:
+            registry.write_textfile(args.metrics_file)
+    return 0
@@ -1,64 +1,114 @@
 import os
-from google.cloud import storage
-from google.cloud import aiplatform
-import pandas as pd
+import time
+import warnings
+from src import metrics
+from src.dataset_cache import get_dataset_cache, init_vertex_ai
+from src.prediction_cache import CachedEndpoint, get_prediction_cache
+from src.transfer import get_bucket
+from src.upload_manifest import upload_if_changed
 
-def upload_data_to_cloud(local_data_path, cloud_data_path=None):
+# AutoML tabular jobs pick the algorithm themselves, so this is the only model type
+AUTOML_MODEL_TYPE = 'automl'
+
+@metrics.timed('upload_data_to_cloud')
+def upload_data_to_cloud(
+    local_data_path,
+    cloud_data_path=None,
+    bucket=None,
+    skip_unchanged=True,
+    verify_remote=False,
+    manifest=None,
+    **upload_options
+):
     """
     Upload data to Google Cloud Storage.
     
+    Large files are uploaded as parallel composite uploads that resume from the
+    last committed part after a failure (see src.transfer.upload_file). Files
+    already uploaded with the same content are skipped and their URI returned
+    (see src.upload_manifest).
+    
     Args:
         local_data_path (str): Path to local data file
         cloud_data_path (str, optional): Path in cloud storage. If None, uses the same filename
+        bucket (optional): Bucket handle. If None, uses GOOGLE_CLOUD_BUCKET on the shared client
+        skip_unchanged (bool): Skip the upload if the manifest shows unchanged content
+        verify_remote (bool): Before skipping, check the remote object's checksum
+        manifest (UploadManifest, optional): Manifest to use instead of the default one
+        **upload_options: Passed to src.transfer.upload_file, e.g. ``progress_callback``
     
     Returns:
         str: GCS URI of uploaded file
     """
-    storage_client = storage.Client()
-    bucket_name = os.getenv('GOOGLE_CLOUD_BUCKET')
-    bucket = storage_client.bucket(bucket_name)
+    bucket = bucket or get_bucket()
     
     # If no cloud path specified, use the filename from local path
     if cloud_data_path is None:
         cloud_data_path = os.path.basename(local_data_path)
     
-    blob = bucket.blob(cloud_data_path)
-    blob.upload_from_filename(local_data_path)
-    
-    gcs_uri = f"gs://{bucket_name}/{cloud_data_path}"
-    print(f"Data uploaded to {gcs_uri}")
+    gcs_uri, uploaded = upload_if_changed(
+        local_data_path,
+        cloud_data_path,
+        bucket,
+        manifest=manifest,
+        verify_remote=verify_remote,
+        force=not skip_unchanged,
+        **upload_options
+    )
+    if uploaded:
+        metrics.counter('upload_bytes_total', "Bytes uploaded to Cloud Storage").inc(
+            os.path.getsize(local_data_path)
+        )
+        print(f"Data uploaded to {gcs_uri}")
+    else:
+        metrics.counter('upload_skipped_total', "Uploads skipped as unchanged").inc()
+        print(f"Data unchanged, reusing {gcs_uri}")
     return gcs_uri
 
+@metrics.timed('train_model_on_cloud')
 def train_model_on_cloud(
     display_name,
     dataset_uri,
     target_column,
-    model_type="random_forest",
-    training_params=None
+    model_type=None,
+    training_params=None,
+    dataset_cache=None
 ):
     """
     Train a model using Vertex AI AutoML.
     
+    The tabular dataset is reused from earlier runs when ``dataset_uri`` still
+    has the same content (see src.dataset_cache), and the SDK is initialised
+    once per process.
+    
     Args:
         display_name (str): Name for the training job
         dataset_uri (str): GCS URI of the training dataset
         target_column (str): Name of the target column
-        model_type (str): Type of model to train ("random_forest" or "svm")
+        model_type (str, optional): "automl" (the default). AutoML chooses the
+            algorithm itself, so the older "random_forest" and "svm" values are
+            deprecated: they still train the same AutoML job, with a warning.
         training_params (dict, optional): Additional training parameters
+        dataset_cache (DatasetCache, optional): Defaults to the process-wide cache
     
     Returns:
         Model: Trained model object
     """
-    aiplatform.init(
-        project=os.getenv('GOOGLE_CLOUD_PROJECT'),
-        location=os.getenv('GOOGLE_CLOUD_REGION')
-    )
+    if model_type not in (None, AUTOML_MODEL_TYPE):
+        warnings.warn(
+            f"model_type={model_type!r} is deprecated: AutoML tabular training chooses the "
+            f"algorithm itself and trains the same job for every type; use {AUTOML_MODEL_TYPE!r}",
+            DeprecationWarning,
+            # Past the metrics.timed wrapper, to the caller
+            stacklevel=3
+        )
     
-    # Create dataset
-    dataset = aiplatform.TabularDataset.create(
-        display_name=f"{display_name}_dataset",
-        gcs_source=dataset_uri
-    )
+    # The SDK is imported on first use: it takes seconds and most callers never train
+    aiplatform = init_vertex_ai()
+    
+    # Reuse the dataset created from this source, unless its content changed
+    dataset_cache = dataset_cache or get_dataset_cache()
+    dataset = dataset_cache.get_or_create(dataset_uri, f"{display_name}_dataset")
     
     # Define default training parameters for classification
     if training_params is None:
@@ -115,36 +165,242 @@ def train_model_on_cloud(
     
     return model
 
-def deploy_model(model, machine_type="n1-standard-2"):
+@metrics.timed('deploy_model')
+def deploy_model(
+    model,
+    machine_type="n1-standard-2",
+    min_replica_count=1,
+    max_replica_count=1,
+    endpoint=None,
+    traffic_percentage=None,
+    traffic_split=None,
+    autoscaling_target_cpu_utilization=None,
+    **deploy_options
+):
     """
     Deploy a trained model to an endpoint.
     
+    With ``max_replica_count`` above ``min_replica_count`` Vertex AI scales the
+    replicas between the two on CPU utilisation (or another autoscaling target
+    passed in ``deploy_options``). Use src.load_test to find the range that
+    meets the latency SLO at the expected QPS.
+    
+    Cached predictions for the endpoint are dropped, so they are not served
+    for the new model (see src.prediction_cache).
+    
     Args:
         model: Trained model object
         machine_type (str): Type of machine to use for deployment
+        min_replica_count (int): Replicas always running
+        max_replica_count (int): Upper bound for autoscaling
+        endpoint (optional): Existing endpoint to add the model to; None creates one
+            and gives the model all of its traffic
+        traffic_percentage (int, optional): Share of the endpoint's traffic for this
+            model, the rest being split proportionally among the models already
+            deployed. Defaults to 100 (the model replaces the others).
+        traffic_split (dict, optional): Explicit split by deployed model ID, with
+            "0" standing for this model; overrides ``traffic_percentage``
+        autoscaling_target_cpu_utilization (int, optional): CPU % that triggers scaling
+        **deploy_options: Passed to ``model.deploy``, e.g. ``deployed_model_display_name``
     
     Returns:
         Endpoint: Deployed model endpoint
     """
+    if not 1 <= min_replica_count <= max_replica_count:
+        raise ValueError(
+            f"Need 1 <= min_replica_count <= max_replica_count, got {min_replica_count} and {max_replica_count}"
+        )
+    if traffic_percentage is not None and not 0 <= traffic_percentage <= 100:
+        raise ValueError(f"traffic_percentage must be between 0 and 100, got {traffic_percentage}")
+    if traffic_split is not None and sum(traffic_split.values()) != 100:
+        raise ValueError(f"traffic_split must add up to 100, got {traffic_split}")
+    if endpoint is None and (traffic_percentage is not None or traffic_split is not None):
+        # A new endpoint serves only this model, so a split would be silently ignored
+        raise ValueError("traffic_percentage and traffic_split need an existing endpoint")
+    
+    options = dict(deploy_options)
+    if endpoint is not None:
+        options['endpoint'] = endpoint
+        if traffic_split is not None:
+            options['traffic_split'] = traffic_split
+        else:
+            options['traffic_percentage'] = 100 if traffic_percentage is None else traffic_percentage
+    if autoscaling_target_cpu_utilization is not None:
+        options['autoscaling_target_cpu_utilization'] = autoscaling_target_cpu_utilization
+    
     endpoint = model.deploy(
         machine_type=machine_type,
-        min_replica_count=1,
-        max_replica_count=1
+        min_replica_count=min_replica_count,
+        max_replica_count=max_replica_count,
+        **options
     )
     
-    print(f"Model deployed to endpoint: {endpoint.resource_name}")
+    get_prediction_cache().invalidate(endpoint.resource_name)
+    print(f"Model deployed to endpoint: {endpoint.resource_name} "
+          f"({min_replica_count}-{max_replica_count} replicas of {machine_type})")
     return endpoint
 
-def predict_with_endpoint(endpoint, instances):
+def shift_traffic(traffic_split, deployed_model_id, percentage):
+    """
+    Return a traffic split giving ``percentage`` to one deployed model.
+    
+    The remaining traffic is shared among the other models in proportion to
+    their current shares, rounded so the split adds up to exactly 100.
+    
+    Args:
+        traffic_split (dict): Current split by deployed model ID
+        deployed_model_id (str): Model whose share is set
+        percentage (int): Its new share
+    
+    Returns:
+        dict: New split by deployed model ID
+    """
+    others = {key: value for key, value in traffic_split.items() if key != deployed_model_id}
+    remaining = 100 - percentage
+    total = sum(others.values())
+    if not others:
+        return {deployed_model_id: 100}
+    if total == 0:
+        # Nothing to be proportional to: give the rest to the first model
+        shares = {key: 0 for key in others}
+        shares[next(iter(others))] = remaining
+    else:
+        exact = {key: remaining * value / total for key, value in others.items()}
+        shares = {key: int(value) for key, value in exact.items()}
+        # Largest remainders get the leftover points
+        leftover = remaining - sum(shares.values())
+        for key in sorted(exact, key=lambda k: exact[k] - shares[k], reverse=True)[:leftover]:
+            shares[key] += 1
+    shares[deployed_model_id] = percentage
+    return shares
+
+class CanaryRollbackError(RuntimeError):
+    """A canary failed its check; the endpoint's previous traffic split was restored."""
+    
+    def __init__(self, deployed_model_id, percentage):
+        super().__init__(f"Canary {deployed_model_id} failed its check at {percentage}% traffic; rolled back")
+        self.deployed_model_id = deployed_model_id
+        self.percentage = percentage
+
+def canary_rollout(
+    model,
+    endpoint,
+    steps=(10, 50, 100),
+    check=None,
+    bake_seconds=0.0,
+    undeploy_previous=False,
+    **deploy_options
+):
+    """
+    Deploy a model next to the live one and shift traffic to it step by step.
+    
+    The model is deployed with ``steps[0]`` percent of the traffic. Before each
+    further step, ``bake_seconds`` pass and ``check`` decides whether the canary
+    is healthy. A failed check restores the previous split and undeploys the canary.
+    
+    Args:
+        model: Trained model object
+        endpoint: Endpoint already serving the current model
+        steps (tuple): Increasing traffic percentages for the canary
+        check (callable, optional): ``check(endpoint, deployed_model_id)`` returning
+            False to roll back, e.g. by comparing error rates or latency
+        bake_seconds (float): Time at each step before it is checked
+        undeploy_previous (bool): Undeploy the old models once the canary has 100%
+        **deploy_options: Passed to deploy_model (replica counts, machine type...)
+    
+    Returns:
+        str: Deployed model ID of the promoted canary
+    
+    Raises:
+        CanaryRollbackError: When ``check`` fails
+    """
+    previous = dict(endpoint.traffic_split)
+    if not previous:
+        raise ValueError("A canary rollout needs an endpoint that already serves a model")
+    if list(steps) != sorted(steps) or not 0 < steps[0] <= 100:
+        raise ValueError(f"steps must be increasing percentages, got {steps}")
+    
+    deploy_model(model, endpoint=endpoint, traffic_percentage=steps[0], **deploy_options)
+    canary_id = next(key for key in endpoint.traffic_split if key not in previous)
+    print(f"Canary {canary_id} serving {steps[0]}% of traffic")
+    
+    for step, percentage in enumerate(steps):
+        if bake_seconds:
+            time.sleep(bake_seconds)
+        if check is not None and not check(endpoint, canary_id):
+            endpoint.update(traffic_split=previous)
+            endpoint.undeploy(canary_id)
+            get_prediction_cache().invalidate(endpoint.resource_name)
+            raise CanaryRollbackError(canary_id, steps[step])
+        if step + 1 < len(steps):
+            endpoint.update(traffic_split=shift_traffic(endpoint.traffic_split, canary_id, steps[step + 1]))
+            get_prediction_cache().invalidate(endpoint.resource_name)
+            print(f"Canary {canary_id} serving {steps[step + 1]}% of traffic")
+    
+    if undeploy_previous and steps[-1] == 100:
+        for deployed_model_id in previous:
+            endpoint.undeploy(deployed_model_id)
+    return canary_id
+
+@metrics.timed('predict_with_endpoint')
+def predict_with_endpoint(endpoint, instances, cache=None):
     """
     Make predictions using a deployed model endpoint.
     
     Args:
         endpoint: Deployed model endpoint
         instances: List of instances to predict
+        cache (PredictionCache, optional): Serve repeated instances from this
+            cache and send only the misses to the endpoint
     
     Returns:
         List of predictions
     """
+    if cache is not None:
+        endpoint = cache.wrap(endpoint)
     predictions = endpoint.predict(instances=instances)
-    return predictions
\ No newline at end of file
+    # A CachedEndpoint counts only the misses it forwards, not the cache hits
+    if not isinstance(endpoint, CachedEndpoint):
+        metrics.counter('predict_instances_total', "Instances sent for prediction").inc(len(instances))
+    return predictions
+
+class VertexAIBackend:
+    """
+    Vertex AI operations behind the interface used by src.pipeline stages.
+    
+    Every method takes and returns plain strings (URIs and resource names) or
+    dicts, so stage outputs can be checkpointed and a rerun can pick up a
+    model or endpoint created by an earlier process. src.fakes.FakeTrainingBackend
+    implements the same methods locally.
+    """
+    
+    def upload(self, local_path):
+        """Upload a file and return its GCS URI."""
+        return upload_data_to_cloud(local_path)
+    
+    def train(self, display_name, dataset_uri, target_column, model_type, training_params=None):
+        """Train a model and return its resource name."""
+        model = train_model_on_cloud(
+            display_name=display_name,
+            dataset_uri=dataset_uri,
+            target_column=target_column,
+            model_type=model_type,
+            training_params=training_params
+        )
+        return model.resource_name
+    
+    def evaluate(self, model_name):
+        """Return the evaluation metrics of a trained model as a dict."""
+        aiplatform = init_vertex_ai()
+        evaluation = aiplatform.Model(model_name).get_model_evaluation()
+        return dict(evaluation.to_dict().get('metrics', {}))
+    
+    def deploy(self, model_name, machine_type="n1-standard-2"):
+        """Deploy a model and return the endpoint's resource name."""
+        aiplatform = init_vertex_ai()
+        return deploy_model(aiplatform.Model(model_name), machine_type=machine_type).resource_name
+    
+    def endpoint(self, endpoint_name):
+        """Return a handle for a deployed endpoint."""
+        aiplatform = init_vertex_ai()
+        return aiplatform.Endpoint(endpoint_name)
\ No newline at end of file
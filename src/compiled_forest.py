@@ -0,0 +1,362 @@
+"""
+Compiled, array-backed random forest predictor.
+
+compile_forest flattens every tree of a fitted RandomForestClassifier into one
+set of contiguous node arrays. Nodes are laid out breadth-first with siblings
+adjacent, so a node only needs ``feature``, ``threshold``, ``left`` (the right
+child is ``left + 1``) and its class ``value``. Leaves point at themselves with
+an infinite threshold, which lets a batch be evaluated level by level for all
+trees at once without masking rows that have already reached a leaf.
+
+When every tree has at most 64 leaves (always the case for the iris models),
+the forest is also evaluated without walking levels: each split that sends a
+row right rules out the leaves of its left subtree, so per feature a row's
+ruled-out leaves depend only on where its value falls among the split
+thresholds. Those leaf bitmasks are precomputed per tree and feature, and the
+exit leaf is the lowest leaf bit that survives the AND of the four masks.
+
+Predictions are bit-identical to ``RandomForestClassifier.predict_proba``: the
+input is cast to float32 as sklearn does, per-tree probabilities are summed in
+estimator order and divided by the number of trees. Thresholds are stored as
+float32 rounded towards -inf, which gives exactly the same ``x <= threshold``
+decisions for float32 inputs as the original float64 thresholds.
+"""
+import os
+import json
+
+import numpy as np
+
+COMPILED_FORMAT_VERSION = 1
+_ARRAY_NAMES = ('feature', 'threshold', 'left', 'value', 'roots', 'classes')
+
+# Rows evaluated per step; bounds the (n_trees, block) index arrays in memory
+DEFAULT_BLOCK_SIZE = 4096
+
+# Trees with more leaves than bits in a uint64 use level-by-level traversal
+_MAX_MASK_LEAVES = 64
+
+
+def _leaf_values(tree, n_classes):
+    """Per-node class probabilities, matching DecisionTreeClassifier.predict_proba."""
+    value = tree.value[:, 0, :n_classes].astype(np.float64)
+    totals = value.sum(axis=1)
+    # scikit-learn >= 1.4 stores class fractions; older releases stored counts
+    # and normalised them at predict time
+    if not np.allclose(totals, 1.0):
+        totals[totals == 0.0] = 1.0
+        value = value / totals[:, np.newaxis]
+    return value
+
+
+def _float32_thresholds(threshold):
+    """Round thresholds down to float32 without changing any float32 comparison."""
+    threshold32 = threshold.astype(np.float32)
+    too_high = threshold32.astype(np.float64) > threshold
+    threshold32[too_high] = np.nextafter(threshold32[too_high], np.float32(-np.inf))
+    return threshold32
+
+
+def _breadth_first_order(tree):
+    """Return node ids in breadth-first order with each node's children adjacent."""
+    order = [0]
+    for node in order:
+        if tree.children_left[node] >= 0:
+            order.append(tree.children_left[node])
+            order.append(tree.children_right[node])
+    return np.asarray(order, dtype=np.intp)
+
+
+def compile_forest(model):
+    """
+    Compile a fitted RandomForestClassifier into a CompiledForest.
+
+    Args:
+        model: Fitted ``RandomForestClassifier`` or an artifact dict holding it
+            under ``model``
+
+    Returns:
+        CompiledForest: Array-backed equivalent of ``model``
+    """
+    if isinstance(model, dict):
+        model = model['model']
+    if getattr(model, 'n_outputs_', 1) != 1:
+        raise ValueError("Only single-output forests can be compiled")
+
+    n_classes = int(model.n_classes_)
+    n_features = int(model.n_features_in_)
+    features, thresholds, lefts, values, roots = [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        order = _breadth_first_order(tree)
+        position = np.empty(tree.node_count, dtype=np.intp)
+        position[order] = np.arange(len(order))
+
+        children = tree.children_left[order]
+        is_leaf = children < 0
+        left = np.where(is_leaf, np.arange(len(order)), position[np.maximum(children, 0)])
+
+        threshold = _float32_thresholds(np.where(is_leaf, 0.0, tree.threshold[order]))
+        threshold[is_leaf] = np.inf
+
+        features.append(np.where(is_leaf, 0, tree.feature[order]))
+        thresholds.append(threshold)
+        lefts.append(left + offset)
+        values.append(_leaf_values(tree, n_classes)[order])
+        roots.append(offset)
+        offset += tree.node_count
+
+    return CompiledForest(
+        feature=np.concatenate(features).astype(np.min_scalar_type(n_features)),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts).astype(np.int32),
+        value=np.concatenate(values),
+        roots=np.asarray(roots, dtype=np.int32),
+        classes=np.asarray(model.classes_),
+        n_features=n_features
+    )
+
+
+class CompiledForest:
+    """Random forest flattened into contiguous NumPy node arrays."""
+
+    def __init__(self, feature, threshold, left, value, roots, classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+
+        self.depth = self._compute_depth()
+        self._leaf_masks = self._build_leaf_masks()
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def _arrays(self):
+        return {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'left': self.left,
+            'value': self.value,
+            'roots': self.roots,
+            'classes': self.classes_
+        }
+
+    @property
+    def nbytes(self):
+        """Total size of the node arrays and lookup tables in bytes."""
+        total = sum(array.nbytes for array in self._arrays().values())
+        if self._leaf_masks is not None:
+            grids, tables, leaf_nodes = self._leaf_masks
+            total += sum(a.nbytes for a in grids) + sum(a.nbytes for a in tables)
+            total += leaf_nodes.nbytes
+        return total
+
+    def _compute_depth(self):
+        """Number of levels needed for every tree to reach a leaf."""
+        nodes = self.roots.astype(np.intp)
+        depth = 0
+        while True:
+            nodes = nodes[self.left[nodes] != nodes]
+            if len(nodes) == 0:
+                return depth
+            children = self.left[nodes].astype(np.intp)
+            nodes = np.concatenate([children, children + 1])
+            depth += 1
+
+    def _build_leaf_masks(self):
+        """
+        Precompute per-tree, per-feature leaf bitmasks for exit-leaf evaluation.
+
+        Returns:
+            tuple or None: ``(grids, tables, leaf_nodes)`` or None when a tree has
+            too many leaves for a 64-bit mask
+        """
+        trees = []
+        for root in self.roots:
+            # Leaves in left-to-right order; the exit leaf is the leftmost survivor
+            leaves, stack, internal = [], [int(root)], []
+            while stack:
+                node = stack.pop()
+                if self.left[node] == node:
+                    leaves.append(node)
+                else:
+                    internal.append(node)
+                    stack.append(int(self.left[node]) + 1)
+                    stack.append(int(self.left[node]))
+            if len(leaves) > _MAX_MASK_LEAVES:
+                return None
+            trees.append((leaves, internal))
+
+        grids = []
+        for f in range(self.n_features_in_):
+            split_thresholds = [
+                self.threshold[node]
+                for _, internal in trees for node in internal if self.feature[node] == f
+            ]
+            grids.append(np.unique(np.asarray(split_thresholds, dtype=np.float32)))
+
+        # Use the narrowest unsigned type that has a bit for every leaf
+        max_leaves = max(len(leaves) for leaves, _ in trees)
+        mask_dtype = next(
+            dtype for dtype in (np.uint8, np.uint16, np.uint32, np.uint64)
+            if np.iinfo(dtype).bits >= max_leaves
+        )
+        all_leaves = int(np.iinfo(mask_dtype).max)
+        tables = [np.full((self.n_trees, len(g) + 1), all_leaves, dtype=mask_dtype) for g in grids]
+        leaf_nodes = np.zeros((self.n_trees, max_leaves), dtype=np.int32)
+
+        for t, (leaves, internal) in enumerate(trees):
+            bit = {node: 1 << i for i, node in enumerate(leaves)}
+            leaf_nodes[t, :len(leaves)] = leaves
+
+            def subtree_mask(node):
+                mask, stack = 0, [node]
+                while stack:
+                    node = stack.pop()
+                    if self.left[node] == node:
+                        mask |= bit[node]
+                    else:
+                        stack.extend((int(self.left[node]), int(self.left[node]) + 1))
+                return mask
+
+            for node in internal:
+                f = self.feature[node]
+                k = np.searchsorted(grids[f], self.threshold[node])
+                # Rows whose value is above this threshold go right, ruling out
+                # every leaf of the left subtree
+                tables[f][t, k + 1:] &= mask_dtype(all_leaves & ~subtree_mask(int(self.left[node])))
+
+        return grids, tables, leaf_nodes
+
+    def _check_input(self, X):
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Expected input with {self.n_features_in_} features, got shape {X.shape}"
+            )
+        # sklearn evaluates trees on float32 inputs
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+        return X
+
+    def apply(self, X):
+        """
+        Return the leaf reached in every tree for every row.
+
+        Args:
+            X: Array of shape ``(n_rows, n_features)``
+
+        Returns:
+            np.ndarray: Global leaf node indices of shape ``(n_trees, n_rows)``
+        """
+        X = self._check_input(X)
+        leaves = np.empty((self.n_trees, len(X)), dtype=np.intp)
+        for start in range(0, len(X), DEFAULT_BLOCK_SIZE):
+            leaves[:, start:start + DEFAULT_BLOCK_SIZE] = self._apply_block(
+                X[start:start + DEFAULT_BLOCK_SIZE]
+            )
+        return leaves
+
+    def _apply_block(self, X):
+        if self._leaf_masks is not None:
+            return self._apply_leaf_masks(X)
+        return self._apply_levels(X)
+
+    def _apply_levels(self, X):
+        """Walk all trees one level at a time."""
+        flat = X.ravel()
+        row_offsets = (np.arange(len(X)) * X.shape[1])[np.newaxis, :]
+        nodes = np.repeat(self.roots.astype(np.intp)[:, np.newaxis], len(X), axis=1)
+        for _ in range(self.depth):
+            values = flat.take(row_offsets + self.feature.take(nodes))
+            nodes = self.left.take(nodes) + (values > self.threshold.take(nodes))
+        return nodes
+
+    def _apply_leaf_masks(self, X):
+        """Find exit leaves from the precomputed per-feature leaf bitmasks."""
+        grids, tables, leaf_nodes = self._leaf_masks
+        mask = None
+        for f, (grid, table) in enumerate(zip(grids, tables)):
+            bins = np.searchsorted(grid, X[:, f], side='left')
+            feature_mask = table[:, bins]
+            mask = feature_mask if mask is None else mask & feature_mask
+        lowest = mask & (~mask + mask.dtype.type(1))
+        # log2 is exact on powers of two, giving the index of the lowest set bit
+        leaf_bits = np.log2(lowest).astype(np.intp)
+        return np.take_along_axis(leaf_nodes, leaf_bits, axis=1)
+
+    def predict_proba(self, X):
+        """
+        Predict class probabilities, bit-identical to the source forest.
+
+        Args:
+            X: Array of shape ``(n_rows, n_features)``
+
+        Returns:
+            np.ndarray: Probabilities of shape ``(n_rows, n_classes)``
+        """
+        X = self._check_input(X)
+        proba = np.empty((len(X), self.value.shape[1]), dtype=np.float64)
+        for start in range(0, len(X), DEFAULT_BLOCK_SIZE):
+            leaves = self._apply_block(X[start:start + DEFAULT_BLOCK_SIZE])
+            # Reducing over the tree axis adds trees one after another, in
+            # estimator order, exactly as sklearn accumulates them
+            proba[start:start + DEFAULT_BLOCK_SIZE] = np.add.reduce(
+                self.value.take(leaves, axis=0), axis=0
+            )
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        """Predict class labels for ``X``."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def save(self, path):
+        """
+        Save the compiled forest as a directory of ``.npy`` files.
+
+        The arrays are stored uncompressed so they can be memory-mapped on load.
+
+        Args:
+            path (str): Output directory
+        """
+        os.makedirs(path, exist_ok=True)
+        for name, array in self._arrays().items():
+            np.save(os.path.join(path, f"{name}.npy"), array, allow_pickle=False)
+        meta = {
+            'format_version': COMPILED_FORMAT_VERSION,
+            'n_features': self.n_features_in_,
+            'n_trees': self.n_trees
+        }
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        Load a compiled forest written by ``save``.
+
+        Args:
+            path (str): Directory written by ``save``
+            mmap_mode (str, optional): Passed to ``np.load``, e.g. "r" to
+                memory-map the node arrays instead of reading them
+
+        Returns:
+            CompiledForest: The loaded forest
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta['format_version'] != COMPILED_FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled forest format {meta['format_version']}")
+
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in _ARRAY_NAMES
+        }
+        return cls(n_features=meta['n_features'], **arrays)
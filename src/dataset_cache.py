@@ -0,0 +1,184 @@
+"""
+Reuse of Vertex AI tabular datasets across training runs.
+
+Creating a TabularDataset takes minutes, and the old train_model_on_cloud
+created a new one on every call. DatasetCache records which dataset resource
+was created from which source URI and what that source contained (its content
+hash). A later request for the same URI with the same content reuses the
+resource. A changed source invalidates the entry and a new dataset is created.
+
+Dataset operations go through a backend: VertexDatasetBackend talks to
+Vertex AI, and src.fakes.FakeDatasetBackend works locally. The Vertex AI SDK
+is initialised once per process (see init_vertex_ai).
+"""
+import os
+import json
+import threading
+from datetime import datetime
+
+from src.transfer import get_storage_client
+from src.utils import compute_file_hash, ensure_directory_exists
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'datasets.json')
+
+_init_lock = threading.Lock()
+_initialized = {}
+_default_cache = None
+
+
+def init_vertex_ai(project=None, location=None):
+    """
+    Initialise the Vertex AI SDK once per process and return the module.
+
+    Args:
+        project (str, optional): Defaults to GOOGLE_CLOUD_PROJECT
+        location (str, optional): Defaults to GOOGLE_CLOUD_REGION
+
+    Returns:
+        module: ``google.cloud.aiplatform``
+    """
+    from google.cloud import aiplatform
+    project = project or os.getenv('GOOGLE_CLOUD_PROJECT')
+    location = location or os.getenv('GOOGLE_CLOUD_REGION')
+    with _init_lock:
+        if _initialized.get('settings') != (project, location):
+            aiplatform.init(project=project, location=location)
+            _initialized['settings'] = (project, location)
+    return aiplatform
+
+
+def source_fingerprint(uri):
+    """
+    Return a content hash for a dataset source without downloading it.
+
+    For ``gs://`` URIs the object's recorded SHA-256 (set by
+    src.upload_manifest) is used, then its MD5 and finally its generation;
+    composite objects have no MD5. Local paths are hashed.
+    """
+    if not uri.startswith('gs://'):
+        return f"sha256:{compute_file_hash(uri)}"
+    bucket_name, _, blob_name = uri[len('gs://'):].partition('/')
+    blob = get_storage_client().bucket(bucket_name).get_blob(blob_name)
+    if blob is None:
+        raise FileNotFoundError(f"No such object: {uri}")
+    metadata = blob.metadata or {}
+    if metadata.get('sha256'):
+        return f"sha256:{metadata['sha256']}"
+    if blob.md5_hash:
+        return f"md5:{blob.md5_hash}"
+    return f"generation:{getattr(blob, 'generation', None)}"
+
+
+class VertexDatasetBackend:
+    """Creates and looks up TabularDatasets on Vertex AI."""
+
+    def create(self, display_name, source_uri):
+        """Create a dataset and return it."""
+        aiplatform = init_vertex_ai()
+        return aiplatform.TabularDataset.create(display_name=display_name, gcs_source=source_uri)
+
+    def get(self, resource_name):
+        """Return an existing dataset, or None if it was deleted."""
+        from google.api_core import exceptions
+        aiplatform = init_vertex_ai()
+        try:
+            return aiplatform.TabularDataset(resource_name)
+        except exceptions.NotFound:
+            return None
+
+
+class DatasetCache:
+    """JSON file of ``source URI -> {resource_name, fingerprint}`` entries."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, backend=None, fingerprint_fn=source_fingerprint):
+        """
+        Args:
+            path (str, optional): Location of the cache file; None keeps it in memory
+            backend (optional): Dataset backend; defaults to VertexDatasetBackend
+            fingerprint_fn (callable): Returns the content hash of a source URI
+        """
+        self.path = path
+        self.backend = backend or VertexDatasetBackend()
+        self.fingerprint_fn = fingerprint_fn
+        self.stats = {'hits': 0, 'misses': 0, 'invalidated': 0}
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._source_locks = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f)
+
+    def get_or_create(self, source_uri, display_name):
+        """
+        Return a dataset for ``source_uri``, creating one only if needed.
+
+        Args:
+            source_uri (str): Dataset source, e.g. a ``gs://`` CSV
+            display_name (str): Display name for a newly created dataset
+
+        Returns:
+            Dataset object from the backend
+        """
+        fingerprint = self.fingerprint_fn(source_uri)
+        with self._lock:
+            source_lock = self._source_locks.setdefault(source_uri, threading.Lock())
+        # Concurrent trainings on one source wait for a single creation and share it
+        with source_lock:
+            entry = self._entries.get(source_uri)
+            if entry is not None:
+                if entry['fingerprint'] == fingerprint:
+                    dataset = self.backend.get(entry['resource_name'])
+                    if dataset is not None:
+                        self.stats['hits'] += 1
+                        print(f"Reusing dataset {entry['resource_name']} for {source_uri}")
+                        return dataset
+                else:
+                    self.stats['invalidated'] += 1
+                    print(f"Content of {source_uri} changed; creating a new dataset")
+            self.stats['misses'] += 1
+            dataset = self.backend.create(display_name, source_uri)
+            with self._lock:
+                self._entries[source_uri] = {
+                    'resource_name': dataset.resource_name,
+                    'fingerprint': fingerprint,
+                    'created': datetime.now().isoformat()
+                }
+                self._save()
+            return dataset
+
+    def invalidate(self, source_uri=None):
+        """Forget one source, or every source when ``source_uri`` is None."""
+        with self._lock:
+            if source_uri is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(source_uri, None)
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        ensure_directory_exists(os.path.dirname(self.path) or '.')
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_dataset_cache():
+    """Return the process-wide DatasetCache, creating it on first use."""
+    global _default_cache
+    with _init_lock:
+        if _default_cache is None:
+            _default_cache = DatasetCache()
+        return _default_cache
+
+
+def set_dataset_cache(cache):
+    """Replace the process-wide DatasetCache, e.g. with a fake backend in tests."""
+    global _default_cache
+    with _init_lock:
+        _default_cache = cache
@@ -0,0 +1,548 @@
+"""
+In-process stand-ins for cloud resources, used to exercise the pipeline offline.
+"""
+import os
+import json
+import base64
+import random
+import hashlib
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from src.utils import Prediction
+
+RawResponse = namedtuple('RawResponse', ['status_code', 'content', 'text'])
+
+IRIS_CLASSES = ['0', '1', '2']
+PETAL_LENGTH_COLUMN = 'petal length (cm)'
+
+
+def iris_rule_prediction(instance):
+    """
+    Classify an iris instance with a fixed petal-length rule.
+
+    Args:
+        instance: Dict keyed by feature name or a list of the four feature values
+
+    Returns:
+        dict: AutoML-style prediction with ``classes`` and ``scores``
+    """
+    if isinstance(instance, dict):
+        petal_length = float(instance[PETAL_LENGTH_COLUMN])
+    else:
+        petal_length = float(instance[2])
+
+    if petal_length < 2.5:
+        label = 0
+    elif petal_length < 4.9:
+        label = 1
+    else:
+        label = 2
+
+    scores = [0.0, 0.0, 0.0]
+    scores[label] = 1.0
+    return {'classes': list(IRIS_CLASSES), 'scores': scores}
+
+
+class FakeEndpoint:
+    """
+    Endpoint-like object that answers ``predict`` calls locally.
+
+    Latency and failures can be injected so batching, retry and concurrency
+    behaviour can be measured without a deployed Vertex AI endpoint. With
+    ``replicas`` set, each replica serves one request at a time and further
+    requests queue, so latency climbs once the offered load passes capacity.
+    It also keeps a traffic split for models deployed to it by FakeModel.deploy.
+    """
+
+    def __init__(
+        self,
+        predict_fn=None,
+        latency=0.0,
+        per_instance_latency=0.0,
+        failure_rate=0.0,
+        seed=None,
+        resource_name="projects/local/locations/local/endpoints/fake",
+        backend=None,
+        replicas=None
+    ):
+        """
+        Args:
+            predict_fn (callable, optional): Maps one instance to one prediction.
+                Defaults to a petal-length rule for the iris dataset.
+            latency (float): Fixed seconds added to every call
+            per_instance_latency (float): Extra seconds added per instance
+            failure_rate (float): Probability that a call raises ConnectionError
+            seed (int, optional): Seed for the failure injection
+            resource_name (str): Value exposed as ``resource_name``
+            backend (optional): Endpoint-like object (e.g. a LocalPredictor) that
+                answers whole batches; takes precedence over ``predict_fn``
+            replicas (int, optional): Requests served at once; None is unlimited
+        """
+        self.predict_fn = predict_fn or iris_rule_prediction
+        self.latency = latency
+        self.per_instance_latency = per_instance_latency
+        self.failure_rate = failure_rate
+        self.resource_name = resource_name
+        self.backend = backend
+        self.calls = 0
+        self.instances_seen = 0
+        self.raw_bytes = 0
+        self.replicas = replicas
+        self.traffic_split = {}
+        self.deployed_models = {}
+        self._deployed_count = 0
+        self._capacity = threading.Semaphore(replicas) if replicas else None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def predict(self, instances, parameters=None, timeout=None):
+        """Return a Prediction for ``instances``, honouring injected latency and failures."""
+        with self._lock:
+            self.calls += 1
+            self.instances_seen += len(instances)
+            fail = self._rng.random() < self.failure_rate
+
+        delay = self.latency + self.per_instance_latency * len(instances)
+        if delay > 0:
+            if self._capacity is not None:
+                with self._capacity:
+                    time.sleep(delay)
+            else:
+                time.sleep(delay)
+        if fail:
+            raise ConnectionError("Injected failure from FakeEndpoint")
+
+        if self.backend is not None:
+            predictions = list(self.backend.predict(instances).predictions)
+        else:
+            predictions = [self.predict_fn(instance) for instance in instances]
+        return Prediction(predictions=predictions, deployed_model_id="fake")
+
+    def raw_predict(self, body, headers=None):
+        """Answer a JSON request body the way Endpoint.raw_predict does."""
+        with self._lock:
+            self.raw_bytes += len(body)
+        response = self.predict(json.loads(body)['instances'])
+        content = json.dumps({'predictions': response.predictions, 'deployedModelId': "fake"})
+        return RawResponse(status_code=200, content=content.encode(), text=content)
+
+    def update(self, traffic_split=None, **kwargs):
+        if traffic_split is not None:
+            if sum(traffic_split.values()) != 100 or set(traffic_split) - set(self.deployed_models):
+                raise ValueError(f"Invalid traffic split {traffic_split}")
+            self.traffic_split = dict(traffic_split)
+        return self
+
+    def undeploy(self, deployed_model_id, traffic_split=None):
+        if self.traffic_split.get(deployed_model_id):
+            raise ValueError(f"Deployed model {deployed_model_id} still receives traffic")
+        del self.deployed_models[deployed_model_id]
+        self.traffic_split.pop(deployed_model_id, None)
+
+
+class FakeModel:
+    """Stand-in for a trained aiplatform.Model, returning fixed evaluation metrics."""
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics if metrics is not None else {'logLoss': 0.05, 'auPrc': 0.99}
+        self.deploy_calls = []
+
+    def get_model_evaluation(self):
+        return self.metrics
+
+    def deploy(self, endpoint=None, traffic_percentage=0, traffic_split=None, **kwargs):
+        """Add this model to ``endpoint`` (or a new FakeEndpoint) and return the endpoint."""
+        from src.cloud_utils import shift_traffic
+        self.deploy_calls.append(dict(kwargs, traffic_percentage=traffic_percentage, traffic_split=traffic_split))
+        if endpoint is None:
+            endpoint = FakeEndpoint(replicas=kwargs.get('min_replica_count'))
+        endpoint._deployed_count += 1
+        deployed_model_id = str(endpoint._deployed_count)
+        endpoint.deployed_models[deployed_model_id] = self
+        if traffic_split is not None:
+            # As in Vertex AI, "0" stands for the model being deployed
+            endpoint.traffic_split = {
+                (deployed_model_id if key == "0" else key): value for key, value in traffic_split.items()
+            }
+        elif not endpoint.traffic_split:
+            endpoint.traffic_split = {deployed_model_id: 100}
+        else:
+            endpoint.traffic_split = shift_traffic(endpoint.traffic_split, deployed_model_id, traffic_percentage)
+        return endpoint
+
+
+class FakeJob:
+    """
+    Training job whose state advances on a fixed schedule of wall-clock durations.
+
+    ``schedule`` is a list of ``(state, seconds)`` pairs; the job spends
+    ``seconds`` in each state in turn and stays in the last one. States use the
+    Vertex AI ``PIPELINE_STATE_`` names.
+    """
+
+    def __init__(
+        self,
+        display_name,
+        schedule=(('PIPELINE_STATE_RUNNING', 1.0), ('PIPELINE_STATE_SUCCEEDED', 0)),
+        metrics=None,
+        poll_latency=0.0,
+        failure_rate=0.0,
+        seed=None
+    ):
+        """
+        Args:
+            display_name (str): Job name
+            schedule (list): ``(state, seconds)`` pairs, in order
+            metrics (dict, optional): Evaluation returned by ``get_model()``
+            poll_latency (float): Seconds every ``state`` read takes
+            failure_rate (float): Probability that a ``state`` read raises ConnectionError
+            seed (int, optional): Seed for the failure injection
+        """
+        self.display_name = display_name
+        self.resource_name = f"projects/local/locations/local/trainingPipelines/{display_name}"
+        self.schedule = list(schedule)
+        self.poll_latency = poll_latency
+        self.failure_rate = failure_rate
+        self.polls = 0
+        self._model = FakeModel(metrics)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._created = datetime.now(timezone.utc)
+
+    def state_at(self, elapsed):
+        """Return the scheduled state ``elapsed`` seconds after creation."""
+        for state, seconds in self.schedule[:-1]:
+            if elapsed < seconds:
+                return state
+            elapsed -= seconds
+        return self.schedule[-1][0]
+
+    def transition_times(self):
+        """Seconds after creation at which each state after the first begins."""
+        times = []
+        elapsed = 0.0
+        for _, seconds in self.schedule[:-1]:
+            elapsed += seconds
+            times.append(elapsed)
+        return times
+
+    @property
+    def state(self):
+        with self._lock:
+            self.polls += 1
+            fail = self._rng.random() < self.failure_rate
+        if self.poll_latency > 0:
+            time.sleep(self.poll_latency)
+        if fail:
+            raise ConnectionError("Injected failure from FakeJob")
+        return self.state_at(time.monotonic() - self._start)
+
+    def to_dict(self):
+        """Job resource as a dict, like ``to_dict()`` on a Vertex AI job; takes ``poll_latency``."""
+        state = self.state
+        created = self._created.isoformat().replace('+00:00', 'Z')
+        terminal = not state.endswith(('PENDING', 'QUEUED', 'RUNNING'))
+        return {
+            'name': self.resource_name,
+            'displayName': self.display_name,
+            'state': state,
+            'createTime': created,
+            'startTime': created,
+            'endTime': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z') if terminal else None,
+            'error': {'message': 'Training failed'} if state.endswith('FAILED') else None
+        }
+
+    def get_model(self):
+        return self._model
+
+
+class FakeDataset:
+    """Stand-in for aiplatform.TabularDataset."""
+
+    def __init__(self, resource_name, display_name, source_uri):
+        self.resource_name = resource_name
+        self.display_name = display_name
+        self.source_uri = source_uri
+
+
+class FakeDatasetBackend:
+    """
+    Local dataset backend for src.dataset_cache, with a simulated creation time.
+
+    Datasets live in memory; ``delete`` removes one as if it had been deleted
+    in the console, so a cache entry pointing at it is no longer reused.
+    """
+
+    def __init__(self, create_seconds=0.0):
+        self.create_seconds = create_seconds
+        self.created = 0
+        self.datasets = {}
+        self._lock = threading.Lock()
+
+    def create(self, display_name, source_uri):
+        if self.create_seconds > 0:
+            time.sleep(self.create_seconds)
+        with self._lock:
+            self.created += 1
+            name = f"projects/local/locations/local/datasets/{self.created}"
+            self.datasets[name] = FakeDataset(name, display_name, source_uri)
+            return self.datasets[name]
+
+    def get(self, resource_name):
+        return self.datasets.get(resource_name)
+
+    def delete(self, resource_name):
+        self.datasets.pop(resource_name, None)
+
+
+class FakeTrainingBackend:
+    """
+    Local stand-in for cloud_utils.VertexAIBackend with simulated durations.
+
+    Each operation sleeps for its configured duration, so the scheduling of a
+    src.pipeline run can be tested and timed. ``failures`` makes the next
+    calls of an operation raise, e.g. ``{'deploy': 1}`` fails the first deploy.
+    """
+
+    def __init__(
+        self,
+        upload_seconds=0.0,
+        train_seconds=0.0,
+        deploy_seconds=0.0,
+        model_metrics=None,
+        failures=None,
+        endpoint_latency=0.0,
+        dataset_cache=None
+    ):
+        """
+        Args:
+            upload_seconds (float): Duration of each upload
+            train_seconds (float or dict): Duration of each training run, or per model type
+            deploy_seconds (float): Duration of each deployment
+            model_metrics (dict, optional): Evaluation metrics per model type
+            failures (dict, optional): Operation name to number of calls that fail
+            endpoint_latency (float): Latency of each prediction request
+            dataset_cache (DatasetCache, optional): Resolves the dataset of each
+                training run, as train_model_on_cloud does
+        """
+        self.upload_seconds = upload_seconds
+        self.train_seconds = train_seconds
+        self.deploy_seconds = deploy_seconds
+        self.model_metrics = model_metrics or {
+            'automl': {'logLoss': 0.04, 'auPrc': 0.99},
+            'random_forest': {'logLoss': 0.05, 'auPrc': 0.99},
+            'svm': {'logLoss': 0.08, 'auPrc': 0.98}
+        }
+        self.failures = dict(failures or {})
+        self.endpoint_latency = endpoint_latency
+        self.dataset_cache = dataset_cache
+        self.calls = []
+        self._models = {}
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _call(self, operation, seconds, *args):
+        with self._lock:
+            self.calls.append((operation,) + args)
+            fail = self.failures.get(operation, 0) > 0
+            if fail:
+                self.failures[operation] -= 1
+        if seconds > 0:
+            time.sleep(seconds)
+        if fail:
+            raise ConnectionError(f"Injected {operation} failure from FakeTrainingBackend")
+
+    def count(self, operation):
+        """Number of calls made to ``operation``."""
+        return sum(1 for call in self.calls if call[0] == operation)
+
+    def upload(self, local_path):
+        self._call('upload', self.upload_seconds, local_path)
+        return f"gs://fake-bucket/{os.path.basename(local_path)}"
+
+    def train(self, display_name, dataset_uri, target_column, model_type, training_params=None):
+        seconds = self.train_seconds
+        if isinstance(seconds, dict):
+            seconds = seconds.get(model_type, 0.0)
+        if self.dataset_cache is not None:
+            self.dataset_cache.get_or_create(dataset_uri, f"{display_name}_dataset")
+        self._call('train', seconds, display_name, model_type)
+        name = f"projects/local/locations/local/models/{display_name}"
+        with self._lock:
+            self._models[name] = model_type
+        return name
+
+    def evaluate(self, model_name):
+        self._call('evaluate', 0.0, model_name)
+        return dict(self.model_metrics.get(self._models.get(model_name), {}))
+
+    def deploy(self, model_name, machine_type="n1-standard-2"):
+        self._call('deploy', self.deploy_seconds, model_name)
+        name = f"projects/local/locations/local/endpoints/{model_name.rsplit('/', 1)[-1]}"
+        with self._lock:
+            self._endpoints[name] = FakeEndpoint(latency=self.endpoint_latency, resource_name=name)
+        return name
+
+    def endpoint(self, endpoint_name):
+        with self._lock:
+            if endpoint_name not in self._endpoints:
+                self._endpoints[endpoint_name] = FakeEndpoint(
+                    latency=self.endpoint_latency, resource_name=endpoint_name
+                )
+            return self._endpoints[endpoint_name]
+
+
+class FakeBlob:
+    """Filesystem-backed stand-in for google.cloud.storage.Blob."""
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.size = None
+        self.md5_hash = None
+        self.metadata = None
+        self.reload_if_exists()
+
+    @property
+    def _path(self):
+        return os.path.join(self.bucket.root, self.name)
+
+    @property
+    def _meta_path(self):
+        return os.path.join(self.bucket.root, '.meta', f"{self.name}.json")
+
+    def reload_if_exists(self):
+        if os.path.exists(self._meta_path):
+            self.reload()
+
+    def reload(self):
+        if not os.path.exists(self._meta_path):
+            raise FileNotFoundError(f"No such object: gs://{self.bucket.name}/{self.name}")
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        self.size = meta['size']
+        self.md5_hash = meta['md5_hash']
+        self.metadata = meta['metadata']
+
+    def _write(self, data, composite=False):
+        # Composition happens server-side, so it transfers no bytes
+        if not composite:
+            self.bucket.client._before_upload(len(data))
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        os.makedirs(os.path.dirname(self._meta_path), exist_ok=True)
+        with open(self._path, 'wb') as f:
+            f.write(data)
+        self.size = len(data)
+        # Like GCS, composite objects carry no MD5 hash
+        self.md5_hash = None if composite else base64.b64encode(hashlib.md5(data).digest()).decode()
+        self.metadata = None
+        self._write_meta()
+
+    def _write_meta(self):
+        with open(self._meta_path, 'w') as f:
+            json.dump({'size': self.size, 'md5_hash': self.md5_hash, 'metadata': self.metadata}, f)
+
+    def upload_from_string(self, data, content_type=None):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._write(data)
+
+    def upload_from_filename(self, filename, content_type=None):
+        with open(filename, 'rb') as f:
+            self._write(f.read())
+
+    def upload_from_file(self, file_obj, rewind=False, size=None, content_type=None):
+        if rewind:
+            file_obj.seek(0)
+        self._write(file_obj.read() if size is None else file_obj.read(size))
+
+    def download_as_bytes(self):
+        with open(self._path, 'rb') as f:
+            return f.read()
+
+    def download_as_string(self):
+        return self.download_as_bytes()
+
+    def exists(self):
+        return os.path.exists(self._meta_path)
+
+    def patch(self):
+        if not self.exists():
+            raise FileNotFoundError(f"No such object: gs://{self.bucket.name}/{self.name}")
+        self._write_meta()
+
+    def delete(self):
+        if not self.exists():
+            raise FileNotFoundError(f"No such object: gs://{self.bucket.name}/{self.name}")
+        os.remove(self._path)
+        os.remove(self._meta_path)
+
+    def compose(self, sources):
+        data = b''.join(source.download_as_bytes() for source in sources)
+        self._write(data, composite=True)
+
+
+class FakeBucket:
+    """Filesystem-backed stand-in for google.cloud.storage.Bucket."""
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.root = os.path.join(client.root, name)
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name):
+        blob = FakeBlob(self, name)
+        return blob if blob.exists() else None
+
+    def list_blobs(self, prefix=''):
+        meta_root = os.path.join(self.root, '.meta')
+        names = []
+        for directory, _, filenames in os.walk(meta_root):
+            for filename in filenames:
+                path = os.path.relpath(os.path.join(directory, filename), meta_root)
+                name = path[:-len('.json')].replace(os.sep, '/')
+                if name.startswith(prefix):
+                    names.append(name)
+        return [FakeBlob(self, name) for name in sorted(names)]
+
+
+class FakeStorageClient:
+    """
+    Stand-in for google.cloud.storage.Client that keeps objects under a local directory.
+
+    ``latency`` and ``bytes_per_second`` model a per-request round trip and
+    per-connection bandwidth. ``fail_after_uploads`` makes every upload after
+    the given count raise ConnectionError, which simulates a transfer dying
+    part-way through.
+    """
+
+    def __init__(self, root, latency=0.0, bytes_per_second=None, fail_after_uploads=None):
+        self.root = root
+        self.latency = latency
+        self.bytes_per_second = bytes_per_second
+        self.fail_after_uploads = fail_after_uploads
+        self.uploads = 0
+        self.bytes_uploaded = 0
+        self._lock = threading.Lock()
+
+    def bucket(self, name):
+        return FakeBucket(self, name)
+
+    def _before_upload(self, size):
+        with self._lock:
+            if self.fail_after_uploads is not None and self.uploads >= self.fail_after_uploads:
+                raise ConnectionError("Injected upload failure from FakeStorageClient")
+            self.uploads += 1
+            self.bytes_uploaded += size
+        delay = self.latency
+        if self.bytes_per_second:
+            delay += size / self.bytes_per_second
+        if delay > 0:
+            time.sleep(delay)
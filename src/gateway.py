@@ -0,0 +1,151 @@
+"""
+asyncio prediction gateway that coalesces concurrent requests.
+
+Instances from many small callers are collected for a few milliseconds and sent
+as one predict_with_endpoint call. Identical instances that are already queued
+or in flight share a single result instead of being sent twice.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cloud_utils import predict_with_endpoint
+
+
+def _instance_key(instance):
+    """Return a hashable key for an instance, or None if it cannot be hashed."""
+    try:
+        if isinstance(instance, dict):
+            key = tuple(sorted(instance.items()))
+        else:
+            key = tuple(instance)
+        hash(key)
+        return key
+    except TypeError:
+        return None
+
+
+class PredictionGateway:
+    """
+    Coalesce concurrent prediction requests into batched endpoint calls.
+
+    Usage:
+        async with PredictionGateway(endpoint, window_ms=5) as gateway:
+            predictions = await gateway.predict(instances)
+    """
+
+    def __init__(
+        self,
+        endpoint,
+        window_ms=5.0,
+        max_batch_size=1000,
+        max_in_flight=4,
+        deduplicate=True
+    ):
+        """
+        Args:
+            endpoint: Deployed model endpoint (or any object with ``predict``)
+            window_ms (float): How long to wait for more instances before sending
+            max_batch_size (int): Send immediately once this many instances are queued
+            max_in_flight (int): Maximum number of concurrent endpoint calls
+            deduplicate (bool): Share results between identical in-flight instances
+        """
+        self.endpoint = endpoint
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.deduplicate = deduplicate
+        self.stats = {'requests': 0, 'instances': 0, 'deduplicated': 0, 'endpoint_calls': 0}
+
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._pending = []
+        self._in_flight = {}
+        self._flush_handle = None
+        self._tasks = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def predict(self, instances):
+        """
+        Predict ``instances`` as part of the next coalesced batch.
+
+        Args:
+            instances (list): Instances for this caller
+
+        Returns:
+            list: Predictions for this caller's instances, in order
+        """
+        loop = asyncio.get_running_loop()
+        self.stats['requests'] += 1
+        self.stats['instances'] += len(instances)
+
+        futures = []
+        for instance in instances:
+            key = _instance_key(instance) if self.deduplicate else None
+            if key is not None and key in self._in_flight:
+                self.stats['deduplicated'] += 1
+                futures.append(self._in_flight[key])
+                continue
+            future = loop.create_future()
+            if key is not None:
+                self._in_flight[key] = future
+            self._pending.append((instance, future, key))
+            futures.append(future)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._pending and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        # Futures may be shared with other callers, so a cancelled caller
+        # must not cancel them
+        return list(await asyncio.gather(*(asyncio.shield(f) for f in futures)))
+
+    def _flush(self):
+        """Dispatch queued instances in batches of at most max_batch_size."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch):
+        """Send one batch to the endpoint and resolve each instance's future."""
+        loop = asyncio.get_running_loop()
+        instances = [instance for instance, _, _ in batch]
+        self.stats['endpoint_calls'] += 1
+        try:
+            response = await loop.run_in_executor(
+                self._executor, predict_with_endpoint, self.endpoint, instances
+            )
+            predictions = list(getattr(response, 'predictions', response))
+            if len(predictions) != len(instances):
+                raise RuntimeError(
+                    f"Endpoint returned {len(predictions)} predictions for {len(instances)} instances"
+                )
+            for (_, future, _), prediction in zip(batch, predictions):
+                if not future.done():
+                    future.set_result(prediction)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for _, future, key in batch:
+                if key is not None and self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+    async def close(self):
+        """Send anything still queued, wait for in-flight calls and release threads."""
+        if self._pending:
+            self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,286 @@
+"""
+Local hyperparameter search with successive halving over a process pool.
+
+Candidate configurations of every model type are sampled from a search space
+and raced against each other. Each rung trains all survivors on a larger
+share of the training rows and keeps the best ``1/eta`` of them, so poor
+configurations are dropped after training on a small sample. Only the
+finalists see the full data.
+
+Trials run in worker processes. The training and validation arrays are
+placed in shared memory once; each worker maps them when it starts, so a
+trial task carries only its parameters instead of a pickled copy of the data.
+The winning configuration is refitted on all training rows, scored on the
+test split and registered in the ModelRegistry with its metrics.
+"""
+import math
+import time
+import random
+from collections import namedtuple
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+SEARCH_SPACES = {
+    'random_forest': {
+        'n_estimators': [50, 100, 200, 400],
+        'max_depth': [None, 4, 8, 16],
+        'min_samples_leaf': [1, 2, 5, 10],
+        'max_features': ['sqrt', 'log2', None]
+    },
+    'svm': {
+        'C': [0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0],
+        'gamma': ['scale', 0.01, 0.03, 0.1, 0.3, 1.0],
+        'kernel': ['rbf', 'linear']
+    }
+}
+
+Trial = namedtuple('Trial', ['config_id', 'model_type', 'params', 'n_rows', 'score', 'fit_seconds'])
+
+# Worker-side views of the shared arrays, set by _attach_arrays
+_arrays = {}
+
+
+def build_model(model_type, params, random_state=42, final=False):
+    """
+    Return an unfitted estimator for a configuration.
+
+    Args:
+        model_type (str): "random_forest" or "svm"
+        params (dict): Hyperparameters
+        random_state (int): Seed of the estimator
+        final (bool): Build the model that is registered. SVMs then also fit the
+            probability calibration LocalPredictor needs; trials skip that
+            5-fold fit because they are scored by accuracy.
+    """
+    if model_type == 'random_forest':
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(random_state=random_state, n_jobs=1, **params)
+    if model_type == 'svm':
+        from sklearn.svm import SVC
+        if final:
+            return SVC(probability=True, random_state=random_state, **params)
+        return SVC(random_state=random_state, **params)
+    raise ValueError(f"Unknown model type {model_type!r}; expected one of {list(SEARCH_SPACES)}")
+
+
+def sample_configs(model_types, n_configs, random_state=None, spaces=SEARCH_SPACES):
+    """
+    Draw distinct configurations, split evenly across model types.
+
+    Returns:
+        list: ``(model_type, params)`` pairs
+    """
+    rng = random.Random(random_state)
+    configs = []
+    for index, model_type in enumerate(model_types):
+        space = spaces[model_type]
+        # Spread the remainder over the first model types
+        wanted = n_configs // len(model_types) + (index < n_configs % len(model_types))
+        n_possible = math.prod(len(values) for values in space.values())
+        seen = set()
+        while len(seen) < min(wanted, n_possible):
+            params = {name: rng.choice(values) for name, values in space.items()}
+            key = tuple(sorted(params.items(), key=lambda item: item[0]))
+            if key not in seen:
+                seen.add(key)
+                configs.append((model_type, params))
+    return configs
+
+
+def rung_sizes(n_rows, min_rows, eta):
+    """Rows per rung, growing by ``eta`` and ending at exactly ``n_rows``."""
+    n_rungs = max(1, int(math.floor(math.log(max(n_rows / max(min_rows, 1), 1), eta))) + 1)
+    return [max(1, int(round(n_rows / eta ** (n_rungs - 1 - rung)))) for rung in range(n_rungs)]
+
+
+class SharedArrays:
+    """
+    Copies of NumPy arrays in named shared memory blocks.
+
+    ``descriptors`` is a small picklable dict that worker processes pass to
+    ``attach`` to map the same memory without copying it.
+    """
+
+    def __init__(self, arrays):
+        self._blocks = []
+        self.descriptors = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self._blocks.append(block)
+            self.descriptors[name] = (block.name, array.shape, array.dtype.str)
+
+    @staticmethod
+    def attach(descriptors):
+        """Map shared arrays by descriptor; returns ``(arrays, blocks)``."""
+        arrays, blocks = {}, []
+        for name, (block_name, shape, dtype) in descriptors.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks.append(block)
+            arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        return arrays, blocks
+
+    def close(self):
+        """Release and remove the shared memory blocks."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _attach_arrays(descriptors):
+    """Process pool initializer: map the shared arrays into this worker."""
+    # Workers share the parent's resource tracker, which already tracks the
+    # blocks; the parent unlinks them when the search ends
+    arrays, blocks = SharedArrays.attach(descriptors)
+    _arrays.update(arrays)
+    _arrays['_blocks'] = blocks
+
+
+def _run_trial(task):
+    """Fit one configuration on the first ``n_rows`` training rows and score it."""
+    config_id, model_type, params, n_rows, random_state = task
+    X_train, y_train = _arrays['X_train'][:n_rows], _arrays['y_train'][:n_rows]
+    model = build_model(model_type, params, random_state)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    score = float(np.mean(model.predict(_arrays['X_val']) == _arrays['y_val']))
+    return Trial(config_id, model_type, params, n_rows, score, fit_seconds)
+
+
+def successive_halving(configs, arrays, min_rows=30, eta=3, random_state=42, executor=None):
+    """
+    Race configurations on growing row budgets, keeping the top ``1/eta`` per rung.
+
+    Args:
+        configs (list): ``(model_type, params)`` pairs
+        arrays (dict): ``X_train``, ``y_train`` (shuffled), ``X_val`` and ``y_val``
+        min_rows (int): Training rows in the first rung
+        eta (int): Growth of the row budget and reduction of survivors per rung
+        random_state (int): Seed of every estimator
+        executor (ProcessPoolExecutor, optional): Pool whose workers already
+            attached the arrays; None runs trials in this process
+
+    Returns:
+        list: Every Trial run, in rung order
+    """
+    sizes = rung_sizes(len(arrays['y_train']), min_rows, eta)
+    survivors = list(range(len(configs)))
+    trials = []
+
+    def run_rung(tasks):
+        if executor is not None:
+            return list(executor.map(_run_trial, tasks))
+        _arrays.update(arrays)
+        return [_run_trial(task) for task in tasks]
+
+    for rung, n_rows in enumerate(sizes):
+        tasks = [(i, configs[i][0], configs[i][1], n_rows, random_state) for i in survivors]
+        results = run_rung(tasks)
+        trials.extend(results)
+        if rung == len(sizes) - 1:
+            break
+        keep = max(1, math.ceil(len(results) / eta))
+        # Ties go to the earlier configuration, so serial and pooled runs agree
+        ranked = sorted(results, key=lambda trial: (-trial.score, trial.config_id))
+        survivors = [trial.config_id for trial in ranked[:keep]]
+    return trials
+
+
+def _split(X, y, validation_fraction, random_state):
+    from sklearn.model_selection import train_test_split
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=validation_fraction, random_state=random_state, stratify=y
+    )
+    # Already shuffled, so every rung's prefix of rows is a random sample
+    return {'X_train': X_train, 'y_train': y_train, 'X_val': X_val, 'y_val': y_val}
+
+
+def run_search(
+    train_df,
+    test_df=None,
+    target_column='target',
+    model_types=('random_forest', 'svm'),
+    n_configs=24,
+    min_rows=30,
+    eta=3,
+    n_jobs=1,
+    validation_fraction=0.25,
+    random_state=42,
+    registry=None,
+    dataset_hash=None
+):
+    """
+    Search hyperparameters and register the best model.
+
+    Args:
+        train_df (pd.DataFrame): Training split (features plus target)
+        test_df (pd.DataFrame, optional): Test split the final model is scored on
+        target_column (str): Label column
+        model_types (tuple): Model types to search
+        n_configs (int): Configurations sampled in total
+        min_rows (int): Training rows in the first rung
+        eta (int): Successive halving factor
+        n_jobs (int): Worker processes
+        validation_fraction (float): Share of ``train_df`` held out to score trials
+        random_state (int): Seed for sampling, splitting and estimators
+        registry (ModelRegistry, optional): Where the best model is registered
+        dataset_hash (str, optional): Recorded with the registered version
+
+    Returns:
+        dict: ``best`` (Trial), ``trials``, ``metrics`` and ``version_id``
+    """
+    feature_names = [c for c in train_df.columns if c != target_column]
+    X = train_df[feature_names].to_numpy(dtype=np.float64)
+    y = train_df[target_column].to_numpy()
+    arrays = _split(X, y, validation_fraction, random_state)
+    configs = sample_configs(model_types, n_configs, random_state)
+
+    if n_jobs > 1:
+        with SharedArrays(arrays) as shared, ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_attach_arrays, initargs=(shared.descriptors,)
+        ) as executor:
+            trials = successive_halving(configs, arrays, min_rows, eta, random_state=random_state,
+                                        executor=executor)
+    else:
+        trials = successive_halving(configs, arrays, min_rows, eta, random_state=random_state)
+
+    final_rung = [trial for trial in trials if trial.n_rows == len(arrays['y_train'])]
+    best = min(final_rung, key=lambda trial: (-trial.score, trial.config_id))
+
+    # Refit the winner on every training row, validation rows included
+    model = build_model(best.model_type, best.params, random_state, final=True)
+    model.fit(X, y)
+    metrics = {'validation_accuracy': best.score, 'trials': len(trials), 'configs': len(configs)}
+    if test_df is not None:
+        from sklearn.metrics import accuracy_score, log_loss
+        X_test = test_df[feature_names].to_numpy(dtype=np.float64)
+        y_test = test_df[target_column].to_numpy()
+        metrics['accuracy'] = float(accuracy_score(y_test, model.predict(X_test)))
+        metrics['log_loss'] = float(log_loss(y_test, model.predict_proba(X_test), labels=model.classes_))
+
+    version_id = None
+    if registry is not None:
+        artifact = {
+            'model': model,
+            'model_type': best.model_type,
+            'hyperparams': best.params,
+            'feature_names': feature_names,
+            'timestamp': datetime.now().isoformat()
+        }
+        version_id = registry.register(
+            artifact, algorithm=best.model_type, params=best.params,
+            dataset_hash=dataset_hash, metrics=metrics, source='hyperparam_search'
+        )
+    return {'best': best, 'trials': trials, 'metrics': metrics, 'version_id': version_id}
@@ -0,0 +1,191 @@
+"""
+Training job status listing with concurrent fetching and a local cache.
+
+Job details are fetched through a bounded thread pool instead of one
+``to_dict()`` call after another. A job that has reached a terminal state
+never changes again, so its record is cached on disk and never fetched twice.
+Listings can be filtered, paginated and printed as a table or as JSON.
+"""
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.monitoring import TERMINAL_STATES, short_state
+from src.utils import ensure_directory_exists
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'job_status.json')
+RECORD_FIELDS = ['name', 'display_name', 'state', 'create_time', 'start_time', 'end_time', 'error']
+TABLE_COLUMNS = [
+    ('display_name', 'Job Name', 32),
+    ('state', 'Status', 10),
+    ('create_time', 'Create Time', 20),
+    ('end_time', 'End Time', 20)
+]
+
+
+def job_record(job_info):
+    """
+    Reduce a job's ``to_dict()`` output to the fields shown in listings.
+
+    Args:
+        job_info (dict): Output of ``job.to_dict()`` (camelCase or snake_case keys)
+
+    Returns:
+        dict: Record with RECORD_FIELDS plus ``final_model_stats`` when present
+    """
+    def field(snake):
+        parts = snake.split('_')
+        camel = parts[0] + ''.join(p.title() for p in parts[1:])
+        return job_info.get(snake, job_info.get(camel))
+
+    record = {name: field(name) for name in RECORD_FIELDS}
+    record['state'] = short_state(record['state'])
+    stats = field('final_model_stats')
+    if stats:
+        record['final_model_stats'] = stats
+    return record
+
+
+class JobStatusCache:
+    """JSON file of job records keyed by resource name; only terminal jobs are stored."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        """
+        Args:
+            path (str): Location of the cache file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._records = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._records = json.load(f)
+
+    def get(self, name):
+        return self._records.get(name)
+
+    def put_many(self, records, overwrite=False):
+        """
+        Store the terminal records among ``records``.
+
+        Args:
+            records (iterable): Job records
+            overwrite (bool): Replace records already cached, e.g. after a refresh
+
+        Returns:
+            int: How many records were added or changed
+        """
+        with self._lock:
+            stored = 0
+            for record in records:
+                if record['state'] not in TERMINAL_STATES:
+                    continue
+                if overwrite or record['name'] not in self._records:
+                    stored += self._records.get(record['name']) != record
+                    self._records[record['name']] = record
+            if stored:
+                self._save()
+            return stored
+
+    def _save(self):
+        ensure_directory_exists(os.path.dirname(self.path) or '.')
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._records, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self._records)
+
+
+def fetch_job_records(jobs, cache=None, max_workers=16, refresh=False):
+    """
+    Return one record per job, fetching details concurrently.
+
+    Args:
+        jobs (list): Job objects with ``resource_name`` and ``to_dict()``
+        cache (JobStatusCache, optional): Cache of terminal jobs; None disables caching
+        max_workers (int): Concurrent ``to_dict()`` calls
+        refresh (bool): Ignore cached records (they are still updated)
+
+    Returns:
+        list: Records in the order of ``jobs``
+    """
+    records = [None] * len(jobs)
+    to_fetch = []
+    for index, job in enumerate(jobs):
+        cached = cache.get(job.resource_name) if cache is not None and not refresh else None
+        if cached is not None:
+            records[index] = cached
+        else:
+            to_fetch.append(index)
+
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            fetched = executor.map(lambda i: job_record(jobs[i].to_dict()), to_fetch)
+            for index, record in zip(to_fetch, fetched):
+                # Fall back to the listed resource name if to_dict() omits it
+                record['name'] = record['name'] or jobs[index].resource_name
+                records[index] = record
+        if cache is not None:
+            cache.put_many((records[i] for i in to_fetch), overwrite=refresh)
+    return records
+
+
+def filter_records(records, states=None, name_contains=None, created_after=None):
+    """
+    Select records by state, display name substring and creation time.
+
+    Args:
+        records (list): Job records
+        states (list, optional): Short states to keep, e.g. ["RUNNING", "FAILED"]
+        name_contains (str, optional): Case-insensitive display name substring
+        created_after (str, optional): ISO timestamp; older jobs are dropped
+
+    Returns:
+        list: Matching records, newest first
+    """
+    states = {state.upper() for state in states} if states else None
+    needle = name_contains.lower() if name_contains else None
+    selected = [
+        record for record in records
+        if (states is None or record['state'] in states)
+        and (needle is None or needle in (record['display_name'] or '').lower())
+        and (created_after is None or (record['create_time'] or '') >= created_after)
+    ]
+    return sorted(selected, key=lambda record: record['create_time'] or '', reverse=True)
+
+
+def paginate(records, page=1, page_size=20):
+    """
+    Return one page of records.
+
+    Returns:
+        tuple: ``(page_records, total_pages)``
+    """
+    if page < 1 or page_size < 1:
+        raise ValueError("page and page_size must be at least 1")
+    total_pages = max(1, -(-len(records) // page_size))
+    start = (page - 1) * page_size
+    return records[start:start + page_size], total_pages
+
+
+def format_table(records):
+    """Render records as a fixed-width text table."""
+    def cell(value, width):
+        text = str(value) if value else '-'
+        return text[:width - 1] + '~' if len(text) > width else text.ljust(width)
+
+    header = ' '.join(cell(title, width) for _, title, width in TABLE_COLUMNS)
+    lines = [header, '-' * len(header)]
+    for record in records:
+        lines.append(' '.join(cell(record.get(key), width) for key, _, width in TABLE_COLUMNS))
+        if record.get('error'):
+            lines.append(f"    Error: {record['error']}")
+    return '\n'.join(lines)
+
+
+def format_json(records):
+    """Render records as a JSON array."""
+    return json.dumps(records, indent=2, default=str)
@@ -0,0 +1,183 @@
+"""
+Open-loop load generator for sizing prediction endpoints.
+
+Requests are replayed at a fixed target rate against any object with the
+endpoint ``predict`` interface: a Vertex AI Endpoint, a LocalPredictor, a
+CachedEndpoint or a FakeEndpoint with simulated replicas. The stream can be
+recorded (JSON lines of request bodies) or synthetic. Sends follow a schedule
+and never wait for earlier responses. Latency is measured from each request's
+scheduled send time, so time spent queued behind a saturated endpoint counts,
+as it would for a real client.
+
+Sweeping the rate gives a throughput/latency curve per configuration. The
+cheapest configuration whose p99 meets the SLO at the target rate is the one
+to deploy (see cloud_utils.deploy_model's replica options).
+"""
+import json
+import time
+import random
+import threading
+import itertools
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cloud_utils import predict_with_endpoint
+
+IRIS_FEATURE_RANGES = {
+    'sepal length (cm)': (4.0, 8.0),
+    'sepal width (cm)': (2.0, 4.5),
+    'petal length (cm)': (1.0, 7.0),
+    'petal width (cm)': (0.1, 2.5)
+}
+
+LoadResult = namedtuple('LoadResult', [
+    'target_qps', 'achieved_qps', 'requests', 'errors', 'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'
+])
+
+
+def synthetic_requests(n_requests, batch_size=1, feature_ranges=IRIS_FEATURE_RANGES, seed=0):
+    """
+    Build a synthetic request stream.
+
+    Returns:
+        list: ``n_requests`` lists of ``batch_size`` feature dicts
+    """
+    rng = random.Random(seed)
+    return [
+        [
+            {name: round(rng.uniform(low, high), 1) for name, (low, high) in feature_ranges.items()}
+            for _ in range(batch_size)
+        ]
+        for _ in range(n_requests)
+    ]
+
+
+def load_requests(path):
+    """
+    Read a recorded request stream.
+
+    Each line is a JSON request body, ``{"instances": [...]}``, or a bare list
+    of instances.
+    """
+    requests = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                body = json.loads(line)
+                requests.append(body['instances'] if isinstance(body, dict) else body)
+    return requests
+
+
+def record_requests(path, requests):
+    """Write a request stream in the format load_requests reads."""
+    with open(path, 'w') as f:
+        for instances in requests:
+            f.write(json.dumps({'instances': instances}) + '\n')
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load(endpoint, requests, qps, duration=10.0, max_in_flight=256, poisson=False, seed=0):
+    """
+    Replay requests at ``qps`` for ``duration`` seconds.
+
+    Args:
+        endpoint: Object with ``predict(instances=...)``
+        requests (list): Request stream; cycled if shorter than the run
+        qps (float): Target requests per second
+        duration (float): Length of the run in seconds
+        max_in_flight (int): Client threads; beyond this requests queue in the client
+        poisson (bool): Poisson arrivals instead of evenly spaced ones
+        seed (int): Seed for Poisson arrivals
+
+    Returns:
+        LoadResult: Achieved rate, error count and latency percentiles
+    """
+    n_requests = max(1, int(qps * duration))
+    rng = random.Random(seed)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def send(instances, scheduled):
+        try:
+            predict_with_endpoint(endpoint, instances)
+        except Exception:
+            with lock:
+                errors[0] += 1
+            return
+        latency = time.perf_counter() - scheduled
+        with lock:
+            latencies.append(latency)
+
+    start = time.perf_counter()
+    offset = 0.0
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for instances in itertools.islice(itertools.cycle(requests), n_requests):
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, instances, scheduled)
+            offset += rng.expovariate(qps) if poisson else 1.0 / qps
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return LoadResult(
+        target_qps=qps,
+        achieved_qps=len(latencies) / elapsed,
+        requests=n_requests,
+        errors=errors[0],
+        p50_ms=_percentile(latencies, 0.50) * 1000,
+        p95_ms=_percentile(latencies, 0.95) * 1000,
+        p99_ms=_percentile(latencies, 0.99) * 1000,
+        mean_ms=(sum(latencies) / len(latencies) * 1000) if latencies else 0.0
+    )
+
+
+def sweep(endpoint, requests, qps_levels, duration=10.0, **options):
+    """Run run_load at each rate in ``qps_levels``; returns one LoadResult per rate."""
+    return [run_load(endpoint, requests, qps, duration, **options) for qps in qps_levels]
+
+
+def meets_slo(result, slo_p99_ms, max_error_rate=0.0):
+    """Whether a run kept its p99 latency and error rate within the SLO."""
+    return result.p99_ms <= slo_p99_ms and result.errors <= max_error_rate * result.requests
+
+
+def cheapest_config(curves, target_qps, slo_p99_ms, max_error_rate=0.0):
+    """
+    Pick the cheapest configuration that meets the SLO at the target rate.
+
+    Args:
+        curves (list): ``(config, results)`` pairs ordered from cheapest to most
+            expensive, where ``results`` is a sweep covering ``target_qps``
+        target_qps (float): Rate the endpoint must sustain
+        slo_p99_ms (float): Latency bound for the 99th percentile
+        max_error_rate (float): Tolerated share of failed requests
+
+    Returns:
+        The first ``config`` that qualifies, or None
+    """
+    for config, results in curves:
+        at_target = [result for result in results if result.target_qps >= target_qps]
+        if at_target and meets_slo(min(at_target, key=lambda r: r.target_qps), slo_p99_ms, max_error_rate):
+            return config
+    return None
+
+
+def format_curve(results, slo_p99_ms=None):
+    """Format a sweep as a text table, marking runs that miss the SLO."""
+    lines = [f"{'target qps':>10}{'achieved':>10}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"]
+    for result in results:
+        line = (f"{result.target_qps:>10.1f}{result.achieved_qps:>10.1f}{result.errors:>8}"
+                f"{result.p50_ms:>9.1f}{result.p95_ms:>9.1f}{result.p99_ms:>9.1f}")
+        if slo_p99_ms is not None and not meets_slo(result, slo_p99_ms):
+            line += "  > SLO"
+        lines.append(line)
+    return '\n'.join(lines)
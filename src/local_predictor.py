@@ -0,0 +1,230 @@
+"""
+In-process inference for the model artifacts saved under models/.
+
+LocalPredictor exposes the same ``predict(instances=...)`` method as a Vertex AI
+endpoint, so it can be passed to predict_with_endpoint (or predict_in_batches)
+wherever an endpoint is expected, without the network round trip.
+"""
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from src.compiled_forest import compile_forest
+from src.utils import MODEL_FILENAME_PATTERN, Prediction, load_feature_names
+
+
+def list_model_artifacts(model_dir='models', model_type=None):
+    """
+    List timestamped model artifacts, oldest first.
+
+    Args:
+        model_dir (str): Directory holding ``<model_type>_<YYYYmmdd_HHMMSS>.pkl`` files
+        model_type (str, optional): Only list artifacts of this type, e.g. "svm"
+
+    Returns:
+        list: ``(timestamp, model_type, path)`` tuples sorted by timestamp
+    """
+    artifacts = []
+    for filename in os.listdir(model_dir):
+        match = MODEL_FILENAME_PATTERN.match(filename)
+        if not match:
+            continue
+        if model_type is not None and match.group('model_type') != model_type:
+            continue
+        artifacts.append((
+            match.group('timestamp'),
+            match.group('model_type'),
+            os.path.join(model_dir, filename)
+        ))
+    return sorted(artifacts)
+
+
+def find_model_artifact(model_dir='models', model_type=None, timestamp=None):
+    """
+    Return the path of the newest artifact, or of the one pinned by ``timestamp``.
+
+    Args:
+        model_dir (str): Directory holding the model artifacts
+        model_type (str, optional): Restrict the search to this model type
+        timestamp (str, optional): Exact ``YYYYmmdd_HHMMSS`` timestamp to pin
+
+    Returns:
+        str: Path of the selected artifact
+    """
+    artifacts = list_model_artifacts(model_dir, model_type)
+    if timestamp is not None:
+        artifacts = [a for a in artifacts if a[0] == timestamp]
+    if not artifacts:
+        raise FileNotFoundError(
+            f"No model artifacts found in {model_dir} "
+            f"(model_type={model_type}, timestamp={timestamp})"
+        )
+    return artifacts[-1][2]
+
+
+def load_model_artifact(path):
+    """
+    Load a model artifact.
+
+    Older artifacts are bare estimators; newer ones are dicts with the estimator
+    under ``model`` plus ``model_type``, ``hyperparams`` and ``timestamp``.
+    Both are returned in the dict form.
+
+    Args:
+        path (str): Path to a ``.pkl`` artifact
+
+    Returns:
+        dict: Artifact with at least ``model`` and ``model_type`` keys
+    """
+    with open(path, 'rb') as f:
+        artifact = pickle.load(f)
+
+    if not isinstance(artifact, dict):
+        artifact = {'model': artifact}
+    if 'model_type' not in artifact:
+        match = MODEL_FILENAME_PATTERN.match(os.path.basename(path))
+        artifact['model_type'] = match.group('model_type') if match else None
+    return artifact
+
+
+def _class_name(label):
+    """Format a class label the way AutoML endpoints report it ("0", not "0.0")."""
+    if isinstance(label, (float, np.floating)) and float(label).is_integer():
+        return str(int(label))
+    return str(label)
+
+
+class LocalPredictor:
+    """
+    Endpoint-compatible predictor backed by a local model artifact.
+
+    The artifact is loaded once at construction; every ``predict`` call then
+    runs a single vectorised ``predict_proba`` over the whole batch. Random
+    forests are compiled to a CompiledForest, which gives bit-identical
+    probabilities without sklearn's per-estimator overhead.
+    """
+
+    def __init__(
+        self,
+        path=None,
+        model_dir='models',
+        model_type=None,
+        timestamp=None,
+        feature_names=None,
+        artifact=None,
+        compiled=True,
+        cache=None
+    ):
+        """
+        Args:
+            path (str, optional): Artifact to load. Defaults to the newest in ``model_dir``.
+            model_dir (str): Directory searched when ``path`` is not given
+            model_type (str, optional): Restrict the newest-artifact search to this type
+            timestamp (str, optional): Pin the artifact by its filename timestamp
+            feature_names (list, optional): Column order for dict instances.
+                Defaults to the model's own feature names or data/metadata.csv.
+            artifact (dict, optional): Already-loaded artifact to serve instead of a file
+            compiled (bool): Serve random forests through a CompiledForest
+            cache (ModelCache, optional): Load the artifact memory-mapped through
+                this cache instead of unpickling it
+        """
+        if artifact is None:
+            if path is None:
+                path = find_model_artifact(model_dir, model_type, timestamp)
+            artifact = cache.get(path) if cache is not None else load_model_artifact(path)
+
+        self.path = path
+        self.artifact = artifact
+        self.model = artifact['model']
+        self.model_type = artifact.get('model_type')
+        self.resource_name = f"local://{path}" if path else "local://in-memory"
+
+        model_features = getattr(self.model, 'feature_names_in_', None)
+        if feature_names is None:
+            feature_names = artifact.get('feature_names')
+        if feature_names is None:
+            if model_features is not None:
+                feature_names = list(model_features)
+            else:
+                feature_names = load_feature_names()
+        self.feature_names = list(feature_names)
+        # Estimators fitted on a DataFrame warn when given a bare array
+        self._needs_frame = model_features is not None
+        self.classes = [_class_name(label) for label in self.model.classes_]
+
+        self.compiled = None
+        if compiled and type(self.model).__name__ == 'RandomForestClassifier':
+            self.compiled = compile_forest(self.model)
+
+    @classmethod
+    def from_registry(cls, registry, version_id=None, algorithm=None, **kwargs):
+        """
+        Serve a version from a ModelRegistry.
+
+        Args:
+            registry (ModelRegistry): Registry to load from
+            version_id (str, optional): Version to pin. Defaults to the current
+                version of ``algorithm``, or the latest version overall.
+            algorithm (str, optional): Algorithm whose current version is served
+
+        Returns:
+            LocalPredictor: Predictor for the selected version
+        """
+        if version_id is None:
+            entry = registry.current(algorithm) if algorithm else registry.latest()
+            if entry is None:
+                raise FileNotFoundError(f"No registered models for algorithm={algorithm}")
+            version_id = entry['version_id']
+        path = registry.object_path(registry.get(version_id)['version_id'])
+        return cls(path=path, **kwargs)
+
+    def _to_array(self, instances):
+        """Convert instances (array, DataFrame, dicts or lists) to a float matrix."""
+        if isinstance(instances, pd.DataFrame):
+            return instances[self.feature_names].to_numpy(dtype=np.float64)
+        if isinstance(instances, np.ndarray):
+            return np.asarray(instances, dtype=np.float64)
+        instances = list(instances)
+        if instances and isinstance(instances[0], dict):
+            return np.array(
+                [[instance[name] for name in self.feature_names] for instance in instances],
+                dtype=np.float64
+            )
+        return np.array(instances, dtype=np.float64).reshape(len(instances), -1)
+
+    def _model_input(self, X):
+        if self._needs_frame:
+            return pd.DataFrame(X, columns=self.feature_names)
+        return X
+
+    def predict_proba(self, instances):
+        """Return class probabilities as an ``(n_rows, n_classes)`` array."""
+        X = self._to_array(instances)
+        if self.compiled is not None:
+            return self.compiled.predict_proba(X)
+        return self.model.predict_proba(self._model_input(X))
+
+    def predict_labels(self, instances):
+        """Return the predicted class label for each row as an array."""
+        X = self._to_array(instances)
+        if self.compiled is not None:
+            return self.compiled.predict(X)
+        return self.model.predict(self._model_input(X))
+
+    def predict(self, instances, parameters=None, timeout=None):
+        """
+        Endpoint-compatible prediction.
+
+        Args:
+            instances: Instances to predict (list of dicts/lists, array or DataFrame)
+
+        Returns:
+            Prediction: AutoML-style ``{'classes', 'scores'}`` dict per instance
+        """
+        if len(instances) == 0:
+            return Prediction(predictions=[], deployed_model_id="local")
+        scores = self.predict_proba(instances).tolist()
+        predictions = [{'classes': self.classes, 'scores': row} for row in scores]
+        return Prediction(predictions=predictions, deployed_model_id="local")
@@ -0,0 +1,173 @@
+"""
+Non-blocking, structured logging shared by every entry point.
+
+Log calls only put the record on an in-memory queue; a QueueListener thread
+formats it and does the console and file I/O, so a hot loop never waits on
+the disk. The file handler writes one JSON object per line to a single
+size-rotated file. The handlers are installed once per process on the root
+logger. Every later ``setup_logging(name)`` call returns a named logger that
+shares them, so modules compose instead of the second caller being ignored
+(as it was with ``logging.basicConfig``). High-volume DEBUG records can be
+sampled before they reach the queue.
+"""
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from datetime import datetime, timezone
+
+DEFAULT_LOG_DIR = 'logs'
+DEFAULT_LOG_FILE = 'pipeline.jsonl'
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_lock = threading.Lock()
+_state = {'listener': None, 'queue_handler': None}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects, including ``extra`` fields."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName
+        }
+        for key in record.__dict__.keys() - _RECORD_ATTRIBUTES:
+            if not key.startswith('_'):
+                entry[key] = record.__dict__[key]
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """
+    Keep one in every ``every`` DEBUG records per logger; other levels pass.
+
+    Sampling is deterministic (a counter, not a random draw), so the first
+    record of a burst is always kept.
+    """
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = max(1, int(every))
+        self._counts = {}
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        count = self._counts.get(record.name, 0)
+        self._counts[record.name] = count + 1
+        return count % self.every == 0
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # The stdlib version formats the message here, on the caller's thread.
+        # Only the arguments are merged, which makes the record safe to pass
+        # between threads; formatting happens on the listener thread.
+        copied = object.__new__(logging.LogRecord)
+        copied.__dict__.update(record.__dict__)
+        record = copied
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _build_handlers(log_dir, log_file, max_bytes, backup_count, json_lines, console):
+    handlers = []
+    if console:
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(stream)
+    if log_dir is not None:
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            os.path.join(log_dir, log_file), maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        file_handler.setFormatter(JsonFormatter() if json_lines else logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(file_handler)
+    return handlers
+
+
+def setup_logging(
+    name,
+    level=logging.INFO,
+    log_dir=DEFAULT_LOG_DIR,
+    log_file=DEFAULT_LOG_FILE,
+    max_bytes=DEFAULT_MAX_BYTES,
+    backup_count=DEFAULT_BACKUP_COUNT,
+    json_lines=True,
+    console=True,
+    debug_sample_every=1
+):
+    """
+    Return a logger whose records are written in the background.
+
+    The first call in a process installs the queue handler and starts the
+    listener with the given handler options. Later calls reuse them and only
+    set the level of the logger they return.
+
+    Args:
+        name (str): Logger name, e.g. "data_preparation" or a module's ``__name__``
+        level (int): Level of the returned logger
+        log_dir (str, optional): Directory of the log file; None logs to the console only
+        log_file (str): File name inside ``log_dir``; rotated at ``max_bytes``
+        max_bytes (int): Size at which the file is rotated
+        backup_count (int): Rotated files kept (``pipeline.jsonl.1`` ...)
+        json_lines (bool): Write the file as JSON lines instead of plain text
+        console (bool): Also log to stderr
+        debug_sample_every (int): Keep one in this many DEBUG records per logger
+
+    Returns:
+        logging.Logger: The named logger
+    """
+    with _lock:
+        if _state['listener'] is None:
+            handlers = _build_handlers(log_dir, log_file, max_bytes, backup_count, json_lines, console)
+            log_queue = queue.SimpleQueue()
+            queue_handler = _QueueHandler(log_queue)
+            queue_handler.addFilter(DebugSampler(debug_sample_every))
+            listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+            listener.start()
+            root = logging.getLogger()
+            root.addHandler(queue_handler)
+            root.setLevel(min(root.level, level))
+            _state['listener'] = listener
+            _state['queue_handler'] = queue_handler
+            atexit.register(shutdown_logging)
+
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    return logger
+
+
+def shutdown_logging():
+    """Flush queued records, stop the listener and remove the queue handler."""
+    with _lock:
+        listener = _state['listener']
+        if listener is None:
+            return
+        listener.stop()
+        logging.getLogger().removeHandler(_state['queue_handler'])
+        for handler in listener.handlers:
+            handler.close()
+        _state['listener'] = _state['queue_handler'] = None
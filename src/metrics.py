@@ -0,0 +1,294 @@
+"""
+Lightweight in-process metrics: counters, histograms and timers.
+
+Metrics live in a MetricsRegistry and are exported in the Prometheus text
+format, either to a file (for node_exporter's textfile collector) or from a
+small HTTP server. Collection is off by default. While it is off, every
+recording call returns after one attribute check, so instrumented hot paths
+cost a few tens of nanoseconds. Set ``ML_METRICS=1`` or call ``enable()``
+to turn it on.
+
+Example:
+    from src import metrics
+
+    @metrics.timed('prepare_data')
+    def prepare_data(...):
+        ...
+        metrics.counter('prepare_rows_total', "Rows prepared").inc(len(df))
+"""
+import os
+import time
+import bisect
+import functools
+import threading
+
+# Seconds; spans sub-millisecond local calls up to multi-hour training jobs
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0, 300.0, 1800.0, 7200.0
+)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in key) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonically increasing value, e.g. bytes uploaded or retries."""
+
+    type_name = 'counter'
+
+    def __init__(self, registry, name, documentation=''):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Add ``amount`` to the series selected by ``labels``."""
+        if not self._registry.enabled:
+            return
+        self._add(_label_key(labels), amount)
+
+    def _add(self, key, amount):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, e.g. latencies."""
+
+    type_name = 'histogram'
+
+    def __init__(self, registry, name, documentation='', buckets=DEFAULT_BUCKETS):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Record one observation in the series selected by ``labels``."""
+        if not self._registry.enabled:
+            return
+        self._observe(_label_key(labels), value)
+
+    def _observe(self, key, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, plus count and sum
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def time(self, **labels):
+        """Context manager observing the seconds spent in its block."""
+        return _Timer(self, labels)
+
+    def count(self, **labels):
+        series = self._series.get(_label_key(labels))
+        return series[1] if series else 0
+
+    def sum(self, **labels):
+        series = self._series.get(_label_key(labels))
+        return series[2] if series else 0.0
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, count, total) in self._series.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    samples.append((f"{self.name}_bucket", key + (('le', _format_value(bound)),), cumulative))
+                samples.append((f"{self.name}_count", key, count))
+                samples.append((f"{self.name}_sum", key, total))
+        return samples
+
+
+class _Timer:
+    __slots__ = ('_histogram', '_labels', '_start')
+
+    def __init__(self, histogram, labels):
+        self._histogram = histogram
+        self._labels = labels
+        self._start = None
+
+    def __enter__(self):
+        if self._histogram._registry.enabled:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._start is not None:
+            self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+class MetricsRegistry:
+    """Named collection of metrics with a shared on/off switch."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(self, name, documentation, **kwargs)
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric {name!r} is already registered as a {metric.type_name}")
+        return metric
+
+    def counter(self, name, documentation=''):
+        """Return the counter called ``name``, creating it on first use."""
+        return self._get_or_create(Counter, name, documentation)
+
+    def histogram(self, name, documentation='', buckets=DEFAULT_BUCKETS):
+        """Return the histogram called ``name``, creating it on first use."""
+        return self._get_or_create(Histogram, name, documentation, buckets=buckets)
+
+    def reset(self):
+        """Drop every recorded value; registered metrics stay registered."""
+        with self._lock:
+            for metric in self._metrics.values():
+                with metric._lock:
+                    (metric._values if isinstance(metric, Counter) else metric._series).clear()
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            if metric.documentation:
+                lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type_name}")
+            for sample_name, key, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(key)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """Write ``render()`` to ``path`` atomically, for a textfile collector."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+        return path
+
+    def start_http_server(self, port=8000, addr='127.0.0.1'):
+        """
+        Serve ``render()`` at ``http://addr:port/metrics`` from a daemon thread.
+
+        Returns:
+            http.server.ThreadingHTTPServer: Call ``shutdown()`` to stop it
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((addr, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+REGISTRY = MetricsRegistry(enabled=os.getenv('ML_METRICS', '').lower() in ('1', 'true', 'yes'))
+
+
+def enable(registry=REGISTRY):
+    registry.enabled = True
+
+
+def disable(registry=REGISTRY):
+    registry.enabled = False
+
+
+def counter(name, documentation=''):
+    """Counter in the default registry."""
+    return REGISTRY.counter(name, documentation)
+
+
+def histogram(name, documentation='', buckets=DEFAULT_BUCKETS):
+    """Histogram in the default registry."""
+    return REGISTRY.histogram(name, documentation, buckets)
+
+
+def timed(name, registry=REGISTRY):
+    """
+    Decorator recording a function's latency and outcome.
+
+    Records ``<name>_seconds`` (histogram) and ``<name>_calls_total`` (counter
+    with an ``outcome`` label of "ok" or "error").
+
+    Args:
+        name (str): Metric name prefix, e.g. "upload_data_to_cloud"
+        registry (MetricsRegistry): Registry to record into
+    """
+    def decorator(fn):
+        seconds = registry.histogram(f"{name}_seconds", f"Latency of {fn.__qualname__}")
+        calls = registry.counter(f"{name}_calls_total", f"Calls of {fn.__qualname__} by outcome")
+        # Label keys built once, so a recorded call skips the keyword-label path
+        ok_key, error_key = _label_key({'outcome': 'ok'}), _label_key({'outcome': 'error'})
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                seconds._observe((), time.perf_counter() - start)
+                calls._add(error_key, 1)
+                raise
+            seconds._observe((), time.perf_counter() - start)
+            calls._add(ok_key, 1)
+            return result
+        return wrapper
+    return decorator
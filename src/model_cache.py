@@ -0,0 +1,300 @@
+"""
+Memory-mapped model loading and a size-bounded LRU cache of loaded models.
+
+export_mmap_model converts a ``models/*.pkl`` artifact into a directory whose
+numeric arrays can be memory-mapped: random forests become CompiledForest
+``.npy`` files, SVMs a joblib file with its arrays stored uncompressed. Loading
+then maps the file pages instead of deserialising them, so start-up is cheap
+and worker processes serving the same model share one copy of its arrays in
+the page cache.
+"""
+import os
+import json
+import hashlib
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from src.compiled_forest import compile_forest, CompiledForest
+from src.local_predictor import load_model_artifact
+from src.utils import compute_file_hash
+
+MMAP_FORMAT_VERSION = 1
+DEFAULT_MMAP_DIR = 'models/mmap'
+_META_FILENAME = 'model.json'
+_JOBLIB_FILENAME = 'model.joblib'
+
+
+def mmap_model_path(artifact_path, output_dir=DEFAULT_MMAP_DIR):
+    """
+    Return the directory an artifact is exported to.
+
+    The name carries a hash of the artifact's absolute path, so artifacts with
+    the same file name in different directories get separate exports.
+    """
+    stem = os.path.splitext(os.path.basename(artifact_path))[0]
+    path_hash = hashlib.sha256(os.path.abspath(artifact_path).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(output_dir, f"{stem}-{path_hash}")
+
+
+def export_mmap_model(artifact_path, output_dir=DEFAULT_MMAP_DIR):
+    """
+    Export a pickled model artifact to a memory-mappable directory.
+
+    Args:
+        artifact_path (str): Path to a ``.pkl`` artifact
+        output_dir (str): Parent directory for exported models
+
+    Returns:
+        str: Directory holding the exported model
+    """
+    # Taken before reading, so a rewrite during the export makes it look stale
+    source_stat = os.stat(artifact_path)
+    artifact = load_model_artifact(artifact_path)
+    model = artifact['model']
+    path = mmap_model_path(artifact_path, output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    # A private directory per export, so concurrent exports never touch each other's files
+    tmp_path = tempfile.mkdtemp(dir=output_dir, prefix=f".{os.path.basename(path)}.")
+
+    if type(model).__name__ == 'RandomForestClassifier':
+        compile_forest(model).save(tmp_path)
+        model_format = 'compiled_forest'
+    else:
+        import joblib
+        # No compression: joblib can only memory-map arrays stored raw
+        joblib.dump(model, os.path.join(tmp_path, _JOBLIB_FILENAME))
+        model_format = 'joblib'
+
+    feature_names = getattr(model, 'feature_names_in_', None)
+    meta = {
+        'format_version': MMAP_FORMAT_VERSION,
+        'format': model_format,
+        'model_type': artifact.get('model_type'),
+        'hyperparams': artifact.get('hyperparams'),
+        'timestamp': artifact.get('timestamp'),
+        'feature_names': list(feature_names) if feature_names is not None else None,
+        'source': artifact_path,
+        'source_sha256': compute_file_hash(artifact_path),
+        'source_size': source_stat.st_size,
+        'source_mtime_ns': source_stat.st_mtime_ns
+    }
+    with open(os.path.join(tmp_path, _META_FILENAME), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    _publish(tmp_path, path, meta['source_sha256'])
+    return path
+
+
+def _publish(tmp_path, path, source_sha256):
+    """
+    Move a finished export into place, tolerating concurrent exports of the same model.
+
+    A directory cannot be renamed over a non-empty one, so a stale export is
+    first renamed aside. If another process publishes an export first, and it
+    was made from the same artifact bytes, that one is kept and ours is
+    discarded. Processes that already mapped the old files keep them: removing
+    a directory does not unmap its files.
+    """
+    while True:
+        try:
+            os.rename(tmp_path, path)
+            return
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+        if _export_sha256(path) == source_sha256:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return
+        stale_path = tempfile.mkdtemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.stale.")
+        try:
+            os.rename(path, os.path.join(stale_path, 'export'))
+        except FileNotFoundError:
+            # Another process moved it aside first; try again
+            pass
+        shutil.rmtree(stale_path, ignore_errors=True)
+
+
+def _export_sha256(path):
+    """Source SHA-256 recorded in an export, or None if it is incomplete or gone."""
+    try:
+        with open(os.path.join(path, _META_FILENAME)) as f:
+            return json.load(f).get('source_sha256')
+    except (OSError, ValueError):
+        return None
+
+
+def load_mmap_model(path):
+    """
+    Load an exported model with its arrays memory-mapped.
+
+    Random forests load without importing scikit-learn at all. SVM arrays are
+    mapped copy-on-write because libsvm requires writable buffers; it never
+    writes to them, so the pages stay shared.
+
+    Args:
+        path (str): Directory written by ``export_mmap_model``
+
+    Returns:
+        dict: Artifact dict (``model``, ``model_type``, ...) usable by LocalPredictor
+    """
+    with open(os.path.join(path, _META_FILENAME)) as f:
+        meta = json.load(f)
+    if meta['format_version'] != MMAP_FORMAT_VERSION:
+        raise ValueError(f"Unsupported mmap model format {meta['format_version']}")
+
+    if meta['format'] == 'compiled_forest':
+        model = CompiledForest.load(path, mmap_mode='r')
+    else:
+        import joblib
+        model = joblib.load(os.path.join(path, _JOBLIB_FILENAME), mmap_mode='c')
+
+    return {
+        'model': model,
+        'model_type': meta['model_type'],
+        'hyperparams': meta['hyperparams'],
+        'timestamp': meta['timestamp'],
+        'feature_names': meta['feature_names'],
+        'source': meta['source']
+    }
+
+
+def _export_is_current(artifact_path, path):
+    """
+    True if ``path`` holds an export made from the artifact's current bytes.
+
+    The artifact's size and mtime are compared with those recorded at export;
+    only when they differ is the artifact hashed, so a file that was merely
+    touched or copied back is not exported again.
+    """
+    try:
+        with open(os.path.join(path, _META_FILENAME)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    stat = os.stat(artifact_path)
+    if (meta.get('source_size'), meta.get('source_mtime_ns')) == (stat.st_size, stat.st_mtime_ns):
+        return True
+    return meta.get('source_sha256') == compute_file_hash(artifact_path)
+
+
+def _source_stamp(path):
+    """Size and mtime of an artifact (or of an export's metadata), to notice replacements."""
+    stat = os.stat(os.path.join(path, _META_FILENAME) if os.path.isdir(path) else path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _directory_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+
+class ModelCache:
+    """
+    Thread-safe LRU cache of memory-mapped models.
+
+    ``get`` accepts either a ``.pkl`` artifact (exported on first use and
+    re-exported when the artifact changes) or an already exported directory.
+    Every hit stats the source, so a model retrained in place is reloaded.
+    The cache is bounded by number of models and, optionally, by the total
+    on-disk size of the mapped arrays.
+    """
+
+    def __init__(self, max_models=4, max_bytes=None, mmap_dir=DEFAULT_MMAP_DIR):
+        """
+        Args:
+            max_models (int): Maximum number of models kept loaded
+            max_bytes (int, optional): Maximum total size of loaded models
+            mmap_dir (str): Where ``.pkl`` artifacts are exported to
+        """
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.mmap_dir = mmap_dir
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'reloads': 0}
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _resolve(self, path):
+        """Return the exported directory for ``path``, exporting if needed."""
+        if os.path.isdir(path):
+            return path
+        exported = mmap_model_path(path, self.mmap_dir)
+        if not _export_is_current(path, exported):
+            export_mmap_model(path, self.mmap_dir)
+        return exported
+
+    def get(self, path):
+        """
+        Return the loaded artifact dict for ``path``, loading it on a miss.
+
+        Args:
+            path (str): ``.pkl`` artifact or exported model directory
+
+        Returns:
+            dict: Artifact dict as returned by ``load_mmap_model``
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            stamp = _source_stamp(path)
+            if key in self._entries:
+                if self._entries[key][2] == stamp:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return self._entries[key][0]
+                # Replaced since it was loaded
+                _, size, _ = self._entries.pop(key)
+                self._bytes -= size
+                self.stats['reloads'] += 1
+            self.stats['misses'] += 1
+
+            exported = self._resolve(path)
+            try:
+                artifact = load_mmap_model(exported)
+            except FileNotFoundError:
+                # Another process replaced a stale export while we read it
+                exported = self._resolve(path)
+                artifact = load_mmap_model(exported)
+            size = _directory_size(exported)
+            self._entries[key] = (artifact, size, stamp)
+            self._bytes += size
+            self._evict()
+            return artifact
+
+    def _evict(self):
+        """Drop least recently used models until both bounds hold (keeping the newest)."""
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_models
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        """Drop every cached model."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return os.path.abspath(path) in self._entries
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_model_cache():
+    """Return the process-wide ModelCache, creating it on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ModelCache()
+        return _default_cache
@@ -0,0 +1,294 @@
+"""
+Content-addressed, deduplicated store for model artifacts.
+
+Artifacts are stored once per SHA-256 of their bytes under
+``<root>/objects/<hash[:2]>/<hash>.pkl``. A small JSON index records each
+version's algorithm, params, dataset hash, metrics and timestamp, so "latest"
+and "best by metric" lookups never unpickle a model.
+"""
+import os
+import io
+import json
+import pickle
+import hashlib
+import tempfile
+from datetime import datetime
+
+from src.local_predictor import load_model_artifact
+from src.utils import (
+    MODEL_FILENAME_PATTERN, MODEL_TIMESTAMP_FORMAT, compute_file_hash, ensure_directory_exists
+)
+
+INDEX_VERSION = 1
+DEFAULT_REGISTRY_ROOT = 'models/registry'
+
+
+def _timestamp_from_filename(path):
+    """Turn the ``YYYYmmdd_HHMMSS`` part of an artifact filename into an ISO timestamp."""
+    match = MODEL_FILENAME_PATTERN.match(os.path.basename(path))
+    if not match:
+        return None
+    return datetime.strptime(match.group('timestamp'), MODEL_TIMESTAMP_FORMAT).isoformat()
+
+
+def _write_atomic(path, data):
+    """Write bytes to ``path`` via a temporary file so readers never see a partial file."""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelRegistry:
+    """
+    Index of model versions backed by a content-addressed object store.
+
+    Each version is identified by the SHA-256 of its artifact bytes, so
+    registering an identical artifact twice adds no storage and no new version;
+    only the list of source files it came from grows.
+    """
+
+    def __init__(self, root=DEFAULT_REGISTRY_ROOT):
+        """
+        Args:
+            root (str): Directory holding ``index.json`` and ``objects/``
+        """
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+        self._index = self._read_index()
+
+    def _read_index(self):
+        if not os.path.exists(self.index_path):
+            return {'version': INDEX_VERSION, 'current': {}, 'models': {}}
+        with open(self.index_path) as f:
+            index = json.load(f)
+        if index.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported registry index version {index.get('version')}")
+        return index
+
+    def _save_index(self):
+        ensure_directory_exists(self.root)
+        data = json.dumps(self._index, indent=2, sort_keys=True).encode('utf-8')
+        _write_atomic(self.index_path, data)
+
+    def object_path(self, version_id):
+        """Return the stored artifact path for a version."""
+        return os.path.join(self.root, 'objects', version_id[:2], f"{version_id}.pkl")
+
+    def _store_object(self, version_id, source_path=None, data=None):
+        """Copy an artifact into the object store unless that content is already there."""
+        path = self.object_path(version_id)
+        if os.path.exists(path):
+            return path
+        ensure_directory_exists(os.path.dirname(path))
+        if data is None:
+            with open(source_path, 'rb') as f:
+                data = f.read()
+        _write_atomic(path, data)
+        return path
+
+    def register(
+        self,
+        artifact,
+        algorithm=None,
+        params=None,
+        dataset_hash=None,
+        metrics=None,
+        timestamp=None,
+        source=None
+    ):
+        """
+        Add an artifact to the registry.
+
+        Args:
+            artifact: Path to a ``.pkl`` file, or an in-memory artifact dict/estimator
+            algorithm (str, optional): Model type; read from the artifact if omitted
+            params (dict, optional): Hyperparameters; read from the artifact if omitted
+            dataset_hash (str, optional): Hash of the training data
+            metrics (dict, optional): Evaluation metrics, e.g. ``{'accuracy': 0.97}``
+            timestamp (str, optional): ISO timestamp; read from the artifact or filename
+            source (str, optional): Where the artifact came from; defaults to its path
+
+        Returns:
+            str: Version id (SHA-256 of the artifact bytes)
+        """
+        data = None
+        if isinstance(artifact, (str, os.PathLike)):
+            source_path = os.fspath(artifact)
+            version_id = compute_file_hash(source_path)
+            source = source or source_path
+        else:
+            source_path = None
+            buffer = io.BytesIO()
+            pickle.dump(artifact, buffer)
+            data = buffer.getvalue()
+            version_id = hashlib.sha256(data).hexdigest()
+
+        models = self._index['models']
+        if version_id in models:
+            # Identical content: record the extra source but keep one version
+            entry = models[version_id]
+            if source and source not in entry['sources']:
+                entry['sources'].append(source)
+            for key, value in (('dataset_hash', dataset_hash), ('metrics', metrics)):
+                if value:
+                    entry[key] = value
+            self._save_index()
+            return version_id
+
+        # Metadata is read from the artifact once here so lookups never unpickle
+        if algorithm is None or params is None or timestamp is None:
+            if source_path is not None:
+                loaded = load_model_artifact(source_path)
+            elif isinstance(artifact, dict):
+                loaded = artifact
+            else:
+                loaded = {'model': artifact}
+            model = loaded.get('model')
+            algorithm = algorithm or loaded.get('model_type')
+            if params is None:
+                params = loaded.get('hyperparams')
+                if params is None and hasattr(model, 'get_params'):
+                    params = model.get_params()
+            timestamp = timestamp or loaded.get('timestamp')
+        if timestamp is None and source_path is not None:
+            timestamp = _timestamp_from_filename(source_path)
+
+        self._store_object(version_id, source_path=source_path, data=data)
+        models[version_id] = {
+            'algorithm': algorithm,
+            'params': params or {},
+            'dataset_hash': dataset_hash,
+            'metrics': metrics or {},
+            'timestamp': timestamp or datetime.now().isoformat(),
+            'size': os.path.getsize(self.object_path(version_id)),
+            'sources': [source] if source else []
+        }
+        self._save_index()
+        return version_id
+
+    def import_directory(self, model_dir='models'):
+        """
+        Register every ``<algorithm>_<timestamp>.pkl`` file in a directory.
+
+        Args:
+            model_dir (str): Directory of legacy timestamped artifacts
+
+        Returns:
+            list: Version ids, one per file (duplicates share an id)
+        """
+        version_ids = []
+        for filename in sorted(os.listdir(model_dir)):
+            match = MODEL_FILENAME_PATTERN.match(filename)
+            if match:
+                version_ids.append(self.register(
+                    os.path.join(model_dir, filename),
+                    algorithm=match.group('model_type')
+                ))
+        return version_ids
+
+    def get(self, version_id):
+        """Return the index entry for a version (a full id or a unique prefix)."""
+        matches = [v for v in self._index['models'] if v.startswith(version_id)]
+        if len(matches) != 1:
+            raise KeyError(f"{len(matches)} registry versions match {version_id!r}")
+        return dict(self._index['models'][matches[0]], version_id=matches[0])
+
+    def list(self, algorithm=None):
+        """Return index entries, oldest first, optionally for one algorithm."""
+        entries = [
+            dict(entry, version_id=version_id)
+            for version_id, entry in self._index['models'].items()
+            if algorithm is None or entry['algorithm'] == algorithm
+        ]
+        return sorted(entries, key=lambda entry: entry['timestamp'])
+
+    def latest(self, algorithm=None):
+        """Return the most recently trained version, or None if there is none."""
+        entries = self.list(algorithm)
+        return entries[-1] if entries else None
+
+    def best(self, metric, algorithm=None, higher_is_better=True):
+        """
+        Return the version with the best value of ``metric``.
+
+        Args:
+            metric (str): Metric name recorded at registration
+            algorithm (str, optional): Restrict to one algorithm
+            higher_is_better (bool): False for losses
+
+        Returns:
+            dict or None: Index entry of the best version
+        """
+        scored = [e for e in self.list(algorithm) if metric in e['metrics']]
+        if not scored:
+            return None
+        sign = 1 if higher_is_better else -1
+        # Ties go to the newer version
+        return max(scored, key=lambda e: (sign * e['metrics'][metric], e['timestamp']))
+
+    def set_current(self, version_id):
+        """Mark a version as the current one for its algorithm."""
+        entry = self.get(version_id)
+        self._index['current'][entry['algorithm']] = entry['version_id']
+        self._save_index()
+
+    def current(self, algorithm):
+        """Return the current version for an algorithm, falling back to the latest."""
+        version_id = self._index['current'].get(algorithm)
+        if version_id in self._index['models']:
+            return self.get(version_id)
+        return self.latest(algorithm)
+
+    def load(self, version_id):
+        """Unpickle a version's artifact (see load_model_artifact)."""
+        return load_model_artifact(self.object_path(self.get(version_id)['version_id']))
+
+    def prune(self, keep_last=3, keep_best=None, higher_is_better=True, dry_run=False):
+        """
+        Delete old versions, per algorithm, according to a retention policy.
+
+        The newest ``keep_last`` versions, the best version by ``keep_best`` and
+        any version marked current are always kept.
+
+        Args:
+            keep_last (int): Number of newest versions to keep per algorithm
+            keep_best (str, optional): Metric whose best version is always kept
+            higher_is_better (bool): Direction of ``keep_best``
+            dry_run (bool): Report what would be removed without deleting
+
+        Returns:
+            list: Version ids that were (or would be) removed
+        """
+        algorithms = {entry['algorithm'] for entry in self._index['models'].values()}
+        keep = set(self._index['current'].values())
+        for algorithm in algorithms:
+            entries = self.list(algorithm)
+            if keep_last > 0:
+                keep.update(e['version_id'] for e in entries[-keep_last:])
+            if keep_best:
+                best = self.best(keep_best, algorithm, higher_is_better)
+                if best:
+                    keep.add(best['version_id'])
+
+        removed = [v for v in self._index['models'] if v not in keep]
+        if dry_run or not removed:
+            return removed
+
+        for version_id in removed:
+            del self._index['models'][version_id]
+        self._save_index()
+        for version_id in removed:
+            path = self.object_path(version_id)
+            if os.path.exists(path):
+                os.remove(path)
+            shard = os.path.dirname(path)
+            if os.path.isdir(shard) and not os.listdir(shard):
+                os.rmdir(shard)
+        return removed
@@ -0,0 +1,312 @@
+"""
+Asynchronous monitoring of many training jobs with adaptive polling.
+
+Each job is watched by its own asyncio task. The task polls quickly right
+after the job changes state and backs off geometrically while nothing
+changes. Every status call goes through a shared rate limiter, so many jobs
+never add up to a burst of API calls. State changes become JobEvents, which
+a NotificationQueue batches and sends off the event loop, at most one message
+per ``min_send_interval``.
+"""
+import time
+import random
+import asyncio
+from collections import namedtuple
+from datetime import datetime
+
+TERMINAL_STATES = frozenset({'SUCCEEDED', 'COMPLETED', 'FAILED', 'CANCELLED', 'EXPIRED'})
+SUCCESS_STATES = frozenset({'SUCCEEDED', 'COMPLETED'})
+_STATE_PREFIXES = ('PIPELINE_STATE_', 'JOB_STATE_')
+
+JobEvent = namedtuple(
+    'JobEvent', ['resource_name', 'display_name', 'old_state', 'new_state', 'timestamp', 'details']
+)
+
+
+def job_state(job):
+    """
+    Return a job's state as a short name such as "RUNNING" or "SUCCEEDED".
+
+    Works with Vertex AI jobs (``state`` is a PipelineState/JobState enum whose
+    name carries a prefix) and with objects exposing a plain ``status`` string.
+    """
+    state = getattr(job, 'state', None)
+    if state is None:
+        state = job.status
+    return short_state(state)
+
+
+def short_state(state):
+    """
+    Strip the "PIPELINE_STATE_"/"JOB_STATE_" prefix from a state enum or string.
+
+    Args:
+        state: PipelineState/JobState enum, its name, or a short name already
+
+    Returns:
+        str: Short state name such as "RUNNING"; "" for None
+    """
+    if state is None:
+        return ''
+    name = getattr(state, 'name', str(state))
+    for prefix in _STATE_PREFIXES:
+        if name.startswith(prefix):
+            return name[len(prefix):]
+    return name
+
+
+def final_metrics(job):
+    """Return the evaluation of a finished job's model, or an error description."""
+    try:
+        return job.get_model().get_model_evaluation()
+    except Exception as e:
+        return f"Could not retrieve metrics: {str(e)}"
+
+
+class RateLimiter:
+    """Token bucket shared by coroutines: ``rate`` calls per second, bursts of ``burst``."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def format_events(events):
+    """
+    Build one notification from a batch of events.
+
+    Returns:
+        tuple: ``(subject, message)``
+    """
+    if len(events) == 1:
+        event = events[0]
+        subject = f"ML Training Status Update: {event.new_state}"
+    else:
+        subject = f"ML Training: {len(events)} status updates"
+    lines = []
+    for event in events:
+        change = f"{event.old_state} -> {event.new_state}" if event.old_state else event.new_state
+        lines.append(f"[{event.timestamp}] Training job {event.display_name}: {change}")
+        if event.details:
+            lines.append(f"{event.details}")
+    return subject, "\n".join(lines)
+
+
+class NotificationQueue:
+    """
+    Non-blocking, batching, rate-limited delivery of JobEvents.
+
+    ``put`` never blocks the monitor. A consumer task gathers events for
+    ``batch_window`` seconds (or until ``max_batch`` are waiting). It then
+    sends them as one message through ``send_fn(subject, message)`` in a
+    worker thread, never more often than every ``min_send_interval`` seconds.
+    Events arriving in between join the next batch.
+    """
+
+    _CLOSE = object()
+
+    def __init__(self, send_fn, batch_window=5.0, max_batch=50, min_send_interval=60.0):
+        """
+        Args:
+            send_fn (callable): Blocking ``send_fn(subject, message)``, e.g. an SMTP sender
+            batch_window (float): Seconds to wait for more events before sending
+            max_batch (int): Send as soon as this many events are waiting
+            min_send_interval (float): Minimum seconds between two sends
+        """
+        self.send_fn = send_fn
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.min_send_interval = min_send_interval
+        self.sent = []
+        self._queue = None
+        self._task = None
+        self._last_sent = None
+
+    def start(self):
+        """Start the consumer task on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._consume())
+        return self
+
+    def put(self, event):
+        """Queue an event for delivery without waiting."""
+        self._queue.put_nowait(event)
+
+    async def close(self):
+        """Send whatever is still queued, then stop the consumer."""
+        self._queue.put_nowait(self._CLOSE)
+        await self._task
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            item = await self._queue.get()
+            if item is self._CLOSE:
+                break
+            batch = [item]
+            deadline = loop.time() + self.batch_window
+            if self._last_sent is not None:
+                deadline = max(deadline, self._last_sent + self.min_send_interval)
+            while True:
+                timeout = deadline - loop.time()
+                if timeout <= 0 or (len(batch) >= self.max_batch and self._may_send(loop)):
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is self._CLOSE:
+                    # Flush immediately on shutdown so final states are not lost
+                    closing = True
+                    break
+                batch.append(item)
+            if closing:
+                for start in range(0, len(batch), self.max_batch):
+                    await self._send(batch[start:start + self.max_batch], loop)
+                break
+            # Events past max_batch wait for the next send
+            for extra in batch[self.max_batch:]:
+                self._queue.put_nowait(extra)
+            await self._send(batch[:self.max_batch], loop)
+
+    def _may_send(self, loop):
+        return self._last_sent is None or loop.time() >= self._last_sent + self.min_send_interval
+
+    async def _send(self, events, loop):
+        subject, message = format_events(events)
+        self._last_sent = loop.time()
+        try:
+            await loop.run_in_executor(None, self.send_fn, subject, message)
+            self.sent.append((subject, message))
+        except Exception as e:
+            print(f"Failed to send notification: {str(e)}")
+
+
+class TrainingMonitor:
+    """
+    Watch several training jobs concurrently until all reach a terminal state.
+
+    Example:
+        monitor = TrainingMonitor(jobs, notifier=NotificationQueue(send))
+        asyncio.run(monitor.run())
+    """
+
+    def __init__(
+        self,
+        jobs,
+        notifier=None,
+        min_interval=2.0,
+        max_interval=30.0,
+        backoff=1.5,
+        max_calls_per_second=5.0,
+        max_concurrent_calls=4,
+        fetch_final_metrics=True,
+        on_event=None
+    ):
+        """
+        Args:
+            jobs (list): Job objects with ``state`` (or ``status``) and ``display_name``
+            notifier (NotificationQueue, optional): Receives every state change
+            min_interval (float): Poll interval right after a state change
+            max_interval (float): Longest poll interval while nothing changes
+            backoff (float): Factor the interval grows by after each unchanged poll
+            max_calls_per_second (float): Rate limit across all jobs
+            max_concurrent_calls (int): Status calls running at the same time
+            fetch_final_metrics (bool): Attach model evaluation to successful jobs
+            on_event (callable, optional): Called with each JobEvent as it happens
+        """
+        self.jobs = list(jobs)
+        self.notifier = notifier
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.fetch_final_metrics = fetch_final_metrics
+        self.on_event = on_event
+        self.events = []
+        self.states = {}
+        self.stats = {'polls': 0, 'errors': 0}
+        self._limiter = RateLimiter(max_calls_per_second, burst=max(1, int(max_calls_per_second)))
+        self._max_concurrent_calls = max_concurrent_calls
+        self._semaphore = None
+
+    async def _call(self, fn, *args):
+        """Run a blocking API call in a thread, within the rate and concurrency limits."""
+        await self._limiter.acquire()
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def run(self, timeout=None):
+        """
+        Watch every job until it finishes.
+
+        Args:
+            timeout (float, optional): Stop watching after this many seconds
+
+        Returns:
+            dict: Last seen state per job resource name
+        """
+        self._semaphore = asyncio.Semaphore(self._max_concurrent_calls)
+        if self.notifier is not None:
+            self.notifier.start()
+        try:
+            watchers = [self._watch(job) for job in self.jobs]
+            await asyncio.wait_for(asyncio.gather(*watchers), timeout)
+        finally:
+            if self.notifier is not None:
+                await self.notifier.close()
+        return dict(self.states)
+
+    async def _watch(self, job):
+        name = getattr(job, 'resource_name', None) or job.display_name
+        interval = self.min_interval
+        last_state = None
+        while True:
+            try:
+                state = await self._call(job_state, job)
+                self.stats['polls'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"Error polling {job.display_name}: {str(e)}")
+                state = last_state
+
+            if state != last_state:
+                details = None
+                if state in SUCCESS_STATES and self.fetch_final_metrics:
+                    details = await self._call(final_metrics, job)
+                self._emit(JobEvent(
+                    name, job.display_name, last_state, state, datetime.now().isoformat(), details
+                ))
+                interval = self.min_interval
+            else:
+                interval = min(interval * self.backoff, self.max_interval)
+            last_state = state
+            self.states[name] = state
+
+            if state in TERMINAL_STATES:
+                return
+            # Jitter keeps jobs started together from polling in lockstep
+            await asyncio.sleep(interval * random.uniform(0.9, 1.1))
+
+    def _emit(self, event):
+        self.events.append(event)
+        change = f"{event.old_state} -> {event.new_state}" if event.old_state else event.new_state
+        print(f"[{event.timestamp}] {event.display_name}: {change}")
+        if self.on_event is not None:
+            self.on_event(event)
+        if self.notifier is not None:
+            self.notifier.put(event)
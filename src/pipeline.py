@@ -0,0 +1,209 @@
+"""
+DAG runner for multi-stage jobs with concurrent stages and checkpoint/resume.
+
+A pipeline is a list of Stages, each naming the stages it depends on. A stage
+starts as soon as all its dependencies have finished, so independent branches
+run side by side. Examples are uploading test data while a model trains, or
+training several model variants at once. Each stage's output is written to a
+JSON checkpoint as soon as the stage finishes. A rerun after a failure skips
+every completed stage and continues from where the last run stopped.
+
+Example:
+    pipeline = Pipeline([
+        Stage('upload', lambda: backend.upload(path)),
+        Stage('train', lambda upload: backend.train(upload), deps=['upload']),
+    ], checkpoint_path='.pipeline_state/train.json')
+    outputs = pipeline.run()
+"""
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from src.utils import ensure_directory_exists
+
+DEFAULT_CHECKPOINT_DIR = '.pipeline_state'
+
+StageTiming = namedtuple('StageTiming', ['name', 'start', 'end', 'resumed'])
+
+
+class Stage:
+    """
+    One step of a Pipeline.
+
+    ``fn`` is called with the outputs of its dependencies as keyword
+    arguments named after them. Its return value must be JSON-serialisable
+    (resource names, URIs, metrics) so it can be checkpointed.
+    """
+
+    def __init__(self, name, fn, deps=(), key=None):
+        """
+        Args:
+            name (str): Unique stage name; also the keyword its output is passed as
+            fn (callable): ``fn(**dependency_outputs)`` returning the stage output
+            deps (list): Names of the stages whose outputs ``fn`` needs
+            key (optional): JSON value describing the stage's inputs, e.g. its
+                parameters. A checkpoint recorded with a different key is not
+                reused, and neither are the checkpoints of stages depending on it.
+        """
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.key = key
+
+
+class PipelineError(RuntimeError):
+    """A stage failed; ``stage`` names it and ``outputs`` holds what completed."""
+
+    def __init__(self, stage, error, outputs):
+        super().__init__(f"Stage {stage!r} failed: {error}")
+        self.stage = stage
+        self.outputs = outputs
+
+
+class Pipeline:
+    """Run Stages in dependency order, concurrently where the graph allows."""
+
+    def __init__(self, stages, checkpoint_path=None, max_workers=None, on_stage_done=None):
+        """
+        Args:
+            stages (list): Stages, in any order
+            checkpoint_path (str, optional): JSON file of completed stage outputs;
+                None disables checkpointing
+            max_workers (int, optional): Stages running at once; defaults to all
+            on_stage_done (callable, optional): Called with ``(name, output)`` after each stage
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        for stage in stages:
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name!r} depends on unknown stages {missing}")
+        self.order = self._topological_order()
+        self.checkpoint_path = checkpoint_path
+        self.max_workers = max_workers or len(stages) or 1
+        self.on_stage_done = on_stage_done
+        self.timings = []
+        self._lock = threading.Lock()
+
+    def _topological_order(self):
+        order = []
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for dep in self.stages[name].deps:
+                visit(dep, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def load_checkpoint(self):
+        """Return the reusable completed stages as ``{name: output}``."""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path) as f:
+            recorded = json.load(f)
+        reusable = {}
+        # In dependency order, so a stage whose inputs are rerun is rerun too
+        for name in self.order:
+            entry = recorded.get(name)
+            stage = self.stages[name]
+            if entry is None or entry.get('key') != stage.key:
+                continue
+            if all(dep in reusable for dep in stage.deps):
+                reusable[name] = entry['output']
+        return reusable
+
+    def _save_checkpoint(self, outputs):
+        if not self.checkpoint_path:
+            return
+        ensure_directory_exists(os.path.dirname(self.checkpoint_path) or '.')
+        data = {
+            name: {'output': output, 'key': self.stages[name].key}
+            for name, output in outputs.items()
+        }
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def clear_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def _run_stage(self, name, outputs):
+        stage = self.stages[name]
+        start = time.monotonic()
+        output = stage.fn(**{dep: outputs[dep] for dep in stage.deps})
+        with self._lock:
+            self.timings.append(StageTiming(name, start, time.monotonic(), False))
+        return output
+
+    def run(self, resume=True):
+        """
+        Run every stage not already completed.
+
+        Args:
+            resume (bool): Reuse outputs from the checkpoint; False reruns everything
+
+        Returns:
+            dict: Output of every stage, by name
+
+        Raises:
+            PipelineError: When a stage fails. Stages already running are allowed to
+                finish and are checkpointed, so the next run resumes after them.
+        """
+        outputs = self.load_checkpoint() if resume else {}
+        now = time.monotonic()
+        self.timings = [StageTiming(name, now, now, True) for name in outputs]
+        pending = [name for name in self.order if name not in outputs]
+        running = {}
+        failure = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if failure is None:
+                    ready = [
+                        name for name in pending
+                        if all(dep in outputs for dep in self.stages[name].deps)
+                    ]
+                    for name in ready:
+                        pending.remove(name)
+                        running[executor.submit(self._run_stage, name, outputs)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        outputs[name] = future.result()
+                    except Exception as e:
+                        if failure is None:
+                            failure = (name, e)
+                        continue
+                    self._save_checkpoint(outputs)
+                    if self.on_stage_done is not None:
+                        self.on_stage_done(name, outputs[name])
+
+        if failure is not None:
+            name, error = failure
+            raise PipelineError(name, error, dict(outputs)) from error
+        return outputs
+
+    def critical_path_seconds(self):
+        """Wall time of the last run from the first stage start to the last stage end."""
+        ran = [timing for timing in self.timings if not timing.resumed]
+        if not ran:
+            return 0.0
+        return max(t.end for t in ran) - min(t.start for t in ran)
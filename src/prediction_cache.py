@@ -0,0 +1,281 @@
+"""
+Cache of endpoint predictions keyed on model version and feature values.
+
+Prediction traffic repeats the same few feature vectors, and every repeat used
+to cost a remote call. CachedEndpoint wraps an endpoint: instances already in
+the PredictionCache are answered locally, and only the misses are sent to the
+endpoint, as one call per request. Because it has the endpoint's ``predict``
+interface, it can be passed to predict_with_endpoint, predict_in_batches or
+the gateway unchanged.
+
+Feature values are quantized before they are used as keys, so 5.1 and
+5.1000000001 share an entry. Entries expire after a TTL and the least
+recently used are evicted once the entry count or the estimated memory use
+is over its bound. deploy_model invalidates the entries of the endpoint it
+deploys to, so a new model never serves its predecessor's results.
+"""
+import sys
+import time
+import threading
+from collections import OrderedDict
+
+from src import metrics
+from src.utils import Prediction
+
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_DECIMALS = 6
+
+# Bookkeeping per entry beyond its key and value: the OrderedDict node and the entry tuple
+_ENTRY_OVERHEAD = 200
+
+
+def _approx_size(obj):
+    """Rough deep size in bytes of a key or prediction (tuples, lists, dicts, scalars)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_approx_size(item) for item in obj)
+    return size
+
+
+def _quantize(value, scale):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # An integer count of 10**-decimals steps: exact, hashable and -0.0 == 0.0
+        return round(float(value) * scale)
+    return value
+
+
+def canonical_features(instance, decimals=DEFAULT_DECIMALS):
+    """
+    Return a hashable, quantized form of one instance.
+
+    Args:
+        instance (dict or list): Feature dict (as AutoML endpoints take) or value list
+        decimals (int): Decimal places kept from float features
+
+    Returns:
+        tuple: Equal for instances whose features agree to ``decimals`` places
+    """
+    scale = 10 ** decimals
+    if isinstance(instance, dict):
+        return tuple((name, _quantize(instance[name], scale)) for name in sorted(instance))
+    return tuple(_quantize(value, scale) for value in instance)
+
+
+class PredictionCache:
+    """Thread-safe LRU cache of predictions with a TTL and a memory bound."""
+
+    def __init__(
+        self,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        max_bytes=DEFAULT_MAX_BYTES,
+        ttl_seconds=DEFAULT_TTL_SECONDS,
+        decimals=DEFAULT_DECIMALS,
+        clock=time.monotonic
+    ):
+        """
+        Args:
+            max_entries (int): Maximum number of cached predictions
+            max_bytes (int, optional): Maximum estimated memory of the entries
+            ttl_seconds (float, optional): Age after which an entry is not served; None keeps entries
+            decimals (int): Decimal places kept from float features in keys
+            clock (callable): Returns the current time in seconds
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.decimals = decimals
+        self.clock = clock
+        self.stats = {
+            'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'invalidated': 0,
+            'lookup_seconds': 0.0, 'endpoint_calls': 0, 'endpoint_seconds': 0.0
+        }
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self):
+        """Incremented by every invalidate; see put_many."""
+        return self._generation
+
+    def key(self, model_version, instance):
+        """Return the cache key of ``instance`` for ``model_version``."""
+        return (model_version, canonical_features(instance, self.decimals))
+
+    def get_many(self, keys):
+        """
+        Look up keys, refreshing their recency.
+
+        Returns:
+            list: The cached prediction, or None, for each key
+        """
+        start = time.perf_counter()
+        now = self.clock()
+        results = []
+        hits = expired = 0
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] is not None and entry[1] <= now:
+                    self._remove(key)
+                    expired += 1
+                    entry = None
+                if entry is None:
+                    results.append(None)
+                    continue
+                self._entries.move_to_end(key)
+                results.append(entry[0])
+                hits += 1
+            self.stats['hits'] += hits
+            self.stats['misses'] += len(keys) - hits
+            self.stats['expired'] += expired
+            self.stats['lookup_seconds'] += time.perf_counter() - start
+        metrics.counter('prediction_cache_hits_total', "Predictions served from the cache").inc(hits)
+        metrics.counter('prediction_cache_misses_total', "Predictions not in the cache").inc(len(keys) - hits)
+        return results
+
+    def put_many(self, items, generation=None):
+        """
+        Store ``(key, prediction)`` pairs, evicting old entries past the bounds.
+
+        Args:
+            items (iterable): ``(key, prediction)`` pairs
+            generation (int, optional): ``generation`` read before the predictions
+                were requested. If the cache was invalidated since, the
+                predictions may come from the replaced model and are not stored.
+        """
+        expires = None if self.ttl_seconds is None else self.clock() + self.ttl_seconds
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            for key, prediction in items:
+                if key in self._entries:
+                    self._remove(key)
+                size = _approx_size(key) + _approx_size(prediction) + _ENTRY_OVERHEAD
+                self._entries[key] = (prediction, expires, size)
+                self._bytes += size
+            self._evict()
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        """Drop least recently used entries until both bounds hold."""
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.stats['evictions'] += 1
+
+    def invalidate(self, model_version=None):
+        """Drop the entries of one model version, or every entry when None."""
+        with self._lock:
+            self._generation += 1
+            if model_version is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                stale = [key for key in self._entries if key[0] == model_version]
+                for key in stale:
+                    self._remove(key)
+                dropped = len(stale)
+            self.stats['invalidated'] += dropped
+        return dropped
+
+    def record_endpoint_call(self, seconds):
+        with self._lock:
+            self.stats['endpoint_calls'] += 1
+            self.stats['endpoint_seconds'] += seconds
+
+    def summary(self):
+        """Return the stats with hit rate, size and mean latencies added."""
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries), bytes=self._bytes)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['mean_endpoint_seconds'] = (
+            stats['endpoint_seconds'] / stats['endpoint_calls'] if stats['endpoint_calls'] else 0.0
+        )
+        return stats
+
+    def __len__(self):
+        return len(self._entries)
+
+    def wrap(self, endpoint, model_version=None):
+        """Return ``endpoint`` behind this cache (see CachedEndpoint)."""
+        return CachedEndpoint(endpoint, self, model_version)
+
+
+class CachedEndpoint:
+    """
+    Endpoint-like object answering from a PredictionCache before calling ``endpoint``.
+
+    Entries are keyed on ``model_version``, which defaults to the endpoint's
+    resource name; deploy_model invalidates that name when it deploys.
+    """
+
+    def __init__(self, endpoint, cache, model_version=None):
+        self.endpoint = endpoint
+        self.cache = cache
+        self.model_version = model_version or getattr(endpoint, 'resource_name', None)
+        self.resource_name = getattr(endpoint, 'resource_name', None)
+
+    def predict(self, instances, parameters=None, timeout=None):
+        """Return a Prediction for ``instances``, calling the endpoint for misses only."""
+        keys = [self.cache.key(self.model_version, instance) for instance in instances]
+        predictions = self.cache.get_many(keys)
+
+        # Repeats within one request are sent once
+        missing = OrderedDict()
+        for index, (key, prediction) in enumerate(zip(keys, predictions)):
+            if prediction is None:
+                missing.setdefault(key, []).append(index)
+        deployed_model_id = None
+        if missing:
+            batch = [instances[indices[0]] for indices in missing.values()]
+            generation = self.cache.generation
+            start = time.perf_counter()
+            if parameters is None and timeout is None:
+                response = self.endpoint.predict(instances=batch)
+            else:
+                response = self.endpoint.predict(instances=batch, parameters=parameters, timeout=timeout)
+            self.cache.record_endpoint_call(time.perf_counter() - start)
+            metrics.counter('predict_instances_total', "Instances sent for prediction").inc(len(batch))
+            fetched = list(getattr(response, 'predictions', response))
+            if len(fetched) != len(batch):
+                raise RuntimeError(f"Endpoint returned {len(fetched)} predictions for {len(batch)} instances")
+            deployed_model_id = getattr(response, 'deployed_model_id', None)
+            self.cache.put_many(zip(missing, fetched), generation)
+            for indices, prediction in zip(missing.values(), fetched):
+                for index in indices:
+                    predictions[index] = prediction
+        return Prediction(predictions=predictions, deployed_model_id=deployed_model_id)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    """Return the process-wide PredictionCache, creating it on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PredictionCache()
+        return _default_cache
+
+
+def set_prediction_cache(cache):
+    """Replace the process-wide PredictionCache, e.g. with different bounds."""
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
@@ -0,0 +1,218 @@
+"""
+Vectorized, reproducible synthetic data generation from class-conditional Gaussians.
+
+A model is fitted once per class (mean and Cholesky factor of the covariance).
+Sampling then draws a whole chunk at a time: one standard-normal block per
+chunk and one matrix product per class. Large datasets are produced as a
+stream of independent chunks:
+
+- Exact class counts are fixed for the whole dataset up front and split
+  across chunks. Every class count and the total therefore match the request
+  exactly, whatever the chunk size.
+- Each chunk has its own seed, spawned from one ``random_state`` with
+  numpy's SeedSequence. The output is identical with any number of worker
+  processes.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+def fit_class_gaussians(X, y):
+    """
+    Fit a multivariate Gaussian per class.
+
+    Args:
+        X (np.ndarray): ``(n_samples, n_features)`` feature matrix
+        y (np.ndarray): Class label per row
+
+    Returns:
+        dict: ``classes``, ``means`` (k, d), ``cholesky`` (k, d, d) and the
+            empirical class ``priors``
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    classes, counts = np.unique(y, return_counts=True)
+    means = np.empty((len(classes), X.shape[1]))
+    factors = np.empty((len(classes), X.shape[1], X.shape[1]))
+    for index, label in enumerate(classes):
+        samples = X[y == label]
+        means[index] = samples.mean(axis=0)
+        factors[index] = _covariance_factor(np.cov(samples, rowvar=False))
+    return {
+        'classes': classes,
+        'means': means,
+        'cholesky': factors,
+        'priors': counts / counts.sum()
+    }
+
+
+def _covariance_factor(cov):
+    """Return L with L @ L.T == cov, tolerating singular (PSD) covariances."""
+    cov = np.atleast_2d(cov)
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh(cov)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
+def allocate_counts(n_samples, priors):
+    """
+    Split ``n_samples`` into exact integer class counts proportional to ``priors``.
+
+    Uses the largest-remainder method, so the counts always sum to
+    ``n_samples`` and no class is off by more than one from its quota.
+
+    Args:
+        n_samples (int): Total number of rows
+        priors (array-like): Non-negative class weights (normalized here)
+
+    Returns:
+        np.ndarray: Count per class
+    """
+    priors = np.asarray(priors, dtype=np.float64)
+    if priors.ndim != 1 or (priors < 0).any() or priors.sum() <= 0:
+        raise ValueError(f"Invalid class priors: {priors}")
+    quotas = n_samples * priors / priors.sum()
+    counts = np.floor(quotas).astype(np.int64)
+    remainder = n_samples - counts.sum()
+    # Ties go to the lower class index, so the result is deterministic
+    order = np.argsort(-(quotas - counts), kind='stable')
+    counts[order[:remainder]] += 1
+    return counts
+
+
+def chunk_class_counts(class_counts, chunksize, seed_sequence):
+    """
+    Split whole-dataset class counts into per-chunk counts.
+
+    Chunk compositions are drawn without replacement (multivariate
+    hypergeometric), so each chunk is a random slice of the dataset and the
+    per-class totals are exact.
+
+    Returns:
+        list: One count array per chunk of ``chunksize`` rows (the last may be shorter)
+    """
+    rng = np.random.default_rng(seed_sequence)
+    remaining = np.asarray(class_counts, dtype=np.int64).copy()
+    chunks = []
+    while remaining.sum() > 0:
+        size = min(chunksize, int(remaining.sum()))
+        counts = rng.multivariate_hypergeometric(remaining, size)
+        remaining -= counts
+        chunks.append(counts)
+    return chunks
+
+
+def sample_chunk(model, counts, seed_sequence, dtype=np.float64):
+    """
+    Draw one shuffled chunk with exactly ``counts[i]`` rows of class ``i``.
+
+    Args:
+        model (dict): Output of fit_class_gaussians
+        counts (array-like): Rows per class
+        seed_sequence (np.random.SeedSequence): Seed for this chunk
+        dtype: Floating dtype of the features
+
+    Returns:
+        tuple: ``(X, y)`` arrays
+    """
+    rng = np.random.default_rng(seed_sequence)
+    counts = np.asarray(counts)
+    n_rows = int(counts.sum())
+    n_features = model['means'].shape[1]
+
+    X = rng.standard_normal((n_rows, n_features)).astype(dtype, copy=False)
+    labels = np.repeat(np.arange(len(counts)), counts)
+    start = 0
+    for index, count in enumerate(counts):
+        block = X[start:start + count]
+        # One matrix product per class: x = mean + L z
+        np.matmul(block, model['cholesky'][index].T.astype(dtype), out=block)
+        block += model['means'][index].astype(dtype)
+        start += count
+
+    # np.take is several times faster than fancy indexing for a row gather
+    order = rng.permutation(n_rows)
+    return np.take(X, order, axis=0), np.take(model['classes'], np.take(labels, order))
+
+
+def _sample_chunk_task(args):
+    return sample_chunk(*args)
+
+
+def iter_synthetic_chunks(
+    model,
+    n_samples,
+    priors=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+    random_state=None,
+    n_jobs=1,
+    dtype=np.float64
+):
+    """
+    Generate ``n_samples`` rows as a stream of ``(X, y)`` chunks, in order.
+
+    Args:
+        model (dict): Output of fit_class_gaussians
+        n_samples (int): Total number of rows
+        priors (array-like, optional): Class weights; defaults to equal weights
+        chunksize (int): Rows per chunk
+        random_state (int, optional): Seed; None draws fresh entropy
+        n_jobs (int): Worker processes; chunks are the same for any value
+        dtype: Floating dtype of the features
+
+    Yields:
+        tuple: ``(X, y)`` arrays of at most ``chunksize`` rows
+    """
+    if priors is None:
+        priors = np.ones(len(model['classes']))
+    root = np.random.SeedSequence(random_state)
+    counts_seed, chunks_seed = root.spawn(2)
+    per_chunk = chunk_class_counts(allocate_counts(n_samples, priors), chunksize, counts_seed)
+    tasks = [
+        (model, counts, seed, dtype)
+        for counts, seed in zip(per_chunk, chunks_seed.spawn(len(per_chunk)))
+    ]
+
+    if n_jobs == 1:
+        for task in tasks:
+            yield _sample_chunk_task(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        # At most two chunks per worker are held, so memory stays bounded
+        pending = deque()
+        for task in tasks:
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+            pending.append(executor.submit(_sample_chunk_task, task))
+        while pending:
+            yield pending.popleft().result()
+
+
+def generate_synthetic_data(X, y, n_synthetic=1000, priors=None, random_state=None):
+    """
+    Generate synthetic data points based on the original data, in memory.
+
+    Args:
+        X (np.ndarray): Original features
+        y (np.ndarray): Original labels
+        n_synthetic (int): Exact number of rows to generate
+        priors (array-like, optional): Class weights; defaults to equal weights
+        random_state (int, optional): Seed for reproducible output
+
+    Returns:
+        tuple: ``(X_synthetic, y_synthetic)``
+    """
+    model = fit_class_gaussians(X, y)
+    chunks = list(iter_synthetic_chunks(
+        model, n_synthetic, priors=priors, chunksize=max(n_synthetic, 1), random_state=random_state
+    ))
+    if not chunks:
+        return np.empty((0, X.shape[1])), np.empty(0, dtype=model['classes'].dtype)
+    return chunks[0]
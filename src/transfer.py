@@ -0,0 +1,259 @@
+"""
+Parallel, resumable uploads to Google Cloud Storage.
+
+Large files are split into slices that are uploaded concurrently as temporary
+part objects and then composed into the destination object. Committed parts
+are recorded in a local state file, so an interrupted upload resumes from the
+parts that already made it instead of starting over. One storage client is
+shared by every upload in the process.
+"""
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from src import metrics
+from src.utils import ensure_directory_exists
+
+DEFAULT_PART_SIZE = 32 * 1024 * 1024
+DEFAULT_COMPOSITE_THRESHOLD = 64 * 1024 * 1024
+DEFAULT_STATE_DIR = '.transfer_state'
+
+# GCS accepts at most 32 source objects per compose request
+MAX_COMPOSE_SOURCES = 32
+
+TransferProgress = namedtuple(
+    'TransferProgress', ['bytes_transferred', 'total_bytes', 'elapsed', 'bytes_per_second']
+)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_storage_client():
+    """Return the process-wide storage client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from google.cloud import storage
+            _client = storage.Client()
+        return _client
+
+
+def set_storage_client(client):
+    """Replace the shared storage client, e.g. with a FakeStorageClient in tests."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def get_bucket(bucket_name=None):
+    """Return a bucket handle from the shared client (defaults to GOOGLE_CLOUD_BUCKET)."""
+    return get_storage_client().bucket(bucket_name or os.getenv('GOOGLE_CLOUD_BUCKET'))
+
+
+class ProgressTracker:
+    """Thread-safe byte counter that reports progress to an optional callback."""
+
+    def __init__(self, total_bytes, callback=None):
+        self.total_bytes = total_bytes
+        self.callback = callback
+        self.bytes_transferred = 0
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, n_bytes):
+        with self._lock:
+            self.bytes_transferred += n_bytes
+            progress = self.snapshot()
+        if self.callback is not None:
+            self.callback(progress)
+
+    def snapshot(self):
+        elapsed = time.perf_counter() - self._start
+        rate = self.bytes_transferred / elapsed if elapsed > 0 else 0.0
+        return TransferProgress(self.bytes_transferred, self.total_bytes, elapsed, rate)
+
+
+def _state_path(state_dir, bucket_name, blob_name):
+    safe_name = f"{bucket_name}/{blob_name}".replace('/', '__')
+    return os.path.join(state_dir, f"{safe_name}.json")
+
+
+def _load_state(path, fingerprint):
+    """Return committed parts from a previous attempt at the same file, if any."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        state = json.load(f)
+    if state.get('fingerprint') != fingerprint:
+        return {}
+    return {int(index): name for index, name in state['parts'].items()}
+
+
+def _save_state(path, fingerprint, parts):
+    ensure_directory_exists(os.path.dirname(path))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'fingerprint': fingerprint, 'parts': parts}, f)
+    os.replace(tmp_path, path)
+
+
+def _upload_slice(bucket, local_path, part_name, offset, length):
+    """Upload ``length`` bytes of ``local_path`` starting at ``offset`` as one object."""
+    with open(local_path, 'rb') as f:
+        f.seek(offset)
+        bucket.blob(part_name).upload_from_file(f, rewind=False, size=length)
+
+
+def _compose(bucket, blob_name, part_names):
+    """Compose parts into ``blob_name``, in rounds of at most MAX_COMPOSE_SOURCES."""
+    intermediates = []
+    names = list(part_names)
+    level = 0
+    while len(names) > MAX_COMPOSE_SOURCES:
+        next_names = []
+        for group_index in range(0, len(names), MAX_COMPOSE_SOURCES):
+            group = names[group_index:group_index + MAX_COMPOSE_SOURCES]
+            name = f"{blob_name}.compose/{level}-{group_index // MAX_COMPOSE_SOURCES}"
+            bucket.blob(name).compose([bucket.blob(n) for n in group])
+            next_names.append(name)
+        intermediates.extend(next_names)
+        names = next_names
+        level += 1
+    bucket.blob(blob_name).compose([bucket.blob(n) for n in names])
+    return intermediates
+
+
+def upload_file(
+    local_path,
+    blob_name,
+    bucket=None,
+    part_size=DEFAULT_PART_SIZE,
+    composite_threshold=DEFAULT_COMPOSITE_THRESHOLD,
+    max_workers=8,
+    progress_callback=None,
+    state_dir=DEFAULT_STATE_DIR,
+    _tracker=None
+):
+    """
+    Upload one file, using a parallel composite upload for large files.
+
+    Args:
+        local_path (str): File to upload
+        blob_name (str): Destination object name
+        bucket: Bucket handle; defaults to GOOGLE_CLOUD_BUCKET on the shared client
+        part_size (int): Size of each uploaded slice in bytes
+        composite_threshold (int): Files smaller than this are uploaded in one request
+        max_workers (int): Number of slices uploaded concurrently
+        progress_callback (callable, optional): Called with a TransferProgress
+            after every completed slice
+        state_dir (str): Where resume state for interrupted uploads is kept
+
+    Returns:
+        str: GCS URI of the uploaded object
+    """
+    bucket = bucket or get_bucket()
+    size = os.path.getsize(local_path)
+    tracker = _tracker or ProgressTracker(size, progress_callback)
+    uri = f"gs://{bucket.name}/{blob_name}"
+
+    if size < composite_threshold:
+        bucket.blob(blob_name).upload_from_filename(local_path)
+        tracker.add(size)
+        return uri
+
+    stat = os.stat(local_path)
+    fingerprint = [size, stat.st_mtime_ns, part_size]
+    state_path = _state_path(state_dir, bucket.name, blob_name)
+    committed = _load_state(state_path, fingerprint)
+    # Parts recorded locally but missing remotely (e.g. cleaned up) are redone
+    committed = {i: name for i, name in committed.items() if bucket.blob(name).exists()}
+
+    offsets = list(range(0, size, part_size))
+    part_names = [f"{blob_name}.parts/{i:05d}" for i in range(len(offsets))]
+    state_lock = threading.Lock()
+
+    if committed:
+        metrics.counter('upload_parts_resumed_total', "Upload parts reused from an interrupted upload").inc(
+            len(committed)
+        )
+        tracker.add(sum(min(part_size, size - offsets[i]) for i in committed))
+
+    def upload_part(index):
+        length = min(part_size, size - offsets[index])
+        _upload_slice(bucket, local_path, part_names[index], offsets[index], length)
+        with state_lock:
+            committed[index] = part_names[index]
+            _save_state(state_path, fingerprint, committed)
+        tracker.add(length)
+
+    remaining = [i for i in range(len(offsets)) if i not in committed]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # list() re-raises the first failed part; committed parts stay recorded
+        list(executor.map(upload_part, remaining))
+
+    intermediates = _compose(bucket, blob_name, part_names)
+    for name in part_names + intermediates:
+        bucket.blob(name).delete()
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    return uri
+
+
+def upload_files(
+    files,
+    bucket=None,
+    max_concurrent_files=4,
+    progress_callback=None,
+    **upload_options
+):
+    """
+    Upload several files concurrently.
+
+    Args:
+        files (list): ``(local_path, blob_name)`` pairs
+        bucket: Bucket handle; defaults to GOOGLE_CLOUD_BUCKET on the shared client
+        max_concurrent_files (int): Number of files uploaded at the same time
+        progress_callback (callable, optional): Called with a TransferProgress
+            covering all files
+        **upload_options: Passed to ``upload_file``
+
+    Returns:
+        list: GCS URIs, in the order of ``files``
+    """
+    bucket = bucket or get_bucket()
+    files = list(files)
+    tracker = ProgressTracker(
+        sum(os.path.getsize(path) for path, _ in files), progress_callback
+    )
+    with ThreadPoolExecutor(max_workers=max_concurrent_files) as executor:
+        futures = [
+            executor.submit(upload_file, path, name, bucket=bucket, _tracker=tracker, **upload_options)
+            for path, name in files
+        ]
+        return [future.result() for future in futures]
+
+
+def upload_directory(local_dir, prefix='', bucket=None, **upload_options):
+    """
+    Upload every file under a directory, keeping relative paths.
+
+    Args:
+        local_dir (str): Directory to upload
+        prefix (str): Object name prefix, e.g. "datasets/iris"
+        bucket: Bucket handle; defaults to GOOGLE_CLOUD_BUCKET on the shared client
+        **upload_options: Passed to ``upload_files``
+
+    Returns:
+        list: GCS URIs of the uploaded files
+    """
+    files = []
+    for directory, _, filenames in os.walk(local_dir):
+        for filename in sorted(filenames):
+            path = os.path.join(directory, filename)
+            relative = os.path.relpath(path, local_dir).replace(os.sep, '/')
+            files.append((path, f"{prefix.rstrip('/')}/{relative}" if prefix else relative))
+    return upload_files(files, bucket=bucket, **upload_options)
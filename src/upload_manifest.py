@@ -0,0 +1,150 @@
+"""
+Local manifest of uploaded files, used to skip re-uploading unchanged data.
+
+Each entry maps a local file to the size, mtime and SHA-256 it had when it was
+last uploaded, and to the GCS URI it went to. A file whose size and mtime still
+match is assumed unchanged without being read; otherwise it is re-hashed, so
+touching a file without editing it does not trigger an upload either.
+
+The SHA-256 is also stored in the object's custom metadata, because composite
+objects (see src.transfer) have no MD5 hash to verify against.
+"""
+import os
+import json
+import threading
+
+from src.transfer import DEFAULT_STATE_DIR, upload_file
+from src.utils import compute_file_hash, ensure_directory_exists
+
+DEFAULT_MANIFEST_PATH = os.path.join(DEFAULT_STATE_DIR, 'upload_manifest.json')
+SHA256_METADATA_KEY = 'sha256'
+
+
+class UploadManifest:
+    """JSON file of ``local path -> {size, mtime_ns, sha256, uri}`` entries."""
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        """
+        Args:
+            path (str): Location of the manifest file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f)
+
+    @staticmethod
+    def _key(local_path):
+        return os.path.abspath(local_path)
+
+    def get(self, local_path):
+        """Return the recorded entry for a file, or None."""
+        return self._entries.get(self._key(local_path))
+
+    def record(self, local_path, sha256, uri, stat=None):
+        """Record that ``local_path`` with digest ``sha256`` is stored at ``uri``."""
+        stat = stat or os.stat(local_path)
+        with self._lock:
+            self._entries[self._key(local_path)] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': sha256,
+                'uri': uri
+            }
+            self._save()
+
+    def forget(self, local_path):
+        """Drop the entry for a file, forcing its next upload."""
+        with self._lock:
+            if self._entries.pop(self._key(local_path), None) is not None:
+                self._save()
+
+    def _save(self):
+        ensure_directory_exists(os.path.dirname(self.path) or '.')
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def current_hash(self, local_path, stat=None):
+        """
+        Return the file's SHA-256, reusing the recorded one if size and mtime match.
+
+        Args:
+            local_path (str): File to hash
+            stat (os.stat_result, optional): Already taken stat of the file
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        stat = stat or os.stat(local_path)
+        entry = self.get(local_path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+        return compute_file_hash(local_path)
+
+
+def remote_matches(bucket, blob_name, sha256):
+    """
+    Check whether the remote object exists and holds content with this SHA-256.
+
+    Args:
+        bucket: Bucket handle
+        blob_name (str): Object name
+        sha256 (str): Expected hex digest
+
+    Returns:
+        bool: True if the object's recorded checksum matches
+    """
+    blob = bucket.get_blob(blob_name)
+    if blob is None:
+        return False
+    return (blob.metadata or {}).get(SHA256_METADATA_KEY) == sha256
+
+
+def upload_if_changed(
+    local_path,
+    blob_name,
+    bucket,
+    manifest=None,
+    verify_remote=False,
+    force=False,
+    **upload_options
+):
+    """
+    Upload a file unless the manifest shows it is already stored unchanged.
+
+    Args:
+        local_path (str): File to upload
+        blob_name (str): Destination object name
+        bucket: Bucket handle
+        manifest (UploadManifest, optional): Defaults to DEFAULT_MANIFEST_PATH
+        verify_remote (bool): Also confirm the remote object's checksum before
+            skipping, e.g. in case it was overwritten or deleted
+        force (bool): Upload even if the file is unchanged
+        **upload_options: Passed to src.transfer.upload_file
+
+    Returns:
+        tuple: ``(uri, uploaded)`` where ``uploaded`` is False if skipped
+    """
+    manifest = manifest or UploadManifest()
+    uri = f"gs://{bucket.name}/{blob_name}"
+    stat = os.stat(local_path)
+    sha256 = manifest.current_hash(local_path, stat)
+
+    entry = manifest.get(local_path)
+    if not force and entry and entry['uri'] == uri and entry['sha256'] == sha256:
+        if not verify_remote or remote_matches(bucket, blob_name, sha256):
+            if entry['mtime_ns'] != stat.st_mtime_ns:
+                # Touched but not edited: refresh so the next check skips hashing
+                manifest.record(local_path, sha256, uri, stat)
+            return uri, False
+
+    upload_file(local_path, blob_name, bucket=bucket, **upload_options)
+    blob = bucket.blob(blob_name)
+    blob.metadata = {SHA256_METADATA_KEY: sha256}
+    blob.patch()
+    manifest.record(local_path, sha256, uri, stat)
+    return uri, True
@@ -2,20 +2,23 @@
 Utility functions for the cloud-based machine learning system.
 """
 import os
+import re
+import ast
+import csv
+import hashlib
 import logging
-from datetime import datetime
-
-def setup_logging(name):
-    """Set up logging configuration."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler(f'logs/{name}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-        ]
-    )
-    return logging.getLogger(name)
+from collections import namedtuple
+
+# Background, JSON-lines logging; see src.logging_config
+from src.logging_config import setup_logging, shutdown_logging
+
+# Mirrors the fields of aiplatform.models.Prediction that callers rely on, so
+# local and fake endpoints can return the same shape as a Vertex AI endpoint.
+Prediction = namedtuple('Prediction', ['predictions', 'deployed_model_id'])
+
+# Model artifacts are saved as models/<model_type>_<YYYYmmdd_HHMMSS>.pkl
+MODEL_TIMESTAMP_FORMAT = '%Y%m%d_%H%M%S'
+MODEL_FILENAME_PATTERN = re.compile(r'^(?P<model_type>.+)_(?P<timestamp>\d{8}_\d{6})\.pkl$')
 
 def ensure_directory_exists(directory):
     """Create directory if it doesn't exist."""
@@ -43,6 +46,20 @@ def validate_environment():
         )
     return True
 
+def load_feature_names(metadata_path='data/metadata.csv'):
+    """Read the ordered feature column names recorded in the dataset metadata."""
+    with open(metadata_path, newline='') as f:
+        row = next(csv.DictReader(f))
+    return ast.literal_eval(row['feature_names'])
+
+def compute_file_hash(path, algorithm='sha256', chunk_size=1 << 20):
+    """Return the hex digest of a file, reading it in fixed-size chunks."""
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def format_duration(seconds):
     """Format duration in seconds to human-readable format."""
     hours = seconds // 3600
@@ -57,7 +74,4 @@ def format_duration(seconds):
     if seconds > 0 or not parts:
         parts.append(f"{int(seconds)}s")
     
-    return " ".join(parts)
-
-# Create logs directory
-ensure_directory_exists('logs')
\ No newline at end of file
+    return " ".join(parts)
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""
+Single-pass validation of training data with a structured report.
+
+validate_frame walks each numeric column once, in cache-sized row blocks,
+reading the column's own array without copying the frame. Every check runs on
+the block while it is in cache: missing values, infinities and value ranges
+from an optional schema. Dtype and class-balance checks are made once per
+column. Every problem is reported, not just the first one found, and each
+carries counts and the first offending row numbers.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_BLOCK_SIZE = 1 << 16
+DEFAULT_MAX_EXAMPLES = 5
+
+
+class ValidationReport:
+    """
+    Outcome of validate_frame.
+
+    Attributes:
+        n_rows (int): Number of rows checked
+        columns (dict): Per-column stats: ``dtype``, ``nulls``, ``infs``,
+            ``below_min``, ``above_max`` and ``first_rows`` (check -> row numbers)
+        class_counts (dict): Rows per target class
+        errors (list): Human-readable description of every failed check
+    """
+
+    def __init__(self, n_rows, columns, class_counts, errors):
+        self.n_rows = n_rows
+        self.columns = columns
+        self.class_counts = class_counts
+        self.errors = errors
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def raise_for_errors(self):
+        """Raise ValueError listing every failed check, if there are any."""
+        if self.errors:
+            raise ValueError("; ".join(self.errors))
+
+    def to_dict(self):
+        return {
+            'ok': self.ok,
+            'n_rows': self.n_rows,
+            'columns': self.columns,
+            'class_counts': self.class_counts,
+            'errors': list(self.errors)
+        }
+
+    def __repr__(self):
+        return f"ValidationReport(n_rows={self.n_rows}, ok={self.ok}, errors={len(self.errors)})"
+
+
+def _first_rows(mask, start, limit):
+    """Row numbers of the first ``limit`` True entries of a block mask."""
+    return (np.flatnonzero(mask)[:limit] + start).tolist()
+
+
+def _check_numeric_column(values, bounds, row_offset, block_size, max_examples):
+    """Count non-finite and out-of-range values of one column in a single blocked pass."""
+    stats = {'nulls': 0, 'infs': 0, 'below_min': 0, 'above_max': 0}
+    first_rows = {key: [] for key in stats}
+    is_float = values.dtype.kind in 'fc'
+    low = bounds.get('min')
+    high = bounds.get('max')
+
+    for start in range(0, len(values), block_size):
+        block = values[start:start + block_size]
+        checks = []
+        finite = None
+        if is_float:
+            non_finite = ~np.isfinite(block)
+            if non_finite.any():
+                nan = np.isnan(block)
+                checks.append(('nulls', nan))
+                checks.append(('infs', non_finite & ~nan))
+                finite = ~non_finite
+        # Missing and infinite values are reported as such, not as out of range
+        if low is not None:
+            below = block < low
+            checks.append(('below_min', below if finite is None else below & finite))
+        if high is not None:
+            above = block > high
+            checks.append(('above_max', above if finite is None else above & finite))
+
+        for key, mask in checks:
+            count = int(np.count_nonzero(mask))
+            if count:
+                stats[key] += count
+                missing = max_examples - len(first_rows[key])
+                if missing > 0:
+                    first_rows[key].extend(_first_rows(mask, row_offset + start, missing))
+
+    stats['first_rows'] = {key: rows for key, rows in first_rows.items() if rows}
+    return stats
+
+
+def _class_counts(series, block_size):
+    """
+    Count rows per class without a full-column hash table.
+
+    Integer labels are counted with np.bincount; other labels with
+    value_counts over row blocks, so temporary memory stays per-block.
+    """
+    values = series.to_numpy()
+    if values.dtype.kind in 'iu' and len(values):
+        low, high = int(values.min()), int(values.max())
+        if high - low < 1 << 20:
+            # Blocked: bincount copies read-only (copy-on-write) arrays whole
+            counts = np.zeros(high - low + 1, dtype=np.int64)
+            for start in range(0, len(values), block_size):
+                block = values[start:start + block_size]
+                counts += np.bincount(block - low if low else block, minlength=len(counts))
+            return {label + low: int(count) for label, count in enumerate(counts) if count}
+
+    total = None
+    for start in range(0, len(series), block_size):
+        counts = series.iloc[start:start + block_size].value_counts(sort=False)
+        total = counts if total is None else total.add(counts, fill_value=0)
+    if total is None:
+        return {}
+    return {
+        (label.item() if hasattr(label, 'item') else label): int(count)
+        for label, count in total.items()
+    }
+
+
+def validate_frame(
+    df,
+    target_column='target',
+    schema=None,
+    min_class_fraction=None,
+    row_offset=0,
+    max_examples=DEFAULT_MAX_EXAMPLES,
+    block_size=DEFAULT_BLOCK_SIZE
+):
+    """
+    Validate a training frame and report every problem found.
+
+    Args:
+        df (pd.DataFrame): Features plus target column
+        target_column (str): Name of the label column; exempt from the numeric check
+        schema (dict, optional): ``{column: {'min': ..., 'max': ...}}`` value ranges
+        min_class_fraction (float, optional): Flag classes rarer than this share of rows
+        row_offset (int): Row number of the first row, for reporting chunks of a file
+        max_examples (int): Offending row numbers kept per check and column
+        block_size (int): Rows processed per block
+
+    Returns:
+        ValidationReport: Per-column counts, class counts and the list of errors
+    """
+    schema = schema or {}
+    columns = {}
+    errors = []
+
+    for column in df.columns:
+        series = df[column]
+        stats = {'dtype': str(series.dtype)}
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            # Extension arrays (nullable ints) fall back to a float view with NaN for NA
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan) \
+                if pd.api.types.is_extension_array_dtype(series.dtype) else series.to_numpy()
+            stats.update(_check_numeric_column(
+                values, schema.get(column, {}), row_offset, block_size, max_examples
+            ))
+        else:
+            null_mask = series.isna().to_numpy()
+            stats['nulls'] = int(np.count_nonzero(null_mask))
+            stats['first_rows'] = {'nulls': _first_rows(null_mask, row_offset, max_examples)} \
+                if stats['nulls'] else {}
+            if column != target_column:
+                stats['non_numeric'] = True
+        columns[column] = stats
+
+    null_columns = [c for c, s in columns.items() if s.get('nulls')]
+    if null_columns:
+        first = min(columns[c]['first_rows']['nulls'][0] for c in null_columns)
+        errors.append(f"Found null values in columns: {null_columns} (first at row {first})")
+
+    non_numeric = [c for c, s in columns.items() if s.get('non_numeric')]
+    if non_numeric:
+        errors.append(f"Found non-numeric features: {non_numeric}")
+
+    inf_columns = [c for c, s in columns.items() if s.get('infs')]
+    if inf_columns:
+        first = min(columns[c]['first_rows']['infs'][0] for c in inf_columns)
+        errors.append(f"Found infinite values in columns: {inf_columns} (first at row {first})")
+
+    for column, bounds in schema.items():
+        if column not in columns:
+            errors.append(f"Missing column required by schema: {column!r}")
+            continue
+        stats = columns[column]
+        for key, label, bound in (('below_min', 'below', 'min'), ('above_max', 'above', 'max')):
+            if stats.get(key):
+                errors.append(
+                    f"{stats[key]} values in {column!r} {label} {bounds[bound]} "
+                    f"(first at row {stats['first_rows'][key][0]})"
+                )
+
+    class_counts = {}
+    if target_column in df.columns:
+        class_counts = _class_counts(df[target_column], block_size)
+        if min_class_fraction is not None and len(df):
+            rare = [label for label, count in class_counts.items()
+                    if count / len(df) < min_class_fraction]
+            if rare:
+                errors.append(f"Classes below {min_class_fraction:.1%} of rows: {rare}")
+
+    return ValidationReport(len(df), columns, class_counts, errors)
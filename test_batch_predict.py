@@ -0,0 +1,67 @@
+import json
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from src import metrics
+from src.batch_predict import iter_chunks, predict_in_batches
+from src.fakes import FakeEndpoint
+
+def _rows(n_rows):
+    return np.column_stack([np.arange(n_rows), np.full(n_rows, 1.5)])
+
+def _row_id(instance):
+    return instance[0]
+
+def test_chunks_respect_instance_count_and_payload_size():
+    rows = _rows(25)
+    assert [len(chunk) for chunk in iter_chunks(rows, max_instances=10)] == [10, 10, 5]
+
+    chunks = list(iter_chunks(rows, max_payload_bytes=100))
+    assert all(len(json.dumps({'instances': chunk})) <= 100 for chunk in chunks)
+    assert len(chunks) == 5
+    assert [row for chunk in chunks for row in chunk] == rows.tolist()
+    with pytest.raises(ValueError):
+        list(iter_chunks(rows, max_payload_bytes=20))
+
+def test_output_stays_in_input_order_when_later_chunks_finish_first():
+    def slow_early_rows(instance):
+        # The first chunk takes longest, so chunks complete out of order
+        time.sleep(0.002 * max(0, 20 - instance[0]))
+        return instance[0]
+
+    endpoint = FakeEndpoint(predict_fn=slow_early_rows)
+    predictions = predict_in_batches(endpoint, _rows(100), max_instances=10, max_in_flight=4)
+    assert predictions.tolist() == list(range(100))
+    assert endpoint.calls == 10
+
+def test_only_the_failed_chunk_is_retried():
+    endpoint = FakeEndpoint(predict_fn=_row_id, failure_rate=0.3, seed=1)
+    predictions = predict_in_batches(endpoint, _rows(100), max_instances=10, max_in_flight=1, retry_backoff=0)
+    assert predictions.tolist() == list(range(100))
+    retries = endpoint.calls - 10
+    assert retries > 0
+    # Each retry resends one chunk of 10, not the whole input
+    assert endpoint.instances_seen == 100 + 10 * retries
+
+@pytest.mark.parametrize('encode', [False, True])
+def test_instances_are_counted_once_answered(encode):
+    df = pd.read_csv('data/raw/iris.csv').drop(columns='target').head(100)
+    metrics.enable()
+    try:
+        metrics.REGISTRY.reset()
+        endpoint = FakeEndpoint(failure_rate=0.3, seed=1)
+        predict_in_batches(endpoint, df, max_instances=10, max_in_flight=1, retry_backoff=0, encode=encode)
+        # Retried chunks are counted once
+        assert metrics.counter('predict_instances_total').value() == 100
+        assert metrics.counter('predict_retries_total').value() == endpoint.calls - 10 > 0
+
+        metrics.REGISTRY.reset()
+        endpoint = FakeEndpoint(failure_rate=0.3, seed=1)
+        with pytest.raises(ConnectionError):
+            predict_in_batches(endpoint, df, max_instances=10, max_in_flight=1, max_retries=0, encode=encode)
+        # The chunk that failed was never answered
+        assert metrics.counter('predict_instances_total').value() == 10 * (endpoint.calls - 1)
+    finally:
+        metrics.REGISTRY.reset()
+        metrics.disable()
@@ -0,0 +1,94 @@
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from src import batch_scoring
+from src.batch_scoring import score_file
+from src.local_predictor import find_model_artifact, LocalPredictor
+
+MODEL_PATH = find_model_artifact('models', 'random_forest')
+
+def _write_input(path, n_rows):
+    df = pd.read_csv('data/raw/iris.csv')
+    df = df.sample(n_rows, replace=True, random_state=0).reset_index(drop=True)
+    df.insert(0, 'id', np.arange(n_rows))
+    df.to_csv(path, index=False)
+    return df
+
+class FailingEndpoint:
+    """LocalPredictor-backed endpoint whose calls fail after ``fail_after`` succeed."""
+
+    def __init__(self, predictor, fail_after=None):
+        self.predictor = predictor
+        self.fail_after = fail_after
+        self.calls = 0
+        self.resource_name = 'projects/local/locations/local/endpoints/flaky'
+
+    def predict(self, instances, parameters=None, timeout=None):
+        if self.fail_after is not None and self.calls >= self.fail_after:
+            raise ConnectionError("endpoint went away")
+        self.calls += 1
+        return self.predictor.predict(instances)
+
+def test_worker_pool_output_is_in_input_order(tmp_path):
+    df = _write_input(tmp_path / 'input.csv', 1000)
+    result = score_file(str(tmp_path / 'input.csv'), str(tmp_path / 'scores.parquet'), model_path=MODEL_PATH,
+                        workers=2, chunksize=150, keep_columns=['id'], mmap=False)
+    assert (result.rows, result.chunks) == (1000, 7)
+    scores = pd.read_parquet(tmp_path / 'scores.parquet')
+    predictor = LocalPredictor(path=MODEL_PATH)
+    assert scores['id'].tolist() == df['id'].tolist()
+    np.testing.assert_allclose(scores.filter(like='score_').to_numpy(),
+                               predictor.predict_proba(df[predictor.feature_names]))
+    assert not (tmp_path / 'scores.parquet.parts').exists()
+
+def test_resume_scores_only_chunks_after_the_checkpoint(tmp_path):
+    _write_input(tmp_path / 'input.csv', 500)
+    predictor = LocalPredictor(path=MODEL_PATH)
+    output = str(tmp_path / 'scores.csv')
+    expected = str(tmp_path / 'expected.csv')
+    score_file(str(tmp_path / 'input.csv'), expected, endpoint=predictor, workers=1, chunksize=100)
+
+    flaky = FailingEndpoint(predictor, fail_after=3)
+    with pytest.raises(ConnectionError):
+        score_file(str(tmp_path / 'input.csv'), output, endpoint=flaky, workers=1, chunksize=100, max_retries=0)
+    flaky.fail_after = None
+    result = score_file(str(tmp_path / 'input.csv'), output, endpoint=flaky, workers=1, chunksize=100)
+    assert (result.resumed_chunks, result.chunks, result.rows) == (3, 2, 200)
+    assert open(output).read() == open(expected).read()
+
+def test_checkpoint_is_not_reused_once_the_model_changes(tmp_path, monkeypatch):
+    _write_input(tmp_path / 'input.csv', 500)
+    model_path = str(tmp_path / 'model.pkl')
+    shutil.copy(MODEL_PATH, model_path)
+    write_part = batch_scoring._write_part
+
+    def crash_on_fourth_part(frame, part_path):
+        if part_path.endswith('part-000003.csv'):
+            raise RuntimeError("worker killed")
+        return write_part(frame, part_path)
+
+    monkeypatch.setattr(batch_scoring, '_write_part', crash_on_fourth_part)
+    with pytest.raises(RuntimeError):
+        score_file(str(tmp_path / 'input.csv'), str(tmp_path / 'scores.csv'), model_path=model_path,
+                   workers=1, chunksize=100, mmap=False)
+    monkeypatch.undo()
+
+    # Retrained in place: same path, new contents
+    shutil.copy(find_model_artifact('models', 'svm'), model_path)
+    result = score_file(str(tmp_path / 'input.csv'), str(tmp_path / 'scores.csv'), model_path=model_path,
+                        workers=1, chunksize=100, mmap=False)
+    assert (result.resumed_chunks, result.chunks) == (0, 5)
+
+def test_empty_input_replaces_the_output_with_an_empty_one(tmp_path):
+    df = _write_input(tmp_path / 'input.csv', 20)
+    output = str(tmp_path / 'scores.parquet')
+    score_file(str(tmp_path / 'input.csv'), output, model_path=MODEL_PATH, workers=1, keep_columns=['id'], mmap=False)
+    df.iloc[:0].to_csv(tmp_path / 'input.csv', index=False)
+
+    result = score_file(str(tmp_path / 'input.csv'), output, model_path=MODEL_PATH, workers=1,
+                        keep_columns=['id'], mmap=False)
+    scores = pd.read_parquet(output)
+    assert result.rows == 0 and len(scores) == 0
+    classes = LocalPredictor(path=MODEL_PATH).classes
+    assert list(scores.columns) == ['id', 'predicted_class'] + [f'score_{label}' for label in classes]
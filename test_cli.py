@@ -0,0 +1,28 @@
+import json
+import subprocess
+import sys
+
+# Not google.cloud itself: site imports that namespace package at start-up
+HEAVY_MODULES = ['numpy', 'pandas', 'sklearn', 'pyarrow', 'google.cloud.aiplatform', 'google.cloud.storage',
+                 'dotenv', 'src.cloud_utils']
+
+# Modules loaded by `python -m src <argv>`, as seen at interpreter exit
+PROBE = (
+    "import atexit, json, runpy, sys\n"
+    "atexit.register(lambda: print(json.dumps(sorted(sys.modules))))\n"
+    "sys.argv = ['src'] + {argv!r}\n"
+    "runpy.run_module('src', run_name='__main__')\n"
+)
+
+def _modules_loaded(argv):
+    result = subprocess.run([sys.executable, '-c', PROBE.format(argv=argv)], capture_output=True, text=True)
+    # Bare `python -m src` prints the help and exits with 2
+    assert result.returncode in (0, 2), result.stderr
+    return result.stdout, json.loads(result.stdout.splitlines()[-1])
+
+def test_help_imports_no_heavy_modules():
+    for argv in ([], ['--help'], ['score', '--help'], ['loadtest', '--help']):
+        output, modules = _modules_loaded(argv)
+        assert 'usage: python -m src' in output
+        assert [name for name in modules
+                if any(name == heavy or name.startswith(f'{heavy}.') for heavy in HEAVY_MODULES)] == []
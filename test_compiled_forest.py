@@ -0,0 +1,57 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from src.compiled_forest import compile_forest, CompiledForest
+from src.local_predictor import list_model_artifacts, load_model_artifact
+
+RANDOM_FOREST_PATHS = [path for _, _, path in list_model_artifacts('models', 'random_forest')]
+
+def load_forest(path):
+    with warnings.catch_warnings():
+        # The artifacts were pickled with an older scikit-learn release
+        warnings.simplefilter('ignore')
+        return load_model_artifact(path)['model']
+
+def evaluation_rows():
+    """Dataset rows, rounded copies (which land on split thresholds) and random points."""
+    raw = pd.read_csv('data/raw/iris.csv').drop('target', axis=1).to_numpy()
+    rng = np.random.default_rng(0)
+    random_rows = rng.uniform([3.0, 1.5, 0.5, 0.0], [9.0, 5.0, 8.0, 3.0], size=(20000, 4))
+    return np.vstack([raw, np.round(raw, 1), random_rows])
+
+def model_input(model, X):
+    if getattr(model, 'feature_names_in_', None) is not None:
+        return pd.DataFrame(X, columns=model.feature_names_in_)
+    return X
+
+@pytest.mark.parametrize('path', RANDOM_FOREST_PATHS)
+def test_compiled_forest_is_bit_identical(path):
+    model = load_forest(path)
+    compiled = compile_forest(model)
+    X = evaluation_rows()
+    
+    assert np.array_equal(compiled.predict_proba(X), model.predict_proba(model_input(model, X)))
+    assert np.array_equal(compiled.predict(X), model.predict(model_input(model, X)))
+
+def test_level_and_leaf_mask_traversals_agree():
+    compiled = compile_forest(load_forest(RANDOM_FOREST_PATHS[-1]))
+    X = evaluation_rows().astype(np.float32)
+    
+    assert compiled._leaf_masks is not None
+    assert np.array_equal(compiled._apply_levels(X), compiled._apply_leaf_masks(X))
+
+def test_compiled_forest_round_trips_through_memory_map(tmp_path):
+    model = load_forest(RANDOM_FOREST_PATHS[-1])
+    compiled = compile_forest(model)
+    compiled.save(tmp_path / 'forest')
+    loaded = CompiledForest.load(tmp_path / 'forest', mmap_mode='r')
+    X = evaluation_rows()
+    
+    assert np.array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
+
+def test_compiled_forest_rejects_non_finite_input():
+    compiled = compile_forest(load_forest(RANDOM_FOREST_PATHS[-1]))
+    
+    with pytest.raises(ValueError):
+        compiled.predict_proba(np.array([[5.0, 3.0, np.nan, 0.2]]))
@@ -0,0 +1,54 @@
+import os
+import pandas as pd
+import pytest
+from src.data_format import as_csv, convert_dataset, dataset_schema, find_dataset, iter_dataset, read_dataset
+
+IRIS_PATH = 'data/raw/iris.csv'
+
+def test_parquet_and_csv_round_trip_exactly(tmp_path):
+    original = read_dataset(IRIS_PATH, schema=dataset_schema())
+    parquet_path = convert_dataset(IRIS_PATH, str(tmp_path / 'iris.parquet'), chunksize=7, schema=dataset_schema())
+    csv_path = convert_dataset(parquet_path, str(tmp_path / 'iris.csv.gz'), chunksize=50)
+    back = convert_dataset(csv_path, str(tmp_path / 'back.parquet'))
+
+    for path in (parquet_path, csv_path, back):
+        pd.testing.assert_frame_equal(read_dataset(path), original)
+    assert [len(chunk) for chunk in iter_dataset(parquet_path, chunksize=400)] == [400, 400, 400]
+    assert list(read_dataset(csv_path, columns=['target', 'sepal length (cm)']).columns) == \
+        ['target', 'sepal length (cm)']
+    assert find_dataset(str(tmp_path), 'iris') == parquet_path
+    with pytest.raises(ValueError):
+        read_dataset(str(tmp_path / 'iris.json'))
+
+def test_as_csv_converts_into_a_cache_keyed_on_the_source_bytes(tmp_path):
+    parquet_path = convert_dataset(IRIS_PATH, str(tmp_path / 'train.parquet'))
+    # A CSV output of the pipeline next to the Parquet one is left alone
+    (tmp_path / 'train.csv').write_text("pipeline output\n")
+    assert as_csv(IRIS_PATH) == IRIS_PATH
+
+    csv_path = as_csv(parquet_path)
+    assert os.path.basename(csv_path) == 'train.csv' and csv_path.startswith(str(tmp_path / '.cache' / 'csv'))
+    assert (tmp_path / 'train.csv').read_text() == "pipeline output\n"
+    pd.testing.assert_frame_equal(read_dataset(csv_path), read_dataset(parquet_path))
+    mtime = os.stat(csv_path).st_mtime_ns
+    assert as_csv(parquet_path) == csv_path and os.stat(csv_path).st_mtime_ns == mtime
+
+    # New bytes with the old mtime are still noticed, and the old conversion removed
+    stat = os.stat(parquet_path)
+    changed = read_dataset(parquet_path).head(10)
+    changed.to_parquet(parquet_path, index=False)
+    os.utime(parquet_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    new_csv_path = as_csv(parquet_path)
+    pd.testing.assert_frame_equal(read_dataset(new_csv_path), changed)
+    assert not os.path.exists(csv_path)
+    assert len(os.listdir(tmp_path / '.cache' / 'csv')) == 1
+
+def test_find_dataset_returns_the_newest_format(tmp_path):
+    parquet_path = convert_dataset(IRIS_PATH, str(tmp_path / 'train.parquet'))
+    assert find_dataset(str(tmp_path), 'train') == parquet_path
+    csv_path = convert_dataset(IRIS_PATH, str(tmp_path / 'train.csv'))
+    os.utime(parquet_path, ns=(0, os.stat(csv_path).st_mtime_ns - 10**9))
+    assert find_dataset(str(tmp_path), 'train') == csv_path
+    assert find_dataset(str(tmp_path), 'train', fmt='parquet') == parquet_path
+    with pytest.raises(FileNotFoundError):
+        find_dataset(str(tmp_path), 'test')
@@ -0,0 +1,62 @@
+import threading
+from src.dataset_cache import DatasetCache, source_fingerprint
+from src.fakes import FakeDatasetBackend, FakeStorageClient
+from src.transfer import set_storage_client
+from src.upload_manifest import UploadManifest, upload_if_changed
+
+def test_same_content_reuses_dataset_and_changed_content_recreates(tmp_path):
+    source = tmp_path / 'train.csv'
+    source.write_text("a,target\n1,0\n")
+    backend = FakeDatasetBackend()
+    cache_path = str(tmp_path / 'datasets.json')
+    
+    first = DatasetCache(cache_path, backend=backend).get_or_create(str(source), 'ds')
+    # A new cache instance (a later run) reads the entry back from disk
+    again = DatasetCache(cache_path, backend=backend).get_or_create(str(source), 'ds')
+    assert again.resource_name == first.resource_name
+    assert backend.created == 1
+    
+    source.write_text("a,target\n2,1\n")
+    cache = DatasetCache(cache_path, backend=backend)
+    changed = cache.get_or_create(str(source), 'ds')
+    assert changed.resource_name != first.resource_name
+    assert cache.stats == {'hits': 0, 'misses': 1, 'invalidated': 1}
+
+def test_deleted_dataset_is_recreated(tmp_path):
+    source = tmp_path / 'train.csv'
+    source.write_text("a,target\n1,0\n")
+    backend = FakeDatasetBackend()
+    cache = DatasetCache(None, backend=backend)
+    first = cache.get_or_create(str(source), 'ds')
+    backend.delete(first.resource_name)
+    assert cache.get_or_create(str(source), 'ds').resource_name != first.resource_name
+    assert backend.created == 2
+
+def test_concurrent_requests_create_one_dataset(tmp_path):
+    source = tmp_path / 'train.csv'
+    source.write_text("a,target\n1,0\n")
+    backend = FakeDatasetBackend(create_seconds=0.1)
+    cache = DatasetCache(None, backend=backend)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_create(str(source), 'ds')))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert backend.created == 1
+    assert len({dataset.resource_name for dataset in results}) == 1
+
+def test_gcs_fingerprint_uses_uploaded_checksum(tmp_path):
+    set_storage_client(FakeStorageClient(str(tmp_path / 'gcs')))
+    try:
+        source = tmp_path / 'train.csv'
+        source.write_text("a,target\n1,0\n")
+        bucket = FakeStorageClient(str(tmp_path / 'gcs')).bucket('bucket')
+        manifest = UploadManifest(str(tmp_path / 'manifest.json'))
+        uri, _ = upload_if_changed(str(source), 'train.csv', bucket, manifest=manifest)
+        assert source_fingerprint(uri) == source_fingerprint(str(source))
+    finally:
+        set_storage_client(None)
@@ -0,0 +1,44 @@
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from src.batch_predict import predict_in_batches
+from src.encoding import encode_instances, iter_payloads
+from src.fakes import FakeEndpoint
+from src.utils import load_feature_names
+
+def _frame(n_rows):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(n_rows, 4)), columns=load_feature_names())
+    df['target'] = 1
+    return df
+
+def test_bodies_decode_to_the_records_within_size_limits():
+    df = _frame(3000)
+    df.iloc[5, 1] = np.nan
+    expected = [
+        {name: (None if value != value else value) for name, value in row.items()}
+        for row in df.drop(columns='target').to_dict('records')
+    ]
+    for data in (df, pa.Table.from_pandas(df), [df.iloc[:1234], df.iloc[1234:]]):
+        payloads = list(iter_payloads(data, max_instances=500, max_payload_bytes=40_000))
+        assert all(len(body) <= 40_000 and n <= 500 for body, n in payloads)
+        assert [row for body, _ in payloads for row in json.loads(body)['instances']] == expected
+
+def test_strings_booleans_and_array_format():
+    df = pd.DataFrame({'name': ['a"b', None], 'flag': [True, False], 'count': [1, 2]})
+    assert json.loads(encode_instances(df, columns=['name', 'flag', 'count'])) == {
+        'instances': [{'name': 'a"b', 'flag': True, 'count': 1}, {'name': None, 'flag': False, 'count': 2}]
+    }
+    assert json.loads(encode_instances(df, columns=['count', 'flag'], instance_format='array')) == {
+        'instances': [[1, True], [2, False]]
+    }
+
+def test_encoded_batches_match_dict_batches():
+    df = _frame(2500).drop(columns='target')
+    df['petal length (cm)'] = np.linspace(1, 7, len(df))
+    endpoint = FakeEndpoint()
+    encoded = predict_in_batches(endpoint, df, encode=True)
+    assert endpoint.raw_bytes > 0
+    plain = predict_in_batches(FakeEndpoint(), df)
+    np.testing.assert_array_equal(encoded['scores'], plain['scores'])
@@ -0,0 +1,52 @@
+import asyncio
+from src.fakes import FakeEndpoint, iris_rule_prediction
+from src.gateway import PredictionGateway
+
+def _instance(i):
+    return [5.0, 3.0, 1.0 + i / 10, 0.5]
+
+async def _predict_concurrently(gateway, requests):
+    return await asyncio.gather(*(gateway.predict(instances) for instances in requests))
+
+def test_concurrent_callers_share_one_endpoint_call():
+    endpoint = FakeEndpoint()
+    requests = [[_instance(i)] for i in range(20)] + [[_instance(20), _instance(21)]]
+
+    async def run():
+        async with PredictionGateway(endpoint, window_ms=20) as gateway:
+            return await _predict_concurrently(gateway, requests)
+
+    results = asyncio.run(run())
+    assert results == [[iris_rule_prediction(instance) for instance in instances] for instances in requests]
+    assert (endpoint.calls, endpoint.instances_seen) == (1, 22)
+
+def test_full_batches_are_sent_without_waiting_for_the_window():
+    endpoint = FakeEndpoint()
+
+    async def run():
+        async with PredictionGateway(endpoint, window_ms=10_000, max_batch_size=10) as gateway:
+            return await asyncio.wait_for(gateway.predict([_instance(i) for i in range(30)]), timeout=5)
+
+    assert len(asyncio.run(run())) == 30
+    assert endpoint.calls == 3
+
+def test_identical_instances_queued_or_in_flight_are_sent_once():
+    endpoint = FakeEndpoint(latency=0.1)
+
+    async def run(deduplicate):
+        async with PredictionGateway(endpoint, window_ms=5, deduplicate=deduplicate) as gateway:
+            first = asyncio.ensure_future(gateway.predict([_instance(0), _instance(0)]))
+            # Let the first batch reach the endpoint, then ask again while it is in flight
+            await asyncio.sleep(0.05)
+            second = await gateway.predict([_instance(0), _instance(1)])
+            return await first, second, gateway.stats
+
+    first, second, stats = asyncio.run(run(deduplicate=True))
+    assert first == [iris_rule_prediction(_instance(0))] * 2
+    assert second == [iris_rule_prediction(_instance(0)), iris_rule_prediction(_instance(1))]
+    assert stats['deduplicated'] == 2
+    assert (endpoint.calls, endpoint.instances_seen) == (2, 2)
+
+    endpoint = FakeEndpoint(latency=0.1)
+    asyncio.run(run(deduplicate=False))
+    assert (endpoint.calls, endpoint.instances_seen) == (2, 4)
@@ -0,0 +1,42 @@
+import numpy as np
+from src.data_format import find_dataset, read_dataset
+from src.hyperparam_search import SharedArrays, rung_sizes, run_search, sample_configs, successive_halving
+from src.model_registry import ModelRegistry
+
+def _iris():
+    return read_dataset(find_dataset("data/cloud", "training_data")), read_dataset(find_dataset("data/cloud", "test_data"))
+
+def test_halving_drops_configs_and_ends_on_full_data():
+    assert rung_sizes(810, 30, 3) == [30, 90, 270, 810]
+    rng = np.random.default_rng(0)
+    arrays = {
+        'X_train': rng.normal(size=(90, 3)), 'y_train': np.tile([0, 1, 2], 30),
+        'X_val': rng.normal(size=(30, 3)), 'y_val': np.tile([0, 1, 2], 10)
+    }
+    configs = sample_configs(['svm'], 9, random_state=0)
+    trials = successive_halving(configs, arrays, min_rows=10, eta=3)
+    assert [t.n_rows for t in trials] == [10] * 9 + [30] * 3 + [90]
+
+def test_shared_arrays_round_trip():
+    data = {'X': np.arange(12.0).reshape(4, 3), 'y': np.array([0, 1, 0, 1])}
+    with SharedArrays(data) as shared:
+        views, blocks = SharedArrays.attach(shared.descriptors)
+        np.testing.assert_array_equal(views['X'], data['X'])
+        np.testing.assert_array_equal(views['y'], data['y'])
+        del views
+        for block in blocks:
+            block.close()
+
+def test_pooled_search_matches_serial_and_registers_best(tmp_path):
+    train, test = _iris()
+    kwargs = dict(n_configs=6, min_rows=30, random_state=0)
+    serial = run_search(train, test, **kwargs)
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    pooled = run_search(train, test, n_jobs=2, registry=registry, dataset_hash='abc', **kwargs)
+    assert [(t.config_id, t.score) for t in pooled['trials']] == [(t.config_id, t.score) for t in serial['trials']]
+    
+    entry = registry.get(pooled['version_id'])
+    assert entry['algorithm'] == pooled['best'].model_type
+    assert entry['metrics']['accuracy'] == pooled['metrics']['accuracy']
+    assert entry['dataset_hash'] == 'abc'
+    assert registry.load(pooled['version_id'])['model'].predict(test.drop(columns='target').to_numpy()).shape == (len(test),)
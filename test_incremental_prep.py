@@ -0,0 +1,52 @@
+import os
+import numpy as np
+import pandas as pd
+from prepare_cloud_data import prepare_data
+from src.utils import load_feature_names
+
+def _write_rows(path, n_rows, seed, mode='w'):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.uniform(1.0, 6.0, size=(n_rows, 4)).round(3), columns=load_feature_names())
+    df['target'] = rng.integers(0, 3, size=n_rows)
+    df.to_csv(path, mode=mode, header=mode == 'w', index=False)
+
+def _outputs(output_dir):
+    return [open(os.path.join(output_dir, name), 'rb').read() for name in ('training_data.csv', 'test_data.csv')]
+
+def _full_rerun(input_path, output_dir):
+    prepare_data(input_path, str(output_dir), chunksize=70, output_format='csv')
+    return _outputs(output_dir)
+
+def test_appended_rows_match_a_full_rerun(tmp_path):
+    input_path = str(tmp_path / 'raw.csv')
+    _write_rows(input_path, 300, seed=0)
+    first = prepare_data(input_path, str(tmp_path / 'out'), chunksize=100, output_format='csv', incremental=True)
+    assert first['rows_processed'] == 300
+    before = _outputs(tmp_path / 'out')
+
+    _write_rows(input_path, 120, seed=1, mode='a')
+    summary = prepare_data(input_path, str(tmp_path / 'out'), chunksize=100, output_format='csv', incremental=True)
+    after = _outputs(tmp_path / 'out')
+    assert summary == {'chunks_reused': 3, 'chunks_processed': 2, 'rows_reused': 300, 'rows_processed': 120}
+    # Existing rows keep their split, so the old outputs are prefixes of the new ones
+    assert all(new.startswith(old) for old, new in zip(before, after))
+    assert after == _full_rerun(input_path, tmp_path / 'full')
+
+    unchanged = prepare_data(input_path, str(tmp_path / 'out'), chunksize=100, output_format='csv', incremental=True)
+    assert unchanged['rows_processed'] == 0 and _outputs(tmp_path / 'out') == after
+
+def test_changed_chunk_and_interrupted_output_are_redone(tmp_path):
+    input_path = str(tmp_path / 'raw.csv')
+    _write_rows(input_path, 400, seed=0)
+    prepare_data(input_path, str(tmp_path / 'out'), chunksize=100, output_format='csv', incremental=True)
+
+    lines = open(input_path).read().splitlines(keepends=True)
+    lines[250] = lines[250].replace(',', ',1', 1)
+    open(input_path, 'w').writelines(lines)
+    # Rows a crashed run appended after its last saved chunk
+    with open(tmp_path / 'out' / 'training_data.csv', 'a') as f:
+        f.write('9.9,9.9,9.9,9.9,0\n')
+
+    summary = prepare_data(input_path, str(tmp_path / 'out'), chunksize=100, output_format='csv', incremental=True)
+    assert summary['rows_reused'] == 200 and summary['rows_processed'] == 200
+    assert _outputs(tmp_path / 'out') == _full_rerun(input_path, tmp_path / 'full')
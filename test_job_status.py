@@ -0,0 +1,30 @@
+from src.job_status import JobStatusCache, fetch_job_records
+
+class StubJob:
+    """Job whose ``to_dict()`` returns whatever ``info`` currently holds."""
+
+    def __init__(self, name, **info):
+        self.resource_name = name
+        self.info = dict(name=name, displayName=name.rsplit('/', 1)[-1], **info)
+        self.calls = 0
+
+    def to_dict(self):
+        self.calls += 1
+        return dict(self.info)
+
+def test_terminal_jobs_are_cached_and_refresh_updates_them(tmp_path):
+    cache = JobStatusCache(str(tmp_path / 'jobs.json'))
+    done = StubJob('jobs/1', state='PIPELINE_STATE_SUCCEEDED', error=None)
+    running = StubJob('jobs/2', state='PIPELINE_STATE_RUNNING')
+    fetch_job_records([done, running], cache=cache)
+    records = fetch_job_records([done, running], cache=cache)
+    assert [record['state'] for record in records] == ['SUCCEEDED', 'RUNNING']
+    assert (done.calls, running.calls) == (1, 2)
+
+    done.info['error'] = {'message': 'model export failed'}
+    assert fetch_job_records([done], cache=cache)[0]['error'] is None
+    assert fetch_job_records([done], cache=cache, refresh=True)[0]['error'] == {'message': 'model export failed'}
+    # The refreshed record replaced the cached one, on disk too
+    assert JobStatusCache(cache.path).get('jobs/1')['error'] == {'message': 'model export failed'}
+    assert fetch_job_records([done], cache=cache)[0]['error'] == {'message': 'model export failed'}
+    assert done.calls == 2
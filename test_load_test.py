@@ -0,0 +1,52 @@
+import pytest
+from src.cloud_utils import CanaryRollbackError, canary_rollout, deploy_model, shift_traffic
+from src.fakes import FakeEndpoint, FakeModel
+from src.load_test import cheapest_config, load_requests, record_requests, sweep, synthetic_requests
+
+def test_shift_traffic_keeps_proportions_and_sums_to_100():
+    split = shift_traffic({'a': 50, 'b': 30, 'c': 20}, 'd', 33)
+    assert split['d'] == 33 and sum(split.values()) == 100
+    assert split['a'] > split['b'] > split['c']
+    assert shift_traffic({'a': 100}, 'a', 40) == {'a': 100}
+
+def test_deploy_passes_replica_range_and_validates():
+    model = FakeModel()
+    endpoint = deploy_model(model, min_replica_count=2, max_replica_count=5, autoscaling_target_cpu_utilization=60)
+    assert model.deploy_calls[0]['max_replica_count'] == 5
+    assert model.deploy_calls[0]['autoscaling_target_cpu_utilization'] == 60
+    assert endpoint.traffic_split == {'1': 100}
+    with pytest.raises(ValueError):
+        deploy_model(model, min_replica_count=3, max_replica_count=2)
+    # Traffic options only apply when adding to an existing endpoint
+    for traffic in ({'traffic_percentage': 50}, {'traffic_split': {'0': 100}}):
+        with pytest.raises(ValueError, match="existing endpoint"):
+            deploy_model(model, **traffic)
+    assert len(model.deploy_calls) == 1
+
+def test_canary_promotes_or_rolls_back():
+    endpoint = deploy_model(FakeModel())
+    canary = canary_rollout(FakeModel(), endpoint, steps=(10, 50, 100), undeploy_previous=True)
+    assert endpoint.traffic_split == {canary: 100}
+    
+    seen = []
+    def check(endpoint, deployed_model_id):
+        seen.append(endpoint.traffic_split[deployed_model_id])
+        return len(seen) < 2
+    with pytest.raises(CanaryRollbackError):
+        canary_rollout(FakeModel(), endpoint, steps=(10, 50, 100), check=check)
+    assert seen == [10, 50]
+    assert endpoint.traffic_split == {canary: 100} and list(endpoint.deployed_models) == [canary]
+
+def test_load_sweep_finds_cheapest_replica_count(tmp_path):
+    path = str(tmp_path / 'requests.jsonl')
+    record_requests(path, synthetic_requests(50))
+    requests = load_requests(path)
+    assert len(requests) == 50
+    
+    curves = []
+    for replicas in (1, 3):
+        endpoint = FakeEndpoint(latency=0.02, replicas=replicas)
+        curves.append((replicas, sweep(endpoint, requests, [100], duration=0.5)))
+    # One replica serves at most 50 requests/s, so at 100 QPS its queue grows
+    assert curves[0][1][0].p99_ms > 100
+    assert cheapest_config(curves, target_qps=100, slo_p99_ms=60) == 3
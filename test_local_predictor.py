@@ -0,0 +1,64 @@
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from src.cloud_utils import predict_with_endpoint
+from src.fakes import FakeEndpoint
+from src.local_predictor import LocalPredictor, find_model_artifact, list_model_artifacts, load_model_artifact
+
+FOREST_PATH = find_model_artifact('models', 'random_forest')
+SVM_PATH = find_model_artifact('models', 'svm')
+
+def _iris(n_rows=30):
+    return pd.read_csv('data/raw/iris.csv').drop(columns='target').sample(n_rows, random_state=0)
+
+@pytest.fixture
+def model_dir(tmp_path):
+    for source, name in ((FOREST_PATH, 'random_forest_20250101_000000.pkl'),
+                         (FOREST_PATH, 'random_forest_20250301_000000.pkl'),
+                         (SVM_PATH, 'svm_20250201_000000.pkl')):
+        shutil.copy(source, tmp_path / name)
+    (tmp_path / 'notes.pkl').write_bytes(b'not an artifact')
+    return tmp_path
+
+def test_newest_artifact_is_found_unless_type_or_timestamp_is_pinned(model_dir):
+    assert [a[0] for a in list_model_artifacts(str(model_dir))] == [
+        '20250101_000000', '20250201_000000', '20250301_000000'
+    ]
+    assert find_model_artifact(str(model_dir)).endswith('random_forest_20250301_000000.pkl')
+    assert find_model_artifact(str(model_dir), 'svm').endswith('svm_20250201_000000.pkl')
+    assert find_model_artifact(str(model_dir), timestamp='20250101_000000').endswith(
+        'random_forest_20250101_000000.pkl')
+    with pytest.raises(FileNotFoundError):
+        find_model_artifact(str(model_dir), 'svm', timestamp='20250101_000000')
+    assert LocalPredictor(model_dir=str(model_dir), model_type='svm').model_type == 'svm'
+
+@pytest.mark.parametrize('path', [FOREST_PATH, SVM_PATH])
+def test_dict_list_and_frame_instances_agree(path):
+    predictor = LocalPredictor(path=path)
+    df = _iris()[predictor.feature_names]
+    expected = load_model_artifact(path)['model'].predict_proba(df)
+    for instances in (df, df.to_numpy(), df.to_numpy().tolist(), df.to_dict('records')):
+        np.testing.assert_allclose(predictor.predict_proba(instances), expected, atol=1e-12)
+    assert predictor.predict_labels(df.to_dict('records')).tolist() == \
+        load_model_artifact(path)['model'].predict(df).tolist()
+
+def test_svm_artifact_is_served_without_compilation():
+    predictor = LocalPredictor(path=SVM_PATH)
+    assert predictor.model_type == 'svm' and predictor.compiled is None
+    assert predictor.classes == ['0', '1', '2']
+
+def test_predictions_match_an_endpoint_through_predict_with_endpoint():
+    predictor = LocalPredictor(path=FOREST_PATH)
+    instances = _iris(5)[predictor.feature_names].to_dict('records')
+    local = predict_with_endpoint(predictor, instances)
+    remote = predict_with_endpoint(FakeEndpoint(), instances)
+    # The same response shape as an AutoML endpoint
+    assert type(local).__name__ == 'Prediction' and local.deployed_model_id == 'local'
+    assert len(local.predictions) == len(remote.predictions) == 5
+    for prediction, endpoint_prediction in zip(local.predictions, remote.predictions):
+        assert set(prediction) == set(endpoint_prediction) == {'classes', 'scores'}
+        assert prediction['classes'] == endpoint_prediction['classes']
+        assert sum(prediction['scores']) == pytest.approx(1.0)
+    assert predictor.predict([]).predictions == []
+    assert predictor.predict(instances, parameters={}, timeout=5.0) == local
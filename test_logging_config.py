@@ -0,0 +1,57 @@
+import json
+import logging
+import pytest
+from src.logging_config import setup_logging, shutdown_logging
+
+@pytest.fixture
+def log_dir(tmp_path):
+    shutdown_logging()
+    root_level = logging.getLogger().level
+    yield tmp_path
+    shutdown_logging()
+    logging.getLogger().setLevel(root_level)
+
+def _entries(log_dir):
+    # Stopping the listener flushes everything still queued
+    shutdown_logging()
+    with open(log_dir / 'pipeline.jsonl') as f:
+        return [json.loads(line) for line in f]
+
+def test_file_gets_one_json_object_per_record(log_dir):
+    logger = setup_logging('test.json', log_dir=str(log_dir), console=False)
+    logger.info("scored %d rows", 3, extra={'rows': 3, 'model': 'svm'})
+    try:
+        raise ValueError("bad chunk")
+    except ValueError:
+        logger.exception("chunk failed")
+
+    first, second = _entries(log_dir)
+    assert (first['logger'], first['level'], first['message']) == ('test.json', 'INFO', "scored 3 rows")
+    assert (first['rows'], first['model']) == (3, 'svm')
+    assert second['level'] == 'ERROR' and 'ValueError: bad chunk' in second['exception']
+
+def test_later_loggers_share_the_first_setup(log_dir):
+    first = setup_logging('test.first', log_dir=str(log_dir), console=False)
+    # Handler options of later calls are ignored; only the level applies
+    second = setup_logging('test.second', level=logging.DEBUG, log_dir=str(log_dir / 'other'), console=False)
+    first.debug("dropped by the first logger's level")
+    first.info("from first")
+    second.debug("from second")
+
+    assert [(e['logger'], e['message']) for e in _entries(log_dir)] == [
+        ('test.first', "from first"), ('test.second', "from second")
+    ]
+    assert not (log_dir / 'other').exists()
+
+def test_debug_records_are_sampled_per_logger(log_dir):
+    loggers = [setup_logging(f'test.sampled{i}', level=logging.DEBUG, log_dir=str(log_dir), console=False,
+                             debug_sample_every=3) for i in range(2)]
+    for logger in loggers:
+        for i in range(7):
+            logger.debug(f"step {i}")
+        logger.warning("done")
+
+    messages = [(e['logger'], e['message']) for e in _entries(log_dir)]
+    for logger in loggers:
+        # The first of every three DEBUG records is kept; other levels always pass
+        assert [m for name, m in messages if name == logger.name] == ["step 0", "step 3", "step 6", "done"]
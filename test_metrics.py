@@ -0,0 +1,135 @@
+import os
+import pytest
+from src import metrics
+from src.metrics import MetricsRegistry
+
+def _registry():
+    return MetricsRegistry(enabled=True)
+
+def _sample_lines(text):
+    return [line for line in text.splitlines() if not line.startswith('#')]
+
+def test_render_histogram_buckets_sum_and_count():
+    registry = _registry()
+    registry.counter('rows_total', "Rows seen").inc(3, split='train')
+    latency = registry.histogram('latency_seconds', "Latency", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(2.0)
+    text = registry.render()
+    assert '# HELP latency_seconds Latency' in text
+    assert '# TYPE latency_seconds histogram' in text
+    assert '# TYPE rows_total counter' in text
+    assert _sample_lines(text) == [
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1.0"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        'latency_seconds_count 3',
+        'latency_seconds_sum 2.55',
+        'rows_total{split="train"} 3',
+    ]
+    assert text.endswith('\n')
+
+def test_render_escapes_label_values():
+    registry = _registry()
+    registry.counter('errors_total').inc(reason='bad "quote"\\\n')
+    assert _sample_lines(registry.render()) == [r'errors_total{reason="bad \"quote\"\\\n"} 1']
+
+def test_values_on_a_bucket_boundary_fall_in_that_bucket():
+    registry = _registry()
+    latency = registry.histogram('latency_seconds', buckets=(0.1, 1.0))
+    for value in (0.1, 1.0):
+        latency.observe(value)
+    lines = _sample_lines(registry.render())
+    # Prometheus buckets are "less than or equal to" their upper bound
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in lines
+
+def test_timed_labels_outcome_and_reraises():
+    registry = _registry()
+
+    @metrics.timed('job', registry=registry)
+    def job(fail):
+        if fail:
+            raise RuntimeError("boom")
+        return 'done'
+
+    assert job(False) == 'done'
+    with pytest.raises(RuntimeError):
+        job(True)
+    with pytest.raises(RuntimeError):
+        job(True)
+    calls = registry.counter('job_calls_total')
+    assert calls.value(outcome='ok') == 1
+    assert calls.value(outcome='error') == 2
+    assert registry.histogram('job_seconds').count() == 3
+    assert 'job_calls_total{outcome="error"} 2' in registry.render()
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    calls = []
+
+    @metrics.timed('job', registry=registry)
+    def job():
+        calls.append(1)
+        return 'done'
+
+    assert job() == 'done'
+    registry.counter('rows_total').inc(5)
+    registry.histogram('latency_seconds').observe(0.2)
+    with registry.histogram('block_seconds').time():
+        pass
+    assert calls == [1]
+    assert registry.counter('job_calls_total').value(outcome='ok') == 0
+    assert registry.counter('rows_total').value() == 0
+    assert registry.histogram('latency_seconds').count() == 0
+    assert _sample_lines(registry.render()) == []
+
+def test_enable_and_reset_on_the_default_registry():
+    was_enabled = metrics.REGISTRY.enabled
+    try:
+        metrics.enable()
+        metrics.counter('test_metrics_total').inc()
+        assert metrics.counter('test_metrics_total').value() == 1
+        metrics.REGISTRY.reset()
+        assert metrics.counter('test_metrics_total').value() == 0
+        metrics.disable()
+        metrics.counter('test_metrics_total').inc()
+        assert metrics.counter('test_metrics_total').value() == 0
+    finally:
+        metrics.REGISTRY.enabled = was_enabled
+
+def test_a_name_keeps_its_metric_type():
+    registry = _registry()
+    registry.counter('things')
+    with pytest.raises(ValueError):
+        registry.histogram('things')
+
+def test_write_textfile_replaces_the_file_atomically(tmp_path, monkeypatch):
+    registry = _registry()
+    path = str(tmp_path / 'textfile' / 'ml.prom')
+    registry.counter('rows_total').inc(1)
+    assert registry.write_textfile(path) == path
+    registry.counter('rows_total').inc(1)
+
+    # The new content is fully written to a sibling file, then renamed over the target
+    replaced = []
+    real_replace = os.replace
+
+    def recording_replace(src, dst):
+        with open(src) as f:
+            replaced.append((src, dst, f.read()))
+        with open(dst) as f:
+            assert 'rows_total 1' in f.read()
+        real_replace(src, dst)
+
+    monkeypatch.setattr(metrics.os, 'replace', recording_replace)
+    registry.write_textfile(path)
+    assert len(replaced) == 1
+    src, dst, content = replaced[0]
+    assert os.path.dirname(src) == os.path.dirname(path) and dst == path
+    assert content == registry.render()
+    with open(path) as f:
+        assert 'rows_total 2' in f.read()
+    assert os.listdir(os.path.dirname(path)) == ['ml.prom']
@@ -0,0 +1,75 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from src.local_predictor import find_model_artifact, LocalPredictor
+from src.model_cache import ModelCache, export_mmap_model, load_mmap_model, mmap_model_path
+
+FOREST_PATH = find_model_artifact('models', 'random_forest')
+SVM_PATH = find_model_artifact('models', 'svm')
+
+def _copy(source, tmp_path, name):
+    path = str(tmp_path / name)
+    shutil.copy(source, path)
+    return path
+
+def _features(predictor):
+    return pd.read_csv('data/raw/iris.csv')[predictor.feature_names]
+
+def test_exported_models_predict_like_the_pickles(tmp_path):
+    for source in (FOREST_PATH, SVM_PATH):
+        path = export_mmap_model(source, str(tmp_path))
+        assert path == mmap_model_path(source, str(tmp_path))
+        original = LocalPredictor(path=source, compiled=False)
+        mapped = LocalPredictor(path=source, artifact=load_mmap_model(path))
+        X = _features(original)
+        np.testing.assert_allclose(mapped.predict_proba(X), original.predict_proba(X))
+    # Nothing but the two exports is left behind
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(mmap_model_path(source)) for source in (FOREST_PATH, SVM_PATH))
+
+def test_concurrent_exports_of_one_artifact_all_succeed(tmp_path):
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        paths = list(pool.map(lambda _: export_mmap_model(FOREST_PATH, str(tmp_path)), range(4)))
+    assert len(set(paths)) == 1
+    assert os.listdir(tmp_path) == [os.path.basename(paths[0])]
+    assert load_mmap_model(paths[0])['model_type'] == 'random_forest'
+
+def test_least_recently_used_model_is_evicted(tmp_path):
+    paths = [_copy(FOREST_PATH, tmp_path, f'random_forest_{i}.pkl') for i in range(3)]
+    cache = ModelCache(max_models=2, mmap_dir=str(tmp_path / 'mmap'))
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+    assert paths[0] in cache and paths[2] in cache and paths[1] not in cache
+    assert cache.stats == {'hits': 1, 'misses': 3, 'evictions': 1, 'reloads': 0}
+
+def test_hit_reloads_an_artifact_replaced_in_place(tmp_path):
+    path = _copy(FOREST_PATH, tmp_path, 'model.pkl')
+    cache = ModelCache(mmap_dir=str(tmp_path / 'mmap'))
+    assert cache.get(path)['model_type'] == 'random_forest'
+    assert cache.get(path)['model_type'] == 'random_forest'
+
+    shutil.copy(SVM_PATH, path)
+    assert cache.get(path)['model_type'] == 'svm'
+    assert cache.stats['reloads'] == 1
+    assert len(cache) == 1
+
+def test_same_named_artifacts_in_different_directories_get_their_own_exports(tmp_path):
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    forest = _copy(FOREST_PATH, tmp_path / 'a', 'model.pkl')
+    svm = _copy(SVM_PATH, tmp_path / 'b', 'model.pkl')
+    cache = ModelCache(mmap_dir=str(tmp_path / 'mmap'))
+    assert cache.get(forest)['model_type'] == 'random_forest'
+    assert cache.get(svm)['model_type'] == 'svm'
+    assert len(os.listdir(tmp_path / 'mmap')) == 2
+
+def test_export_is_redone_for_an_older_artifact_copied_over_the_source(tmp_path):
+    path = _copy(FOREST_PATH, tmp_path, 'model.pkl')
+    export_mmap_model(path, str(tmp_path / 'mmap'))
+    # copy2 keeps the SVM file's old mtime, older than the export's metadata
+    shutil.copy2(SVM_PATH, path)
+    assert ModelCache(mmap_dir=str(tmp_path / 'mmap')).get(path)['model_type'] == 'svm'
@@ -0,0 +1,69 @@
+import os
+import pickle
+import shutil
+from src.local_predictor import find_model_artifact, load_model_artifact
+from src.model_registry import ModelRegistry
+
+def _register(registry, name, algorithm, accuracy, timestamp):
+    return registry.register({'name': name}, algorithm=algorithm, params={}, metrics={'accuracy': accuracy},
+                             timestamp=timestamp)
+
+def test_import_directory_stores_identical_artifacts_once(tmp_path):
+    source = find_model_artifact('models', 'random_forest')
+    model_dir = tmp_path / 'models'
+    model_dir.mkdir()
+    shutil.copy(source, model_dir / 'random_forest_20250101_000000.pkl')
+    shutil.copy(source, model_dir / 'random_forest_20250102_000000.pkl')
+    shutil.copy(find_model_artifact('models', 'svm'), model_dir / 'svm_20250103_000000.pkl')
+    (model_dir / 'notes.txt').write_text("not a model")
+
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    version_ids = registry.import_directory(str(model_dir))
+    assert len(version_ids) == 3 and version_ids[0] == version_ids[1] != version_ids[2]
+    assert len(registry.get(version_ids[0])['sources']) == 2
+    assert registry.latest()['algorithm'] == 'svm'
+    assert registry.latest('random_forest')['version_id'] == version_ids[0]
+    # Reopening reads the index, and importing again adds nothing
+    reopened = ModelRegistry(str(tmp_path / 'registry'))
+    assert reopened.import_directory(str(model_dir)) == version_ids
+    assert len(reopened.list()) == 2
+    assert reopened.load(version_ids[2])['model_type'] == 'svm'
+
+def test_bare_estimators_take_their_timestamp_from_the_filename(tmp_path):
+    model = load_model_artifact(find_model_artifact('models', 'svm'))['model']
+    path = tmp_path / 'svm_20250103_123000.pkl'
+    path.write_bytes(pickle.dumps(model))
+
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    entry = registry.get(registry.register(str(path)))
+    assert entry['algorithm'] == 'svm'
+    assert entry['timestamp'] == '2025-01-03T12:30:00'
+
+def test_best_version_by_metric(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    _register(registry, 'a', 'svm', 0.90, '2025-01-01T00:00:00')
+    newer_tie = _register(registry, 'b', 'svm', 0.95, '2025-01-03T00:00:00')
+    _register(registry, 'c', 'svm', 0.95, '2025-01-02T00:00:00')
+    forest = _register(registry, 'd', 'random_forest', 0.97, '2025-01-01T00:00:00')
+
+    assert registry.best('accuracy')['version_id'] == forest
+    # Ties go to the newer version
+    assert registry.best('accuracy', algorithm='svm')['version_id'] == newer_tie
+    assert registry.best('accuracy', algorithm='svm', higher_is_better=False)['metrics']['accuracy'] == 0.90
+    assert registry.best('f1') is None
+
+def test_prune_dry_run_reports_exactly_what_a_real_prune_removes(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    ids = [_register(registry, str(day), 'svm', 0.9 + (day == 2) * 0.05, f'2025-01-0{day}T00:00:00')
+           for day in range(1, 7)]
+    registry.set_current(ids[0])
+
+    would_remove = registry.prune(keep_last=2, keep_best='accuracy', dry_run=True)
+    # Current (day 1), best (day 2) and the newest two are kept
+    assert sorted(would_remove) == sorted(ids[2:4])
+    assert all(os.path.exists(registry.object_path(v)) for v in ids)
+    assert len(ModelRegistry(str(tmp_path)).list()) == 6
+
+    assert sorted(registry.prune(keep_last=2, keep_best='accuracy')) == sorted(would_remove)
+    assert [e['version_id'] for e in ModelRegistry(str(tmp_path)).list()] == [ids[0], ids[1], ids[4], ids[5]]
+    assert not any(os.path.exists(registry.object_path(v)) for v in would_remove)
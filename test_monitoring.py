@@ -0,0 +1,64 @@
+import enum
+import asyncio
+import time
+from src.fakes import FakeJob
+from src.monitoring import NotificationQueue, TrainingMonitor, job_state, short_state
+
+def schedule(pending, running, final):
+    return [
+        ('PIPELINE_STATE_PENDING', pending),
+        ('PIPELINE_STATE_RUNNING', running),
+        (f'PIPELINE_STATE_{final}', 0)
+    ]
+
+def test_monitor_sees_every_transition_of_every_job():
+    jobs = [
+        FakeJob('a', schedule(0.05, 0.2, 'SUCCEEDED'), metrics={'logLoss': 0.1}),
+        FakeJob('b', schedule(0.1, 0.1, 'FAILED')),
+        FakeJob('c', schedule(0.0, 0.3, 'CANCELLED'), failure_rate=0.2, seed=1),
+    ]
+    monitor = TrainingMonitor(jobs, min_interval=0.01, max_interval=0.05, max_calls_per_second=500)
+    final_states = asyncio.run(monitor.run(timeout=5))
+    
+    assert sorted(final_states.values()) == ['CANCELLED', 'FAILED', 'SUCCEEDED']
+    for job in jobs:
+        states = [e.new_state for e in monitor.events if e.display_name == job.display_name]
+        assert states[-1] == job_state(job)
+        assert 'RUNNING' in states
+    succeeded = [e for e in monitor.events if e.new_state == 'SUCCEEDED']
+    assert succeeded[0].details == {'logLoss': 0.1}
+
+def test_polling_backs_off_while_state_is_unchanged():
+    job = FakeJob('slow', schedule(0.0, 0.6, 'SUCCEEDED'))
+    monitor = TrainingMonitor([job], min_interval=0.01, max_interval=0.2, backoff=2.0,
+                              max_calls_per_second=500)
+    asyncio.run(monitor.run(timeout=5))
+    # Fixed 10 ms polling would need ~60 calls
+    assert job.polls < 20
+
+def test_notifications_are_batched_and_rate_limited():
+    sent = []
+    
+    async def scenario():
+        queue = NotificationQueue(
+            lambda subject, message: sent.append((time.monotonic(), subject)),
+            batch_window=0.05, min_send_interval=0.2
+        ).start()
+        jobs = [FakeJob(f'job-{i}', schedule(0.0, 0.1 + 0.02 * i, 'SUCCEEDED')) for i in range(10)]
+        monitor = TrainingMonitor(jobs, notifier=None, min_interval=0.01, max_interval=0.02,
+                                  max_calls_per_second=1000, on_event=queue.put)
+        await monitor.run(timeout=5)
+        await queue.close()
+        return monitor.events
+    
+    events = asyncio.run(scenario())
+    assert len(sent) < len(events)
+    gaps = [later[0] - earlier[0] for earlier, later in zip(sent, sent[1:-1])]
+    assert all(gap >= 0.19 for gap in gaps)
+
+def test_short_state_accepts_enums_strings_and_none():
+    JobState = enum.Enum('JobState', ['JOB_STATE_FAILED'])
+    assert short_state(JobState.JOB_STATE_FAILED) == 'FAILED'
+    assert short_state('PIPELINE_STATE_SUCCEEDED') == 'SUCCEEDED'
+    assert short_state('RUNNING') == 'RUNNING'
+    assert short_state(None) == ''
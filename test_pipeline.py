@@ -0,0 +1,83 @@
+import time
+import pytest
+from src.fakes import FakeTrainingBackend
+from src.pipeline import Pipeline, PipelineError, Stage
+from cloud_train_deploy import build_pipeline
+
+TRAINING_DATA = "data/cloud/training_data.csv"
+TEST_DATA = "data/cloud/test_data.csv"
+# Variants only the fake backend trains differently; Vertex AI trains one AutoML job
+VARIANTS = ("random_forest", "svm")
+
+def test_independent_stages_overlap(tmp_path):
+    backend = FakeTrainingBackend(upload_seconds=0.1, train_seconds=0.3, deploy_seconds=0.1)
+    pipeline = build_pipeline(backend, TRAINING_DATA, TEST_DATA, model_types=VARIANTS,
+                              checkpoint_path=str(tmp_path / 'state.json'))
+    start = time.monotonic()
+    outputs = pipeline.run()
+    elapsed = time.monotonic() - start
+    
+    # Serially: 2 uploads + 2 trainings + deploy = 0.9 s; the critical path is 0.5 s
+    assert elapsed < 0.75
+    assert backend.count('train') == 2
+    assert outputs['select_model']['model'].endswith('iris_classifier_v4_random_forest')
+    assert outputs['predict']['n_scored'] > 0
+
+def test_rerun_resumes_after_failed_stage(tmp_path):
+    backend = FakeTrainingBackend(failures={'deploy': 1})
+    pipeline = build_pipeline(backend, TRAINING_DATA, TEST_DATA, model_types=VARIANTS,
+                              checkpoint_path=str(tmp_path / 'state.json'))
+    with pytest.raises(PipelineError) as failure:
+        pipeline.run()
+    assert failure.value.stage == 'deploy'
+    assert 'train_svm' in failure.value.outputs
+    
+    outputs = pipeline.run()
+    assert backend.count('upload') == 2
+    assert backend.count('train') == 2
+    assert backend.count('deploy') == 2
+    assert 'predict' in outputs
+
+def test_changed_stage_key_reruns_dependents(tmp_path):
+    calls = []
+    
+    def stages(key):
+        return [
+            Stage('a', lambda: calls.append('a') or 1, key=key),
+            Stage('b', lambda a: calls.append('b') or a + 1, deps=['a']),
+            Stage('c', lambda: calls.append('c') or 10),
+        ]
+    
+    path = str(tmp_path / 'state.json')
+    Pipeline(stages(1), checkpoint_path=path).run()
+    outputs = Pipeline(stages(2), checkpoint_path=path).run()
+    assert sorted(calls) == ['a', 'a', 'b', 'b', 'c']
+    assert outputs == {'a': 1, 'b': 2, 'c': 10}
+
+def test_cycles_are_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        Pipeline([Stage('a', lambda b: b, deps=['b']), Stage('b', lambda a: a, deps=['a'])])
+
+def test_changed_model_types_reselect_the_model(tmp_path):
+    backend = FakeTrainingBackend()
+    path = str(tmp_path / 'state.json')
+    first = build_pipeline(backend, TRAINING_DATA, TEST_DATA, model_types=VARIANTS, checkpoint_path=path).run()
+    assert first['select_model']['model'].endswith('iris_classifier_v4_random_forest')
+    
+    outputs = build_pipeline(backend, TRAINING_DATA, TEST_DATA, model_types=("svm",), checkpoint_path=path).run()
+    assert outputs['select_model']['model'].endswith('iris_classifier_v4_svm')
+    assert backend.count('train') == 2
+    assert backend.count('deploy') == 2
+
+def test_legacy_model_types_still_train_with_a_deprecation_warning(monkeypatch):
+    import src.cloud_utils
+    from src.cloud_utils import VertexAIBackend
+
+    def stop_before_vertex_ai():
+        raise RuntimeError("no Vertex AI here")
+
+    monkeypatch.setattr(src.cloud_utils, 'init_vertex_ai', stop_before_vertex_ai)
+    with pytest.warns(DeprecationWarning, match="automl"), pytest.raises(RuntimeError, match="no Vertex AI"):
+        VertexAIBackend().train("iris_svm", "gs://bucket/train.csv", "target", "svm")
+    with pytest.raises(RuntimeError, match="no Vertex AI"):
+        src.cloud_utils.train_model_on_cloud("iris", "gs://bucket/train.csv", "target")
@@ -0,0 +1,73 @@
+from src import metrics
+from src.cloud_utils import deploy_model, predict_with_endpoint
+from src.fakes import FakeEndpoint
+from src.prediction_cache import PredictionCache, get_prediction_cache, set_prediction_cache
+
+FEATURES = ['sepal length (cm)', 'sepal width (cm)', 'petal length (cm)', 'petal width (cm)']
+
+def _instance(petal_length):
+    return dict(zip(FEATURES, [5.1, 3.5, petal_length, 0.2]))
+
+def test_only_misses_reach_the_endpoint():
+    endpoint = FakeEndpoint()
+    cache = PredictionCache()
+    first = predict_with_endpoint(endpoint, [_instance(1.4), _instance(4.5), _instance(1.4)], cache=cache)
+    assert endpoint.instances_seen == 2
+    
+    # Float noise below the quantization step still hits
+    again = predict_with_endpoint(endpoint, [_instance(4.5 + 1e-9), _instance(6.0)], cache=cache)
+    assert endpoint.calls == 2 and endpoint.instances_seen == 3
+    assert again.predictions[0] == first.predictions[1]
+    stats = cache.summary()
+    assert (stats['hits'], stats['misses']) == (1, 4)
+
+def test_ttl_lru_and_memory_bounds():
+    now = [0.0]
+    cache = PredictionCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.put_many([(('m', (1,)), 'a'), (('m', (2,)), 'b')])
+    cache.get_many([('m', (1,))])
+    cache.put_many([(('m', (3,)), 'c')])
+    assert cache.get_many([('m', (1,)), ('m', (2,)), ('m', (3,))]) == ['a', None, 'c']
+    now[0] = 11.0
+    assert cache.get_many([('m', (1,))]) == [None]
+    assert cache.stats['expired'] == 1
+    
+    small = PredictionCache(max_bytes=2000)
+    small.put_many((('m', (i,)), {'classes': ['0', '1', '2'], 'scores': [0.1, 0.2, 0.7]}) for i in range(100))
+    assert 0 < len(small) < 100 and small.summary()['bytes'] <= 2000
+
+def test_deploy_invalidates_the_endpoint():
+    class Model:
+        def deploy(self, **kwargs):
+            return endpoint
+    endpoint = FakeEndpoint()
+    previous = get_prediction_cache()
+    set_prediction_cache(PredictionCache())
+    try:
+        predict_with_endpoint(endpoint, [_instance(1.4)], cache=get_prediction_cache())
+        assert len(get_prediction_cache()) == 1
+        deploy_model(Model())
+        assert len(get_prediction_cache()) == 0
+    finally:
+        set_prediction_cache(previous)
+
+def test_cache_hits_are_not_counted_as_sent_instances():
+    endpoint = FakeEndpoint()
+    cache = PredictionCache()
+    metrics.enable()
+    try:
+        metrics.REGISTRY.reset()
+        predict_with_endpoint(endpoint, [_instance(1.4), _instance(4.5), _instance(1.4)], cache=cache)
+        predict_with_endpoint(endpoint, [_instance(1.4), _instance(6.0)], cache=cache)
+        assert metrics.counter('predict_instances_total').value() == endpoint.instances_seen == 3
+        assert metrics.counter('prediction_cache_hits_total').value() == 1
+        
+        # A CachedEndpoint passed in directly is counted the same way
+        predict_with_endpoint(cache.wrap(endpoint), [_instance(4.5), _instance(7.0)])
+        assert metrics.counter('predict_instances_total').value() == endpoint.instances_seen == 4
+        
+        predict_with_endpoint(endpoint, [_instance(4.5)])
+        assert metrics.counter('predict_instances_total').value() == 5
+    finally:
+        metrics.REGISTRY.reset()
+        metrics.disable()
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from prepare_cloud_data import prepare_data, stratified_split
+from src.data_format import read_dataset
+
+def _split(output_dir, fmt):
+    return [read_dataset(str(output_dir / f'{name}.{fmt}')) for name in ('training_data', 'test_data')]
+
+def test_streaming_split_is_stratified_for_any_chunk_size(tmp_path):
+    raw = pd.read_csv('data/raw/iris.csv')
+    prepare_data('data/raw/iris.csv', str(tmp_path / 'a'), test_size=0.2, chunksize=7, output_format='csv')
+    prepare_data('data/raw/iris.csv', str(tmp_path / 'b'), test_size=0.2, chunksize=1000, output_format='csv')
+    train, test = _split(tmp_path / 'a', 'csv')
+    # Every class sends its share to the test set, to within one row
+    expected = raw['target'].value_counts() * 0.2
+    assert ((test['target'].value_counts() - expected).abs() < 1).all()
+    assert len(train) + len(test) == len(raw)
+    assert all(a.equals(b) for a, b in zip(_split(tmp_path / 'a', 'csv'), _split(tmp_path / 'b', 'csv')))
+
+    prepare_data('data/raw/iris.csv', str(tmp_path / 'c'), test_size=0.2, random_state=7, chunksize=50,
+                 output_format='csv')
+    assert not _split(tmp_path / 'c', 'csv')[1].equals(test)
+
+def test_split_rows_are_picked_by_hash_not_by_position():
+    df = pd.read_csv('data/raw/iris.csv').sort_values('target', kind='stable').reset_index(drop=True)
+    is_test = stratified_split(df, test_size=0.2, random_state=42)
+    # Not every fifth row of a sorted class
+    gaps = np.diff(np.flatnonzero(is_test[df['target'].to_numpy() == 0]))
+    assert len(set(gaps.tolist())) > 2
+    other_seed = stratified_split(df, test_size=0.2, random_state=7)
+    assert (is_test & other_seed).sum() < 0.5 * is_test.sum()
+    assert other_seed.sum() == is_test.sum()
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+def test_empty_input_replaces_previous_outputs(tmp_path, fmt):
+    raw = pd.read_csv('data/raw/iris.csv')
+    prepare_data('data/raw/iris.csv', str(tmp_path / 'out'), chunksize=100, output_format=fmt)
+    empty_path = str(tmp_path / 'empty.csv')
+    raw.iloc[:0].to_csv(empty_path, index=False)
+
+    prepare_data(empty_path, str(tmp_path / 'out'), chunksize=100, output_format=fmt)
+    for split in _split(tmp_path / 'out', fmt):
+        assert len(split) == 0
+        assert list(split.columns) == list(raw.columns)
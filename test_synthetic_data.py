@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from src.synthetic_data import allocate_counts, fit_class_gaussians, generate_synthetic_data, iter_synthetic_chunks
+
+def _iris():
+    df = pd.read_csv('data/raw/iris.csv')
+    return df.drop(columns='target').to_numpy(), df['target'].to_numpy()
+
+def test_class_counts_are_exact_for_any_chunk_size():
+    assert allocate_counts(10, [1, 1, 1]).tolist() == [4, 3, 3]
+    assert allocate_counts(7, [0.5, 0.25, 0.25]).tolist() == [3, 2, 2]
+
+    model = fit_class_gaussians(*_iris())
+    for chunksize in (1000, 333, 64):
+        chunks = list(iter_synthetic_chunks(model, 1000, priors=[0.5, 0.3, 0.2], chunksize=chunksize, random_state=0))
+        assert all(len(X) == len(y) <= chunksize for X, y in chunks)
+        y = np.concatenate([y for _, y in chunks])
+        assert np.bincount(y).tolist() == [500, 300, 200]
+
+    X, y = generate_synthetic_data(*_iris(), n_synthetic=101, random_state=0)
+    assert X.shape == (101, 4) and np.bincount(y).tolist() == [34, 34, 33]
+
+def test_output_is_identical_for_any_number_of_workers():
+    model = fit_class_gaussians(*_iris())
+
+    def generate(n_jobs):
+        chunks = list(iter_synthetic_chunks(model, 5000, chunksize=700, random_state=42, n_jobs=n_jobs))
+        return np.concatenate([X for X, _ in chunks]), np.concatenate([y for _, y in chunks])
+
+    X, y = generate(1)
+    for n_jobs in (2, 3):
+        other_X, other_y = generate(n_jobs)
+        np.testing.assert_array_equal(other_X, X)
+        np.testing.assert_array_equal(other_y, y)
+    assert not np.array_equal(np.concatenate([X for X, _ in iter_synthetic_chunks(model, 5000, chunksize=700,
+                                                                                  random_state=7)]), X)
@@ -0,0 +1,39 @@
+import os
+from src.fakes import FakeStorageClient
+from src.upload_manifest import UploadManifest, upload_if_changed
+
+def _setup(tmp_path):
+    client = FakeStorageClient(str(tmp_path / 'gcs'))
+    source = tmp_path / 'train.csv'
+    source.write_text("a,target\n1,0\n")
+    manifest = UploadManifest(str(tmp_path / 'manifest.json'))
+    return client, client.bucket('bucket'), str(source), manifest
+
+def test_unchanged_and_touched_files_are_skipped(tmp_path):
+    client, bucket, source, manifest = _setup(tmp_path)
+    assert upload_if_changed(source, 'train.csv', bucket, manifest=manifest) == ('gs://bucket/train.csv', True)
+    assert upload_if_changed(source, 'train.csv', bucket, manifest=manifest)[1] is False
+
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert upload_if_changed(source, 'train.csv', bucket, manifest=manifest)[1] is False
+    # The new mtime is recorded, so the next check does not rehash
+    assert UploadManifest(manifest.path).get(source)['mtime_ns'] == stat.st_mtime_ns + 10**9
+    assert client.uploads == 1
+
+def test_verify_remote_and_edits_trigger_reupload(tmp_path):
+    client, bucket, source, manifest = _setup(tmp_path)
+    upload_if_changed(source, 'train.csv', bucket, manifest=manifest)
+
+    bucket.blob('train.csv').delete()
+    # The manifest alone still trusts the deleted object; verify_remote does not
+    assert upload_if_changed(source, 'train.csv', bucket, manifest=manifest)[1] is False
+    assert upload_if_changed(source, 'train.csv', bucket, manifest=manifest, verify_remote=True)[1] is True
+    assert upload_if_changed(source, 'train.csv', bucket, manifest=manifest, verify_remote=True)[1] is False
+
+    with open(source, 'a') as f:
+        f.write("2,1\n")
+    assert upload_if_changed(source, 'train.csv', bucket, manifest=manifest)[1] is True
+    assert bucket.blob('train.csv').download_as_bytes() == open(source, 'rb').read()
+    assert upload_if_changed(source, 'train.csv', bucket, manifest=manifest, force=True)[1] is True
+    assert client.uploads == 4
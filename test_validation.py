@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.validation import validate_frame
+
+def _frame(n_rows=20):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.uniform(1.0, 5.0, size=(n_rows, 3)), columns=['a', 'b', 'c'])
+    df['target'] = np.arange(n_rows) % 2
+    return df
+
+def test_clean_frame_passes():
+    report = validate_frame(_frame(), schema={'a': {'min': 0, 'max': 10}})
+    assert report.ok and report.class_counts == {0: 10, 1: 10}
+    report.raise_for_errors()
+
+def test_nulls_and_infinities_are_counted_with_their_first_rows():
+    df = _frame()
+    df.loc[[3, 7], 'a'] = np.nan
+    df.loc[5, 'b'] = np.inf
+    df.loc[9, 'b'] = -np.inf
+    # Blocks smaller than the frame, and offsets as for a later chunk of a file
+    report = validate_frame(df, schema={'b': {'min': 0}}, row_offset=100, block_size=4)
+    assert report.columns['a']['nulls'] == 2 and report.columns['a']['first_rows']['nulls'] == [103, 107]
+    assert report.columns['b']['infs'] == 2 and report.columns['b']['first_rows']['infs'] == [105, 109]
+    # Infinities are reported as such, not as out of range
+    assert report.columns['b']['below_min'] == 0
+    assert report.errors == [
+        "Found null values in columns: ['a'] (first at row 103)",
+        "Found infinite values in columns: ['b'] (first at row 105)"
+    ]
+    with pytest.raises(ValueError, match="null values"):
+        report.raise_for_errors()
+
+def test_non_numeric_features_and_out_of_range_values():
+    df = _frame()
+    df['c'] = df['c'].astype(str)
+    df.loc[2, 'a'] = -1.0
+    report = validate_frame(df, schema={'a': {'min': 0.0}, 'missing': {'max': 1}})
+    assert report.columns['c']['non_numeric'] and 'non_numeric' not in report.columns['target']
+    assert report.errors == [
+        "Found non-numeric features: ['c']",
+        "1 values in 'a' below 0.0 (first at row 2)",
+        "Missing column required by schema: 'missing'"
+    ]
+
+def test_rare_classes_are_flagged():
+    df = _frame(100)
+    df.loc[:2, 'target'] = 2
+    report = validate_frame(df, min_class_fraction=0.05)
+    assert report.class_counts == {0: 48, 1: 49, 2: 3}
+    assert report.errors == ["Classes below 5.0% of rows: [2]"]
+    assert validate_frame(df, min_class_fraction=0.01).ok
+    # String labels are counted the same way
+    assert validate_frame(df.assign(target=df['target'].map(str)), min_class_fraction=0.05).errors == \
+        ["Classes below 5.0% of rows: ['2']"]